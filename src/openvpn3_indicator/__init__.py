@@ -28,11 +28,11 @@
 
 
 def main(args=None):
+    import argparse
     import logging
     import sys
     import traceback
     from openvpn3_indicator.about import APPLICATION_NAME
-    from openvpn3_indicator.application import Application
 
     try:
         import setproctitle
@@ -41,6 +41,28 @@ def main(args=None):
         logging.debug(traceback.format_exc())
         logging.error('Failed to import setproctitle module')
 
+    if args is None:
+        args = sys.argv
+    # Only --headless is decided here, the other options are left to the application
+    parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    parser.add_argument('--headless', action='store_true')
+    options, _ = parser.parse_known_args(args[1:])
+    if options.headless:
+        # Headless mode never loads Gtk or AppIndicator
+        try:
+            import dbus
+            import openvpn3
+            import secretstorage
+        except:
+            logging.debug(traceback.format_exc())
+            logging.critical('OpenVPN Indicator requires D-Bus, OpenVPN3 python library and Secret Storage to run. Please install required libraries.')
+            sys.exit(1)
+        from openvpn3_indicator.daemon import Daemon
+        daemon = Daemon()
+        sys.exit(daemon.run(args))
+
+    from openvpn3_indicator.application import Application
+
     try:
         import gi
         gi.require_version('Gtk', '3.0')
@@ -94,8 +116,6 @@ def main(args=None):
         sys.exit(1)
 
     application = Application()
-    if args is None:
-        args = sys.argv
     application.run(args)
 
 
@@ -22,8 +22,8 @@
 
 import gettext
 import logging
-import pathlib
 import re
+import signal
 import sys
 import time
 import traceback
@@ -51,22 +51,48 @@ from openvpn3_indicator.multi_notifier import MultiNotifier
 from openvpn3_indicator.credential_store import CredentialStore
 from openvpn3_indicator.dialogs.about import construct_about_dialog
 from openvpn3_indicator.dialogs.system_checks import construct_appindicator_missing_dialog
-from openvpn3_indicator.dialogs.credentials import CredentialsUserInput, construct_credentials_dialog
-from openvpn3_indicator.dialogs.configuration import construct_configuration_select_dialog, construct_configuration_import_dialog, construct_configuration_remove_dialog
+from openvpn3_indicator.dialogs.credentials import CredentialsUserInput, construct_credentials_dialog, close_credentials_dialog
+from openvpn3_indicator.dialogs.configuration import construct_configuration_select_dialog, construct_configuration_import_dialog, construct_configuration_progress_dialog, set_configuration_progress, construct_configuration_batch_import_dialog, set_configuration_batch_status, set_configuration_batch_summary, construct_configuration_remove_dialog
 from openvpn3_indicator.dialogs.notification import show_error_dialog, show_warning_notification, show_info_notification
+from openvpn3_indicator.dialogs.session_log import construct_session_log_dialog, append_session_log_entries
 from openvpn3_indicator.status import get_status_icon, get_status_description
+from openvpn3_indicator.instrumentation import instrumentation
+from openvpn3_indicator.profiling import Profiler
+from openvpn3_indicator.log_buffer import setup_logging
+from openvpn3_indicator.traffic_statistics import TrafficStatisticsCollector, format_rate
+from openvpn3_indicator.netdev_statistics import NetdevStatisticsSource
+from openvpn3_indicator.uplink_monitor import UplinkMonitor
+from openvpn3_indicator.sleep_monitor import SleepMonitor
+from openvpn3_indicator.configuration_importer import ConfigurationImporter, STAGE_QUEUED, STAGE_READING, STAGE_CHECKING, STAGE_IMPORTING, STAGE_VALIDATING, STAGE_DONE
+from openvpn3_indicator.configuration_parser import ConfigurationSyntaxError, validate_configuration_lines
+from openvpn3_indicator.configuration_index import ConfigurationIndex, INDEX_FILE_NAME
+from openvpn3_indicator.session_controller import SessionController
+from openvpn3_indicator.state_service import StateService
+from openvpn3_indicator.remote_control import add_remote_options, get_remote_command, check_remote_output, check_primary_instance, handle_remote_command
+from openvpn3_indicator.session_snapshot import SessionSnapshot, SNAPSHOT_FILE_NAME
+from openvpn3_indicator.startup_plan import parse_startup_action, toggle_startup_name
+from openvpn3_indicator.connection_timeline import PHASE_CREDENTIAL_LOOKUP, PHASE_USER_INPUT
+from openvpn3_indicator.user_directories import get_user_cache_directory, get_user_cache_file, get_user_data_directory
 
 
 #TODO: Which input slots should not be stored ? (OTPs, etc.)
 #TODO: Understand better the possible session state changes
-#TODO: Collect and present session logs and stats
 #TODO: Implement other than AppIndicator ways to have system tray icon
 #TODO: /usr/share/metainfo ?
 #TODO: Understand mimetype icons inheritance
 #TODO: Prepare localization
 
-DEFAULT_CONFIG_NAME = gettext.gettext('UNKNOWN')
 DEFAULT_SESSION_NAME = gettext.gettext('UNKNOWN')
+SESSION_LOG_FLUSH_INTERVAL = 200
+IMPORT_PROGRESS_DELAY = 500
+IMPORT_STAGE_LABELS = {
+    STAGE_QUEUED : gettext.gettext('Queued'),
+    STAGE_READING : gettext.gettext('Reading'),
+    STAGE_CHECKING : gettext.gettext('Checking'),
+    STAGE_IMPORTING : gettext.gettext('Importing'),
+    STAGE_VALIDATING : gettext.gettext('Validating'),
+    STAGE_DONE : gettext.gettext('Done'),
+}
 
 ###
 #
@@ -74,20 +100,26 @@ DEFAULT_SESSION_NAME = gettext.gettext('UNKNOWN')
 #
 ###
 
-class Application(Gtk.Application):
+class Application(Gtk.Application, SessionController):
     def __init__(self):
         Gtk.Application.__init__(self,
             application_id=APPLICATION_ID,
-            flags=Gio.ApplicationFlags.HANDLES_OPEN,
+            flags=Gio.ApplicationFlags.HANDLES_OPEN | Gio.ApplicationFlags.HANDLES_COMMAND_LINE,
             )
         self.settings = Gio.Settings.new(APPLICATION_ID)
         self.add_main_option('version', ord('V'), GLib.OptionFlags.NONE, GLib.OptionArg.NONE, "Show version and exit", None)
         self.add_main_option('verbose', ord('v'), GLib.OptionFlags.NONE, GLib.OptionArg.NONE, "Show more info", None)
         self.add_main_option('debug', ord('d'), GLib.OptionFlags.NONE, GLib.OptionArg.NONE, "Show debug info", None)
         self.add_main_option('silent', ord('s'), GLib.OptionFlags.NONE, GLib.OptionArg.NONE, "Show less info", None)
+        self.add_main_option('instrument', ord('i'), GLib.OptionFlags.NONE, GLib.OptionArg.NONE, "Collect timing statistics", None)
         self.clear_secret_storage = False
+        self.profiler = Profiler()
+        self.log_buffer = None
         self.add_main_option('clear-secret-storage', ord('c'), GLib.OptionFlags.NONE, GLib.OptionArg.NONE, "Remove all data stored in secret storage", None)
+        add_remote_options(self)
+        self.add_main_option(GLib.OPTION_REMAINING, 0, GLib.OptionFlags.NONE, GLib.OptionArg.STRING_ARRAY, "Configuration files to import", "[FILE...]")
         self.connect('handle-local-options', self.on_handle_local_options)
+        self.connect('command-line', self.on_command_line)
         self.connect('startup', self.on_startup)
         self.connect('activate', self.on_activate)
         self.connect('open', self.on_open)
@@ -101,23 +133,50 @@ class Application(Gtk.Application):
             return 0
         if options.get('clear-secret-storage', False):
             self.clear_secret_storage = True
+        if options.get('instrument', False):
+            instrumentation.enabled = True
         if options.get('debug', False):
             level = logging.DEBUG
         elif options.get('silent', False):
             level = logging.INFO
         elif options.get('verbose', False):
             level = logging.ERROR
-        logging.basicConfig(level = level)
+        self.log_buffer = setup_logging(level)
+        if get_remote_command(options) is not None:
+            if not check_remote_output():
+                logging.critical('Command line verbs need GLib 2.80 or newer')
+                return 1
+            if not check_primary_instance(self):
+                logging.critical('%s is not running', APPLICATION_TITLE)
+                return 1
         return -1
 
+    def on_command_line(self, application, command_line):
+        options = command_line.get_options_dict().end().unpack()
+        command = get_remote_command(options)
+        if command is not None:
+            return handle_remote_command(self, command_line, *command)
+        paths = options.get(GLib.OPTION_REMAINING, [])
+        if paths:
+            self.open([ command_line.create_file_for_arg(path) for path in paths ], '')
+        else:
+            self.activate()
+        return 0
+
     def on_activate(self, data):
-        self.info(f'Activate')
+        self.info('Activate')
 
     def on_open(self, application, files, n_files, hint):
-        self.info(f'Open {n_files} {hint}')
+        self.info('Open %s %s', n_files, hint)
+        config_paths = list()
         for file in files:
             config_path = file.get_path()
-            self.action_config_open(config_path)
+            if config_path not in config_paths:
+                config_paths.append(config_path)
+        if len(config_paths) == 1:
+            self.action_config_open(config_paths[0])
+        elif len(config_paths) > 1:
+            self.action_config_open_batch(config_paths)
 
     def on_shutdown(self, application):
         self.info('Shutdown')
@@ -125,10 +184,30 @@ class Application(Gtk.Application):
             self.multi_indicator.close()
         if hasattr(self, 'multi_notifier'):
             self.multi_notifier.close()
+        if self.profiler.profiling:
+            self.profiler.stop_profile()
+        self.profiler.stop_memory_tracing()
+        if hasattr(self, 'netdev_statistics'):
+            self.netdev_statistics.close()
+        if getattr(self, 'uplink_monitor', None) is not None:
+            self.uplink_monitor.close()
+        if getattr(self, 'sleep_monitor', None) is not None:
+            self.sleep_monitor.close()
+        if hasattr(self, 'configuration_importer'):
+            self.configuration_importer.cancel()
+        if getattr(self, 'session_snapshot', None) is not None:
+            self.save_session_snapshot()
+        if hasattr(self, 'session_registry'):
+            self.close_sessions()
+        if hasattr(self, 'state_service'):
+            self.state_service.unregister()
 
     def on_startup(self, data):
-        self.info(f'Startup')
+        self.info('Startup')
         DBusGMainLoop(set_as_default=True)
+        # Configuration imports call D-Bus from worker threads
+        dbus.mainloop.glib.threads_init()
+        self.construct_actions()
 
         bus = dbus.Bus()
         self.session_bus = bus
@@ -176,7 +255,7 @@ class Application(Gtk.Application):
             try:
                 cmgr_version = str(cmgr_prop.Get('net.openvpn.v3.configuration','version'))
             except dbus.exceptions.DBusException:
-                self.debug(f'Waiting for backend to start')
+                self.debug('Waiting for backend to start')
                 time.sleep(0.5)
                 cmgr_version = str(cmgr_prop.Get('net.openvpn.v3.configuration','version'))
             if cmgr_version.startswith('git:'):
@@ -189,31 +268,69 @@ class Application(Gtk.Application):
                 self.manager_version = int(re.split(r'[^0-9]', cmgr_version[1:], 1)[0])
         except:
             self.debug(traceback.format_exc())
-            self.warning(f'Backend version check failed')
+            self.warning('Backend version check failed')
         if self.manager_version < MANAGER_VERSION_MINIMUM:
-            self.error(f'You are using version {self.manager_version} of OpenVPN3 software which is not supported. Consider an upgrade to a newer version. We recommend version {MANAGER_VERSION_RECOMMENDED}.', notify=True)
+            self.error('You are using version %s of OpenVPN3 software which is not supported. Consider an upgrade to a newer version. We recommend version %s.', self.manager_version, MANAGER_VERSION_RECOMMENDED, notify=True)
         elif self.manager_version < MANAGER_VERSION_RECOMMENDED:
-            self.warning(f'You are using version {self.manager_version} of OpenVPN3 software. Consider an upgrade to a newer version. We recommend version {MANAGER_VERSION_RECOMMENDED}.', notify=True)
-        self.debug(f'Running with manager version {self.manager_version}')
+            self.warning('You are using version %s of OpenVPN3 software. Consider an upgrade to a newer version. We recommend version %s.', self.manager_version, MANAGER_VERSION_RECOMMENDED, notify=True)
+        self.debug('Running with manager version %s', self.manager_version)
+
+        self.configuration_importer = ConfigurationImporter(
+                self.import_configuration,
+                self.validate_configuration if self.manager_version >= 22 else None,
+                self.remove_configuration,
+                self.check_configuration,
+            )
+        self.import_dialogs = dict()
 
         self.credential_store = CredentialStore()
         if self.clear_secret_storage:
             for config in self.credential_store.keys():
                 credentials = self.credential_store[config]
                 for key in list(credentials.keys()):
-                    self.info(f'Removing entry {key} from secret storage')
+                    self.info('Removing entry %s from secret storage', key)
                     del credentials[key]
 
-        self.configs = dict()
-        self.sessions = dict()
-        self.sessions_connected = set()
-        self.config_names = dict()
-        self.name_configs = dict()
-        self.config_sessions = dict()
-        self.session_configs = dict()
-        self.failed_authentications = set()
-        self.session_dialogs = dict()
-        self.session_statuses = dict()
+        try:
+            history_directory = get_user_data_directory() / 'history'
+        except OSError:
+            self.debug(traceback.format_exc())
+            self.warning('Failed to create user data directory, running without connection history')
+            history_directory = None
+        self.init_sessions(history_directory)
+        try:
+            cache_directory = get_user_cache_directory()
+        except OSError:
+            self.debug(traceback.format_exc())
+            self.warning('Failed to create user cache directory, running without configuration index and session snapshot')
+            cache_directory = None
+        self.configuration_index = None
+        self.session_snapshot = None
+        if cache_directory is not None:
+            # Provisional view from the index, replaced by the first refresh_sessions
+            self.configuration_index = ConfigurationIndex(cache_directory / INDEX_FILE_NAME)
+            self.config_names = self.configuration_index.names()
+            self.name_configs = dict([(value, key) for key,value in self.config_names.items()])
+            self.config_sessions = dict([(config_id, list()) for config_id in self.config_names])
+            self.session_snapshot = SessionSnapshot(cache_directory / SNAPSHOT_FILE_NAME)
+        self.invalid_snapshot = False
+        self.netdev_statistics = NetdevStatisticsSource(self.get_session_device_name, fallback=self.get_session_statistics, on_switch=self.on_statistics_source_switch)
+        self.traffic_statistics = TrafficStatisticsCollector(self.netdev_statistics)
+        self.statistics_menu_items = dict()
+        self.session_log_dialogs = dict()
+        self.session_log_flush_pending = False
+        try:
+            self.uplink_monitor = UplinkMonitor(self.dbus, self.on_uplink_change, on_event=self.on_network_manager_event, is_tunnel_device=self.is_session_device)
+        except dbus.exceptions.DBusException:
+            self.debug(traceback.format_exc())
+            self.warning('Failed to watch network changes')
+            self.uplink_monitor = None
+        try:
+            self.sleep_monitor = SleepMonitor(self.dbus, self.on_sleep, self.on_wake)
+        except dbus.exceptions.DBusException:
+            self.debug(traceback.format_exc())
+            self.warning('Failed to watch system sleep')
+            self.sleep_monitor = None
 
         self.multi_indicator = MultiIndicator(f'{APPLICATION_NAME}')
         self.default_indicator = self.multi_indicator.new_indicator()
@@ -223,41 +340,183 @@ class Application(Gtk.Application):
         self.default_indicator.order_key='0'
         self.default_indicator.active=True
         self.indicators = dict()
-
-        self.last_invalid = time.monotonic()
-        self.invalid_sessions = True
         self.invalid_ui = True
 
-        self.startup_config_id = None
-        self.startup_config_name = None
-        try:
-            startup_action = self.settings.get_string('startup-action')
-            self.debug(f'Startup action: {startup_action}')
-            if startup_action == 'RESTART':
-                self.startup_config_id = self.settings.get_string('most-recent-configuration-id')
-            start_id = re.match(r'STARTID:(?P<id>.*)', startup_action)
-            if start_id:
-                self.startup_config_id = start_id.group('id')
-            start_name = re.match(r'STARTNAME:(?P<name>.*)', startup_action)
-            if start_name:
-                self.startup_config_name = start_name.group('name')
-        except:
-            pass
-        if self.startup_config_id or self.startup_config_name:
-            self.info(f'Startup configuration set to {self.startup_config_id or self.startup_config_name}')
-
+        self.restore_session_snapshot()
+        if len(self.config_names) > 0 or len(self.sessions) > 0:
+            self.refresh_ui()
+        self.state_service = StateService(self)
+        self.state_service.register(self.get_dbus_connection())
         GLib.timeout_add(1000, self.on_schedule)
         self.hold()
 
+    def restore_session_snapshot(self):
+        if self.session_snapshot is None:
+            return
+        snapshot = self.session_snapshot.load()
+        if snapshot is None:
+            return
+        for session_id, state in snapshot['sessions'].items():
+            try:
+                instrumentation.count('dbus.Retrieve')
+                session = self.session_manager.Retrieve(session_id)
+                self.subscribe_session_status(session_id, session)
+                status = {
+                    'major' : openvpn3.StatusMajor(state['major']),
+                    'minor' : openvpn3.StatusMinor(state['minor']),
+                    'message' : state['message'],
+                }
+            except: #TODO: Catch only expected exceptions
+                self.debug(traceback.format_exc())
+                continue
+            self.sessions[session_id] = session
+            self.session_statuses[session_id] = status
+            self.provisional_sessions.add(session_id)
+            config_id = state['config']
+            if config_id is not None:
+                self.session_configs[session_id] = config_id
+                self.config_sessions.setdefault(config_id, list()).append(session_id)
+        self.sessions_connected.update(snapshot['sessions_connected'].intersection(self.sessions))
+        self.failed_authentications.update(snapshot['failed_authentications'])
+        self.info('Restored %s sessions from snapshot', len(self.provisional_sessions))
+
+    def save_session_snapshot(self):
+        if self.session_snapshot is None:
+            return
+        sessions = dict()
+        for session_id in self.sessions:
+            status = self.session_statuses.get(session_id, None)
+            if status is None:
+                continue
+            sessions[session_id] = {
+                'config' : self.session_configs.get(session_id, None),
+                'major' : status['major'].value,
+                'minor' : status['minor'].value,
+                'message' : status['message'],
+            }
+        self.session_snapshot.save(sessions, self.sessions_connected.intersection(sessions), self.failed_authentications)
+
     def on_status_notifier_watcher_owner_changed(self, name, old_owner, new_owner):
         old_owner = str(old_owner)
         new_owner = str(new_owner)
-        self.info(f'StatusNotifierWatcher owner changed from {old_owner or "<none>"} to {new_owner or "<none>"}')
+        self.info('StatusNotifierWatcher owner changed from %s to %s', old_owner or '<none>', new_owner or '<none>')
         if not new_owner:
             return
         self.multi_indicator.reset()
+        self.invalidate_ui()
+
+    def construct_actions(self):
+        action = Gio.SimpleAction.new_stateful('instrumentation', None, GLib.Variant.new_boolean(instrumentation.enabled))
+        action.connect('change-state', self.action_instrumentation)
+        self.add_action(action)
+        action = Gio.SimpleAction.new('instrumentation-report', None)
+        action.connect('activate', self.action_instrumentation_report)
+        self.add_action(action)
+        action = Gio.SimpleAction.new_stateful('profile', None, GLib.Variant.new_boolean(self.profiler.profiling))
+        action.connect('change-state', self.action_profile)
+        self.add_action(action)
+        action = Gio.SimpleAction.new_stateful('memory-tracing', None, GLib.Variant.new_boolean(self.profiler.tracing))
+        action.connect('change-state', self.action_memory_tracing)
+        self.add_action(action)
+        action = Gio.SimpleAction.new('memory-snapshot', None)
+        action.connect('activate', self.action_memory_snapshot)
+        self.add_action(action)
+        action = Gio.SimpleAction.new('log-dump', None)
+        action.connect('activate', self.action_log_dump)
+        self.add_action(action)
+        action = Gio.SimpleAction.new('connection-trace', None)
+        action.connect('activate', self.action_connection_trace)
+        self.add_action(action)
+        GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGUSR1, self.on_signal_profile)
+        GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGUSR2, self.on_signal_memory_snapshot)
+
+    def action_instrumentation(self, action, value):
+        action.set_state(value)
+        instrumentation.enabled = value.get_boolean()
+        self.info('Instrumentation %s', 'enabled' if instrumentation.enabled else 'disabled')
+
+    def action_instrumentation_report(self, action, parameter):
+        try:
+            path = get_user_cache_file('instrumentation', 'txt')
+            path.write_text(instrumentation.report())
+            self.info('Instrumentation report written to %s', path, notify=True)
+        except OSError:
+            self.debug(traceback.format_exc())
+            self.warning('Failed to write instrumentation report')
+
+    def action_profile(self, action, value):
+        try:
+            if value.get_boolean():
+                self.profiler.start_profile()
+            else:
+                path = self.profiler.stop_profile()
+                if path is not None:
+                    self.info('Profile written to %s', path, notify=True)
+        except OSError:
+            self.debug(traceback.format_exc())
+            self.warning('Failed to write profile')
+        action.set_state(GLib.Variant.new_boolean(self.profiler.profiling))
+
+    def action_memory_tracing(self, action, value):
+        if value.get_boolean():
+            self.profiler.start_memory_tracing()
+        else:
+            self.profiler.stop_memory_tracing()
+        action.set_state(GLib.Variant.new_boolean(self.profiler.tracing))
+
+    def action_memory_snapshot(self, action, parameter):
+        try:
+            path = self.profiler.take_memory_snapshot()
+            if path is None:
+                self.info('Started memory tracing, the next snapshot is written to the cache directory', notify=True)
+            else:
+                self.info('Memory snapshot written to %s', path, notify=True)
+        except OSError:
+            self.debug(traceback.format_exc())
+            self.warning('Failed to write memory snapshot')
+        self.lookup_action('memory-tracing').set_state(GLib.Variant.new_boolean(self.profiler.tracing))
+
+    def action_log_dump(self, action, parameter):
+        if self.log_buffer is None:
+            return
+        try:
+            path = get_user_cache_file('log', 'txt')
+            path.write_text(self.log_buffer.dump())
+            self.info('Log written to %s', path, notify=True)
+        except OSError:
+            self.debug(traceback.format_exc())
+            self.warning('Failed to write log')
+
+    def action_connection_trace(self, action, parameter):
+        try:
+            path = get_user_cache_file('connections', 'json')
+            path.write_text(self.connection_timeline.chrome_trace(self.config_names))
+            path.with_suffix('.txt').write_text(self.connection_timeline.report(self.config_names))
+            session_names = dict((session_id, self.get_session_name(session_id)) for session_id in self.sessions)
+            path.with_suffix('.transitions.txt').write_text(self.session_state_machine.report(session_names))
+            self.info('Connection trace written to %s', path, notify=True)
+        except OSError:
+            self.debug(traceback.format_exc())
+            self.warning('Failed to write connection trace')
+
+    def on_signal_profile(self):
+        self.info('Received SIGUSR1')
+        self.activate_action('profile', None)
+        return True
+
+    def on_signal_memory_snapshot(self):
+        self.info('Received SIGUSR2')
+        self.activate_action('memory-snapshot', None)
+        return True
+
+    def invalidate_ui(self):
+        instrumentation.count('invalidate.ui')
         self.invalid_ui = True
 
+    def invalidate_snapshot(self):
+        self.invalid_snapshot = True
+
+    @instrumentation.timed('refresh_ui')
     def refresh_ui(self):
         if self.invalid_ui:
             new_indicators = dict()
@@ -271,7 +530,9 @@ class Application(Gtk.Application):
                     indicator.title = f'{APPLICATION_TITLE}: {session_name}'
                     indicator.order_key = f'1-{session_name}-{session_id}'
                     indicator.active = True
+                    self.session_registry.own(session_id, 'indicator', indicator, lambda indicator : indicator.close())
                 new_indicators[session_id] = indicator
+            self.statistics_menu_items = dict()
             new_notifiers = dict()
             for session_id in self.sessions:
                 notifier = self.notifiers.get(session_id, None)
@@ -282,6 +543,7 @@ class Application(Gtk.Application):
                     notifier.title = f'{APPLICATION_TITLE}: {session_name}'
                     notifier.body = self.session_description(session_id)
                     notifier.active = False
+                    self.session_registry.own(session_id, 'notifier', notifier, lambda notifier : notifier.close())
                 new_notifiers[session_id] = notifier
             for session_id, indicator in self.indicators.items():
                 if session_id not in new_indicators:
@@ -304,87 +566,34 @@ class Application(Gtk.Application):
             self.notifiers = new_notifiers
             self.invalid_ui = False
 
-    def refresh_sessions(self):
-        if self.invalid_sessions:
-            new_session_ids = set()
-            try:
-                new_sessions = dict()
-                for session in self.session_manager.FetchAvailableSessions():
-                    session_id = str(session.GetPath())
-                    if session_id not in self.sessions:
-                        new_sessions[session_id] = session
-                        session.StatusChangeCallback(lambda major, minor, message: self.on_session_event(session_id, major, minor, message))
-                        new_session_ids.add(session_id)
-                    else:
-                        new_sessions[session_id] = self.sessions[session_id]
-                new_configs = dict()
-                for config in self.config_manager.FetchAvailableConfigs():
-                    config_id = str(config.GetPath())
-                    if config_id not in self.configs:
-                        new_configs[config_id] = config
-                    else:
-                        new_configs[config_id] = self.configs[config_id]
-                new_config_names = dict()
-                for config_id, config in new_configs.items():
-                    config_name = str(config.GetConfigName())
-                    new_config_names[config_id] = config_name
-                new_config_sessions = dict()
-                new_session_configs = dict()
-                for config_id, config_name in new_config_names.items():
-                    new_config_sessions[config_id] = list()
-                    for session_id in self.session_manager.LookupConfigName(config_name):
-                        session_id = str(session_id)
-                        new_config_sessions[config_id].append(session_id)
-                        new_session_configs[session_id] = config_id
-                new_session_statuses = dict()
-                for session_id, session in new_sessions.items():
-                    status = session.GetStatus()
-                    new_session_statuses[session_id] = {
-                        'major' : openvpn3.StatusMajor(status['major']),
-                        'minor' : openvpn3.StatusMinor(status['minor']),
-                        'message' : str(status['message']),
-                    }
-                self.sessions = new_sessions
-                self.configs = new_configs
-                self.config_names = new_config_names
-                self.name_configs = dict([(value, key) for key,value in new_config_names.items()])
-                self.config_sessions = new_config_sessions
-                self.session_configs = new_session_configs
-                self.session_statuses = new_session_statuses
-
-                self.debug(f'Configs: {sorted(self.configs.keys())}')
-                self.debug(f'Sessions: {sorted(self.sessions.keys())}')
-                self.debug(f'Config names: {self.config_names}')
-                self.debug(f'Config sessions: {self.config_sessions}')
-                self.debug(f'Session configs: {self.session_configs}')
-                self.debug(f'Session statuses: {self.session_statuses}')
-                self.invalid_sessions = False
-                self.invalid_ui = True
-            except: #TODO: Catch only expected exceptions
-                self.debug(traceback.format_exc())
-                self.warning(f'Session list refresh failed')
-            for session_id in new_session_ids:
-                session_status = self.session_statuses[session_id]
-                self.on_session_event(session_id, session_status['major'], session_status['minor'], session_status['message'])
-            for session_id, dialog in list(self.session_dialogs.items()):
-                if session_id not in self.sessions:
-                    dialog.destroy()
-                    if session_id not in self.sessions:
-                        del self.session_dialogs[session_id]
-
-    def get_config_name(self, config_id):
-        return self.config_names.get(config_id, DEFAULT_CONFIG_NAME)
-
-    def get_session_name(self, session_id):
-        return self.get_config_name(self.session_configs.get(session_id, ''))
+    def sessions_refreshed(self):
+        if self.configuration_index is not None:
+            self.configuration_index.update(self.config_names)
+            self.configuration_index.save()
+        self.invalidate_snapshot()
+        self.traffic_statistics.retain(self.sessions)
+        self.netdev_statistics.retain(self.sessions)
+        self.invalidate_ui()
 
     def action_settings_startup(self, _object, value):
         self.settings.set_string('startup-action', value)
-        self.invalid_ui = True
+        self.invalidate_ui()
+        self.refresh_ui()
+
+    def action_settings_startup_name(self, _object, config_name):
+        startup_action, config_names = toggle_startup_name(
+                self.settings.get_string('startup-action'),
+                self.settings.get_strv('startup-configuration-names'),
+                config_name,
+            )
+        self.settings.set_strv('startup-configuration-names', config_names)
+        self.settings.set_string('startup-action', startup_action)
+        self.invalidate_ui()
         self.refresh_ui()
 
     def construct_menu_settings_startup(self):
         startup_action = self.settings.get_string('startup-action') or ''
+        _startup_ids, startup_names = parse_startup_action(startup_action, names=self.settings.get_strv('startup-configuration-names'))
         menu = Gtk.Menu()
         menu_action = ''
         menu_title = gettext.gettext('No Connection')
@@ -401,17 +610,26 @@ class Application(Gtk.Application):
         menu_item.connect('activate', self.action_settings_startup, menu_action)
         menu.append(menu_item)
         for config_name, config_id in sorted(self.name_configs.items()):
-            menu_action = f'STARTNAME:{config_name}'
             menu_title = gettext.gettext('Start {name}').format(name=config_name)
-            if startup_action == menu_action:
+            if config_name in startup_names:
                 menu_title += ' ✓'
             menu_item = Gtk.MenuItem.new_with_label(menu_title)
-            menu_item.connect('activate', self.action_settings_startup, menu_action)
+            menu_item.connect('activate', self.action_settings_startup_name, config_name)
             menu.append(menu_item)
         return menu
 
     def construct_menu_config(self, config_id):
         menu = Gtk.Menu()
+        entry = self.configuration_index[config_id] if self.configuration_index is not None else None
+        if entry is not None and entry['remote']:
+            menu_item = Gtk.MenuItem.new_with_label(gettext.gettext('Server: {remote}').format(remote=entry['remote']))
+            menu_item.set_sensitive(False)
+            menu.append(menu_item)
+        description = self.config_history_description(config_id)
+        if description:
+            menu_item = Gtk.MenuItem.new_with_label(description)
+            menu_item.set_sensitive(False)
+            menu.append(menu_item)
         menu_item = Gtk.MenuItem.new_with_label(gettext.gettext('Connect'))
         menu_item.connect('activate', self.action_config_connect, config_id)
         menu.append(menu_item)
@@ -427,6 +645,11 @@ class Application(Gtk.Application):
         minor = status['minor']
         menu_item = Gtk.MenuItem.new_with_label(self.get_session_name(session_id))
         menu.append(menu_item)
+        if openvpn3.StatusMajor.CONNECTION == major and openvpn3.StatusMinor.CONN_CONNECTED == minor:
+            menu_item = Gtk.MenuItem.new_with_label(self.session_statistics_description(session_id))
+            menu_item.set_sensitive(False)
+            menu.append(menu_item)
+            self.statistics_menu_items.setdefault(session_id, list()).append(menu_item)
 
         if False: #TODO: When does it make sense to allow explicit Connect?
             menu_item = Gtk.MenuItem.new_with_label(gettext.gettext('Connect'))
@@ -448,6 +671,10 @@ class Application(Gtk.Application):
             menu_item = Gtk.MenuItem.new_with_label(gettext.gettext('Disconnect'))
             menu_item.connect('activate', self.action_session_disconnect, session_id)
             menu.append(menu_item)
+        if True:
+            menu_item = Gtk.MenuItem.new_with_label(gettext.gettext('Show Log'))
+            menu_item.connect('activate', self.action_session_log, session_id)
+            menu.append(menu_item)
         return menu
 
     def construct_session_menu(self, session_id):
@@ -512,6 +739,42 @@ class Application(Gtk.Application):
         menu.show_all()
         return menu
 
+    def config_history_description(self, config_id):
+        if self.connection_history is None:
+            return None
+        history = self.connection_history[config_id]
+        if history is None or history.attempts == 0:
+            return None
+        description = gettext.gettext('Used {attempts} times, {failure_rate:.0%} failed').format(attempts=history.attempts, failure_rate=history.failure_rate)
+        if history.mean_time_to_connect is not None:
+            description += gettext.gettext(', connects in {seconds:.1f} s').format(seconds=history.mean_time_to_connect)
+        return description
+
+    def on_statistics_source_switch(self, session_id):
+        self.traffic_statistics.reset(session_id)
+
+    def get_session_statistics(self, session_id):
+        session = self.sessions.get(session_id, None)
+        if session is None:
+            return None
+        instrumentation.count('dbus.GetConnectionStats')
+        return session.GetConnectionStats()
+
+    def session_statistics_description(self, session_id):
+        rates = self.traffic_statistics.rates(session_id)
+        if rates is None:
+            return gettext.gettext('Collecting statistics')
+        rate_in, rate_out = rates
+        return gettext.gettext('↓ {rate_in}  ↑ {rate_out}').format(rate_in=format_rate(rate_in), rate_out=format_rate(rate_out))
+
+    def refresh_statistics(self):
+        for session_id in self.traffic_statistics.update(time.monotonic()):
+            menu_items = self.statistics_menu_items.get(session_id, None)
+            if menu_items:
+                description = self.session_statistics_description(session_id)
+                for menu_item in menu_items:
+                    menu_item.set_label(description)
+
     def session_icon(self, session_id):
         status = self.session_statuses[session_id]
         major = status['major']
@@ -536,104 +799,41 @@ class Application(Gtk.Application):
             notifier.timespan = 3
             notifier.active = True
 
-    def on_session_manager_event(self, event):
-        self.info(f'Session Manager Event {event}')
-        event_type = event.GetType()
-        if openvpn3.SessionManagerEventType.SESS_CREATED == event_type:
-            self.invalid_sessions = True
-        elif openvpn3.SessionManagerEventType.SESS_DESTROYED == event_type:
-            self.invalid_sessions = True
-
     def on_network_manager_event(self, event):
-        self.info(f'Network Manager Event {event}')
-
-    def can_store_input_slot(self, input_slot):
-        type, group = input_slot.GetTypeGroup()
-        result = type == openvpn3.ClientAttentionType.CREDENTIALS and group in [
-                openvpn3.ClientAttentionGroup.UNSET,
-                openvpn3.ClientAttentionGroup.USER_PASSWORD,
-                openvpn3.ClientAttentionGroup.HTTP_PROXY_CREDS,
-                openvpn3.ClientAttentionGroup.PK_PASSPHRASE,
-                #openvpn3.ClientAttentionGroup.CHALLENGE_STATIC,
-                #openvpn3.ClientAttentionGroup.CHALLENGE_DYNAMIC,
-                #openvpn3.ClientAttentionGroup.CHALLENGE_AUTH_PENDING,
-            ]
-        self.debug(f'Input slot {input_slot.GetLabel()} of type {type}, group {group} is decided {"not " if not result else ""}safe for storage')
-        return result
-        print(type,group)
-
-    def on_session_event(self, session_id, major, minor, message):
-        if session_id not in self.sessions:
-            return
-        session = self.sessions[session_id]
-        major = openvpn3.StatusMajor(major)
-        minor = openvpn3.StatusMinor(minor)
-        message = str(message)
-        self.info(f'Session Event {major} {minor} {message}')
-        self.session_statuses[session_id] = {
-            'major' : major,
-            'minor' : minor,
-            'message' : message,
-        }
-        self.invalid_ui = True
+        self.info('Network Manager Event %s', event)
 
-        if openvpn3.StatusMajor.CONNECTION == major and openvpn3.StatusMinor.CFG_OK == minor:
-            try:
-                if session_id not in self.sessions_connected:
-                    session.Ready()
-                    session.Connect()
-                    self.sessions_connected.add(session_id)
-            except: #TODO: Catch only expected exceptions
-                self.debug(traceback.format_exc())
-        if openvpn3.StatusMajor.SESSION == major and openvpn3.StatusMinor.SESS_AUTH_URL == minor:
-            self.action_auth_url(None, session_id, message)
-        if openvpn3.StatusMajor.SESSION == major and openvpn3.StatusMinor.PROC_STOPPED == minor:
-            pass
-        if openvpn3.StatusMajor.CONNECTION == major and openvpn3.StatusMinor.CONN_AUTH_FAILED == minor:
-            #TODO: Notify authentication failure
-            #TODO: Record authentication failure
+    def session_status_changed(self, session_id):
+        status = self.session_statuses[session_id]
+        self.invalidate_ui()
+        self.netdev_statistics.invalidate(session_id)
+        self.traffic_statistics.track(session_id, time.monotonic(), openvpn3.StatusMajor.CONNECTION == status['major'] and openvpn3.StatusMinor.CONN_CONNECTED == status['minor'])
+        self.invalidate_snapshot()
+        self.notify_session_change(session_id)
 
-            self.action_session_disconnect(None, session_id)
+    def on_session_require_user(self, event):
+        session_id = event.session_id
+        try:
+            required_credentials = self.session_required_credentials(session_id)
+            force_ui = False
             config_id = self.session_configs.get(session_id, None)
             if config_id is not None:
-                self.failed_authentications.add(config_id)
-                self.action_config_connect(None, config_id)
-        if openvpn3.StatusMajor.CONNECTION == major and openvpn3.StatusMinor.CONN_CONNECTED == minor:
-            config_id = self.session_configs.get(session_id, None)
-            if config_id is not None and config_id in self.failed_authentications:
-                self.failed_authentications.remove(config_id)
-
-        if openvpn3.StatusMajor.CONNECTION == major and openvpn3.StatusMinor.CONN_FAILED == minor:
-            #TODO: Notify connection failure
-            #TODO: Record connection failure
+                if config_id in self.failed_authentications:
+                    force_ui = True
+            self.action_get_credentials(None, session_id, required_credentials, force_ui=force_ui)
+        except: #TODO: Catch only expected exceptions
+            self.debug(traceback.format_exc())
+            #TODO: Catch only expected exceptions
+            #TODO: Notify authentication failure
+            #TODO: Record authentication failure
             self.action_session_disconnect(None, session_id)
-        if openvpn3.StatusMajor.CONNECTION == major and openvpn3.StatusMinor.CONN_DISCONNECTED == minor:
-            pass
-        if openvpn3.StatusMajor.CONNECTION == major and openvpn3.StatusMinor.CONN_DONE == minor:
-            pass
-        if openvpn3.StatusMajor.CONNECTION == major and openvpn3.StatusMinor.CFG_REQUIRE_USER == minor:
-            try:
-                required_credentials = list()
-                for input_slot in session.FetchUserInputSlots():
-                    if input_slot.GetTypeGroup()[0] != openvpn3.ClientAttentionType.CREDENTIALS:
-                        continue
-                    description = str(input_slot.GetLabel())
-                    mask = bool(input_slot.GetInputMask())
-                    can_store = self.can_store_input_slot(input_slot)
-                    required_credentials.append((description, mask, can_store))
-                force_ui = False
-                config_id = self.session_configs.get(session_id, None)
-                if config_id is not None:
-                    if config_id in self.failed_authentications:
-                        force_ui = True
-                self.action_get_credentials(None, session_id, required_credentials, force_ui=force_ui)
-            except: #TODO: Catch only expected exceptions
-                self.debug(traceback.format_exc())
-                #TODO: Catch only expected exceptions
-                #TODO: Notify authentication failure
-                #TODO: Record authentication failure
-                self.action_session_disconnect(None, session_id)
-        self.notify_session_change(session_id)
+
+    def on_session_auth_url(self, event):
+        self.action_auth_url(None, event.session_id, event.message)
+
+    def on_session_auth_retry(self, event):
+        config_id = self.session_configs[event.session_id]
+        self.failed_authentications.add(config_id)
+        self.schedule_reconnect(config_id)
 
     def action_auth_url(self, _object, session_id, url):
         webbrowser.open_new(url)
@@ -649,18 +849,12 @@ class Application(Gtk.Application):
             if key in credentials_keys:
                 del store[key]
 
-    def store_get_credentials(self, config_id):
-        credentials = dict()
-        store = self.credential_store[config_id]
-        for key in store.keys():
-            credentials[key] = store[key]
-        return credentials
-
     def action_get_credentials(self, _object, session_id, required_credentials, force_ui=False):
         credentials = dict()
         required_keys = set([ description for description, mask, can_store in required_credentials ])
         config_id = self.session_configs.get(session_id, None)
         if config_id is not None:
+            self.connection_timeline.begin(session_id, PHASE_CREDENTIAL_LOOKUP)
             for key, value in self.store_get_credentials(config_id).items():
                 if key in required_keys:
                     credentials[key] = value
@@ -681,6 +875,7 @@ class Application(Gtk.Application):
 
 
             def on_cancel():
+                self.session_registry.disown(session_id, 'credentials', dialog)
                 status = self.session_statuses.get(session_id, None)
                 if status is None:
                     return
@@ -688,8 +883,7 @@ class Application(Gtk.Application):
                 minor = status['minor']
                 if openvpn3.StatusMajor.CONNECTION == major and openvpn3.StatusMinor.CFG_REQUIRE_USER == minor:
                     self.action_session_disconnect(None, session_id)
-                if session_id in self.session_dialogs:
-                    del self.session_dialogs[session_id]
+                self.give_up(config_id)
 
             def on_connect(user_inputs, store):
                 credentials = dict([ (ui.name, ui.value) for ui in user_inputs ])
@@ -698,245 +892,261 @@ class Application(Gtk.Application):
                     self.store_set_credentials(config_id, store_credentials)
                 else:
                     self.store_clear_credentials(config_id, credentials.keys())
-                if session_id in self.session_dialogs:
-                    del self.session_dialogs[session_id]
+                self.session_registry.disown(session_id, 'credentials', dialog)
                 self.on_session_credentials(session_id, credentials)
 
             session_name = self.get_session_name(session_id)
-            def remain_active():
-                self.debug('Remain active')
-                if session_id in self.session_statuses:
-                    major = self.session_statuses[session_id]['major']
-                    minor = self.session_statuses[session_id]['minor']
-                    if openvpn3.StatusMajor.CONNECTION == major and openvpn3.StatusMinor.CFG_REQUIRE_USER == minor:
-                        return True
-                if session_id in self.session_dialogs:
-                    del self.session_dialogs[session_id]
-                return False
-            dialog = construct_credentials_dialog(session_name, user_inputs, on_connect=on_connect, on_cancel=on_cancel, remain_active=remain_active)
+            dialog = construct_credentials_dialog(session_name, user_inputs, on_connect=on_connect, on_cancel=on_cancel)
             dialog.set_visible(True)
-            if session_id in self.session_dialogs:
-                self.session_dialogs[session_id].destroy()
-            self.session_dialogs[session_id] = dialog
+            self.connection_timeline.begin(session_id, PHASE_USER_INPUT)
+            self.session_registry.own(session_id, 'credentials', dialog, close_credentials_dialog)
         else:
             self.on_session_credentials(session_id, credentials)
 
     def on_session_credentials(self, session_id, credentials):
-        session = self.sessions[session_id]
-        try:
-            for input_slot in session.FetchUserInputSlots():
-                if input_slot.GetTypeGroup()[0] != openvpn3.ClientAttentionType.CREDENTIALS:
-                    continue
-                input_slot.ProvideInput(credentials.get(input_slot.GetLabel(), ''))
-            session.Ready()
-            session.Connect()
-            self.sessions_connected.add(session_id)
-        except: #TODO: Catch only expected exceptions
-            self.debug(traceback.format_exc())
-            self.action_session_disconnect(None, session_id)
+        SessionController.on_session_credentials(self, session_id, credentials)
+        self.invalidate_snapshot()
 
     def on_schedule(self):
-        self.debug(f'Schedule')
-        if self.last_invalid + 30 < time.monotonic():
-            self.debug('Forced refresh of sessions')
-            self.invalid_sessions = True
-        if self.invalid_sessions:
-            self.last_invalid = time.monotonic()
-            self.refresh_sessions()
+        self.debug('Schedule')
+        self.schedule_sessions()
         if self.invalid_ui:
             self.refresh_ui()
+        self.refresh_statistics()
+        if self.invalid_snapshot:
+            self.invalid_snapshot = False
+            self.save_session_snapshot()
         self.multi_notifier.update()
-        if self.startup_config_id or self.startup_config_name:
-            config_id = self.startup_config_id or self.name_configs.get(self.startup_config_name, None)
-            if config_id and len(self.config_sessions[config_id]) == 0:
-                self.debug(f'Starting config {config_id} as requested in startup settings.')
-                self.action_config_connect(None, config_id)
-            self.startup_config_id = None
-            self.startup_config_name = None
+        self.state_service.update()
         GLib.timeout_add(1000, self.on_schedule)
 
     def action_config_connect(self, _object, config_id):
-        self.info(f'Connect Config {config_id}')
-        if config_id not in self.configs:
-            return
-        try:
-            session = self.session_manager.NewTunnel(self.configs[config_id])
-            self.settings.set_string('most-recent-configuration-id', config_id)
-        except: #TODO: Catch only expected exceptions
-            self.debug(traceback.format_exc())
-            pass
+        if SessionController.action_config_connect(self, _object, config_id):
+            if self.configuration_index is not None:
+                self.configuration_index.used(config_id)
+                self.configuration_index.save()
+            return True
+        return False
 
     def action_config_remove(self, _object, config_id):
-        self.info(f'Remove Config {config_id}')
+        self.info('Remove Config %s', config_id)
+        self.give_up(config_id)
         if config_id not in self.configs:
             return
         try:
             def on_remove():
                 if config_id not in self.configs:
                     return
+                instrumentation.count('dbus.Remove')
                 self.configs[config_id].Remove()
-                self.invalid_sessions = True
+                self.invalidate_sessions()
             dialog = construct_configuration_remove_dialog(name=self.get_config_name(config_id), on_remove=on_remove)
             dialog.set_visible(True)
         except: #TODO: Catch only expected exceptions
             self.debug(traceback.format_exc())
             pass
 
-    def action_session_connect(self, _object, session_id):
-        self.info(f'Connect Session {session_id}')
+    def action_session_log(self, _object, session_id):
+        self.info('Show Log Session %s', session_id)
         if session_id not in self.sessions:
             return
-        try:
-            self.sessions[session_id].Connect()
-        except: #TODO: Catch only expected exceptions
-            self.debug(traceback.format_exc())
-            pass
-
-    def action_session_pause(self, _object, session_id):
-        self.info(f'Pause Session {session_id}')
-        if session_id not in self.sessions:
+        dialog = self.session_log_dialogs.get(session_id, None)
+        if dialog is not None:
+            dialog.present()
             return
-        try:
-            self.sessions[session_id].Pause()
-        except: #TODO: Catch only expected exceptions
-            self.debug(traceback.format_exc())
-            pass
+        log = self.subscribe_session_log(session_id)
+        log.take_pending()
 
-    def action_session_resume(self, _object, session_id):
-        self.info(f'Resume Session {session_id}')
-        if session_id not in self.sessions:
+        def on_close():
+            if self.session_log_dialogs.get(session_id, None) is dialog:
+                del self.session_log_dialogs[session_id]
+            self.session_registry.disown(session_id, 'log_dialog', dialog)
+            self.session_registry.release(session_id, 'log')
+
+        dialog = construct_session_log_dialog(self.get_session_name(session_id), entries=log.entries(), capacity=log.capacity, on_close=on_close)
+        dialog.set_visible(True)
+        self.session_log_dialogs[session_id] = dialog
+        self.session_registry.own(session_id, 'log_dialog', dialog, lambda dialog : dialog.destroy())
+
+    def on_session_log(self, session_id, group, category, message):
+        SessionController.on_session_log(self, session_id, group, category, message)
+        if session_id in self.session_logs and not self.session_log_flush_pending:
+            self.session_log_flush_pending = True
+            GLib.timeout_add(SESSION_LOG_FLUSH_INTERVAL, self.flush_session_logs)
+
+    def flush_session_logs(self):
+        self.session_log_flush_pending = False
+        for session_id, dialog in list(self.session_log_dialogs.items()):
+            log = self.session_logs.get(session_id, None)
+            if log is not None:
+                append_session_log_entries(dialog, log.take_pending())
+        return False
+
+    def check_configuration(self, config_description):
+        # Called in an import worker thread
+        problems = validate_configuration_lines(config_description.splitlines())
+        for problem in problems:
+            if not problem.fatal:
+                self.debug('Configuration line %s: %s', problem.line, problem.message)
+        if any(problem.fatal for problem in problems):
+            raise ConfigurationSyntaxError(problems)
+
+    def import_configuration(self, name, config_description):
+        # Called in an import worker thread
+        import_args = dict()
+        if self.manager_version > 20:
+            # system_tag arrived in openvpn3-linux v21
+            import_args['system_tag'] = APPLICATION_SYSTEM_TAG
+        instrumentation.count('dbus.Import')
+        return self.config_manager.Import(name, config_description, single_use=False, persistent=True, **import_args)
+
+    def validate_configuration(self, config_obj):
+        # Called in an import worker thread
+        instrumentation.count('dbus.Validate')
+        return config_obj.Validate()
+
+    def remove_configuration(self, config_obj):
+        # Called in an import worker thread
+        if config_obj is None:
             return
-        try:
-            self.sessions[session_id].Resume()
-        except: #TODO: Catch only expected exceptions
-            self.debug(traceback.format_exc())
-            pass
+        # Not self.info, notifications must not be built outside of the main loop
+        logging.info('Removing Config %s', config_obj.GetPath())
+        instrumentation.count('dbus.Remove')
+        config_obj.Remove()
 
-    def action_session_restart(self, _object, session_id):
-        self.info(f'Restart Session {session_id}')
-        if session_id not in self.sessions:
+    def on_config_import(self, name, path):
+        self.info('Import Config %s %s', name, path)
+        job = self.configuration_importer.submit(name, path, on_progress=self.on_config_import_progress, on_done=self.on_config_import_done)
+        GLib.timeout_add(IMPORT_PROGRESS_DELAY, self.on_config_import_slow, job)
+
+    def on_config_import_slow(self, job):
+        # Only imports that take a while get a progress dialog
+        if job.finished is None and job not in self.import_dialogs:
+            dialog = construct_configuration_progress_dialog(name=job.name, path=job.path, on_cancel=job.cancel)
+            self.import_dialogs[job] = dialog
+            self.on_config_import_progress(job)
+        return False
+
+    def on_config_import_progress(self, job):
+        self.debug('Import Config %s %s', job.name, job.stage)
+        dialog = self.import_dialogs.get(job, None)
+        if dialog is not None:
+            set_configuration_progress(dialog, IMPORT_STAGE_LABELS.get(job.stage, job.stage), job.fraction)
+
+    def on_config_import_done(self, job):
+        dialog = self.import_dialogs.pop(job, None)
+        if dialog is not None:
+            dialog.destroy()
+        if job.cancelled:
+            self.info('Import of config %s from %s cancelled', job.name, job.path)
             return
-        try:
-            self.sessions[session_id].Restart()
-        except: #TODO: Catch only expected exceptions
-            self.debug(traceback.format_exc())
-            pass
+        if job.error is None:
+            self.invalidate_sessions()
+            self.index_imported_configuration(job)
+            self.info('Successfully imported config %s from %s', job.name, job.path, notify=True)
+            return
+        message = self.config_import_error_message(job)
+        self.error(
+            msg=message,
+            notify=False,
+            dialog=True,
+            title="Configuration Import Failed"
+        )
 
-    def action_session_disconnect(self, _object, session_id):
-        self.info(f'Disconnect Session {session_id}')
-        if session_id not in self.sessions:
+    def index_imported_configuration(self, job):
+        # The head was scanned by the importer, the file is not read again
+        if self.configuration_index is None or job.head is None:
             return
         try:
-            self.sessions[session_id].Disconnect()
+            config_id = str(job.config.GetPath())
         except: #TODO: Catch only expected exceptions
             self.debug(traceback.format_exc())
-            pass
-
-    def on_config_import(self, name, path):
-        self.info(f'Import Config {name} {path}')
-        try:
-            try:
-                config_description = pathlib.Path(path).read_text()
-            except FileNotFoundError:
-                self.error(
-                    msg=f"Configuration file not found: {path}",
-                    notify=False,
-                    dialog=True,
-                    title="Configuration Import Failed"
-                )
-                return
-            except PermissionError:
-                self.error(
-                    msg=f"Permission denied accessing file: {path}",
-                    notify=False,
-                    dialog=True,
-                    title="Configuration Import Failed"
-                )
-                return
-            except UnicodeDecodeError:
-                self.error(
-                    msg=f"File encoding error: {path}\nUnable to read file as text. Please check if this is a valid OpenVPN configuration file.",
-                    notify=False,
-                    dialog=True,
-                    title="Configuration Import Failed"
-                )
-                return
-            except OSError as e:
-                self.error(
-                    msg=f"Error reading file: {path}\n{str(e)}",
-                    notify=False,
-                    dialog=True,
-                    title="Configuration Import Failed"
-                )
-                return
-            try:
-                import_args = dict()
-                if self.manager_version > 20:
-                    # system_tag arrived in openvpn3-linux v21
-                    import_args['system_tag'] = APPLICATION_SYSTEM_TAG
-                config_obj = self.config_manager.Import(name, config_description, single_use=False, persistent=True, **import_args)
-            except dbus.exceptions.DBusException as excp:
-                msg = excp.get_dbus_message()
-                msg = re.sub(r'^.*GDBus.Error:[^\s]*', '', msg).strip()
-                self.error(
-                    msg=f"Failed to import configuration {name}:\n{msg}",
-                    notify=False,
-                    dialog=True,
-                    title="Configuration Import Failed"
-                )
-                return
-            except Exception as e:
-                self.error(
-                    msg=f"Unexpected error during configuration import:\n{str(e)}",
-                    notify=False,
-                    dialog=True,
-                    title="Configuration Import Failed"
-                )
-                return
-            if self.manager_version >= 22:
-                try:
-                    v = config_obj.Validate()
-                except dbus.exceptions.DBusException as excp:
-                    msg = excp.get_dbus_message()
-                    msg = re.sub(r'^.*GDBus.Error:[^\s]*', '', msg).strip()
-                    self.error(
-                        msg=f"OpenVPN Config {name} imported from {path} failed validation:\n{msg}",
-                        notify=False,
-                        dialog=True,
-                        title="Configuration Import Failed"
-                    )
-                    self.info(f'Removing Config {name}')
-                    config_obj.Remove()
-                    return
-
-            self.invalid_sessions = True
-            self.info(msg=f'Successfully imported config {name} from {path}', notify=True)
-        except:
-            self.debug(traceback.format_exc())
-            self.error(
-                msg=f"Unexpected error importing configuration {name} from {path}",
-                notify=False,
-                dialog=True,
-                title="Configuration Import Failed"
-            )
+            return
+        self.configuration_index.update(dict(self.configuration_index.names(), **{ config_id : job.name }))
+        self.configuration_index.set_remote(config_id, job.head.remotes[0] if job.head.remotes else None)
+        self.configuration_index.save()
+
+    def config_import_error_message(self, job):
+        name, path, error = job.name, job.path, job.error
+        if isinstance(error, dbus.exceptions.DBusException):
+            msg = error.get_dbus_message()
+            msg = re.sub(r'^.*GDBus.Error:[^\s]*', '', msg).strip()
+            if job.error_stage == STAGE_VALIDATING:
+                return f"OpenVPN Config {name} imported from {path} failed validation:\n{msg}"
+            return f"Failed to import configuration {name}:\n{msg}"
+        if isinstance(error, ConfigurationSyntaxError):
+            return f"OpenVPN Config {name} from {path} is not valid:\n{error}"
+        if isinstance(error, UnicodeDecodeError):
+            return f"File encoding error: {path}\nUnable to read file as text. Please check if this is a valid OpenVPN configuration file."
+        if isinstance(error, GLib.Error):
+            if error.matches(Gio.io_error_quark(), Gio.IOErrorEnum.NOT_FOUND):
+                return f"Configuration file not found: {path}"
+            if error.matches(Gio.io_error_quark(), Gio.IOErrorEnum.PERMISSION_DENIED):
+                return f"Permission denied accessing file: {path}"
+            return f"Error reading file: {path}\n{error.message}"
+        if job.error_stage == STAGE_IMPORTING:
+            return f"Unexpected error during configuration import:\n{str(error)}"
+        return f"Unexpected error importing configuration {name} from {path}"
 
     def action_config_import(self, _object):
-        self.info(f'Import Config')
+        self.info('Import Config')
         dialog = construct_configuration_select_dialog(on_import=self.on_config_import)
         dialog.set_visible(True)
 
     def action_config_open(self, path):
-        self.info(f'Import Config {path}')
+        self.info('Import Config %s', path)
         dialog = construct_configuration_import_dialog(path=path, on_import=self.on_config_import)
         dialog.set_visible(True)
 
+    def action_config_open_batch(self, paths):
+        self.info('Import Configs %s', paths)
+        jobs = list()
+
+        def on_import(entries):
+            for name, path in entries:
+                jobs.append(self.configuration_importer.submit(name, path, on_progress=on_progress, on_done=on_done))
+            if len(jobs) == 0:
+                set_configuration_batch_summary(dialog, gettext.gettext('Nothing to import'))
+
+        def on_cancel():
+            dialog.batch_closed = True
+            for job in jobs:
+                job.cancel()
+
+        def on_progress(job):
+            if job.finished is None and not dialog.batch_closed:
+                set_configuration_batch_status(dialog, job.path, IMPORT_STAGE_LABELS.get(job.stage, job.stage))
+
+        def on_done(job):
+            if dialog.batch_closed:
+                return
+            if job.cancelled:
+                set_configuration_batch_status(dialog, job.path, gettext.gettext('Cancelled'))
+            elif job.error is None:
+                self.invalidate_sessions()
+                self.index_imported_configuration(job)
+                set_configuration_batch_status(dialog, job.path, gettext.gettext('Imported'))
+            else:
+                message = self.config_import_error_message(job)
+                self.warning('%s', message)
+                set_configuration_batch_status(dialog, job.path, gettext.gettext('Failed: {reason}').format(reason=' '.join(message.split('\n')[1:]) or message), message)
+            if all(job.finished is not None for job in jobs):
+                imported = len([ job for job in jobs if job.succeeded ])
+                summary = gettext.gettext('Imported {imported} of {total} configurations').format(imported=imported, total=len(jobs))
+                set_configuration_batch_summary(dialog, summary)
+                self.info('%s', summary, notify=True)
+
+        dialog = construct_configuration_batch_import_dialog(paths, on_import=on_import, on_cancel=on_cancel)
+        dialog.batch_closed = False
+        dialog.set_visible(True)
+
     def action_about(self, _object):
-        self.info(f'About')
+        self.info('About')
         dialog = construct_about_dialog()
         dialog.set_visible(True)
 
     def action_quit(self, _object):
-        self.info(f'Quit')
+        self.info('Quit')
         self.release()
 
     def logging_notify(self, msg, title=f'{APPLICATION_NAME}', icon='active'):
@@ -952,29 +1162,35 @@ class Application(Gtk.Application):
         )
         self.multi_notifier.update()
 
-    def debug(self, msg, notify=False, *args, **kwargs):
+    def debug(self, msg, *args, notify=False, **kwargs):
         logging.debug(msg, *args, **kwargs)
         if notify:
-            self.logging_notify(msg)
+            self.logging_notify(msg % args if args else msg)
 
-    def info(self, msg, notify=False, dialog=False, title=None, *args, **kwargs):
+    def info(self, msg, *args, notify=False, dialog=False, title=None, **kwargs):
         logging.info(msg, *args, **kwargs)
+        if args and (notify or dialog):
+            msg = msg % args
         if notify:
             self.logging_notify(msg)
 
         if dialog:
             show_info_notification(title=title, message=msg)
 
-    def warning(self, msg, notify=False, dialog=False, title=None, *args, **kwargs):
+    def warning(self, msg, *args, notify=False, dialog=False, title=None, **kwargs):
         logging.warning(msg, *args, **kwargs)
+        if args and (notify or dialog):
+            msg = msg % args
         if notify:
             self.logging_notify(msg, icon='active-error')
 
         if dialog:
             show_warning_notification(title=title, message=msg)
 
-    def error(self, msg, notify=False, dialog=False, title=None, *args, **kwargs):
+    def error(self, msg, *args, notify=False, dialog=False, title=None, **kwargs):
         logging.error(msg, *args, **kwargs)
+        if args and (notify or dialog):
+            msg = msg % args
         if notify:
             self.logging_notify(msg, icon="active-error")
 
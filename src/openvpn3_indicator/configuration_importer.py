@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+#
+# openvpn3-indicator - Simple indicator application for OpenVPN3.
+# Copyright (C) 2024 Grzegorz Gutowski <grzegorz.gutowski@uj.edu.pl>
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License,
+# or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.
+# If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+import collections
+import io
+import logging
+import threading
+import time
+import traceback
+
+from gi.repository import GLib, Gio
+
+from openvpn3_indicator.configuration_parser import scan_configuration_head
+
+# Bounds the number of concurrent Import and Validate calls
+IMPORT_WORKERS = 4
+
+STAGE_QUEUED = 'queued'
+STAGE_READING = 'reading'
+STAGE_CHECKING = 'checking'
+STAGE_IMPORTING = 'importing'
+STAGE_VALIDATING = 'validating'
+STAGE_DONE = 'done'
+
+STAGE_FRACTIONS = {
+    STAGE_QUEUED : 0.0,
+    STAGE_READING : 0.1,
+    STAGE_CHECKING : 0.2,
+    STAGE_IMPORTING : 0.4,
+    STAGE_VALIDATING : 0.7,
+    STAGE_DONE : 1.0,
+}
+
+###
+#
+# ImportJob
+#
+###
+
+
+class ImportJob:
+
+    @property
+    def fraction(self):
+        return STAGE_FRACTIONS.get(self.stage, 0.0)
+
+    @property
+    def cancelled(self):
+        return self.cancellable.is_cancelled()
+
+    @property
+    def succeeded(self):
+        return self.stage == STAGE_DONE and self.error is None and not self.cancelled
+
+    @property
+    def duration(self):
+        if self.finished is None:
+            return None
+        return self.finished - self.started
+
+    def __init__(self, name, path, on_progress=None, on_done=None):
+        self.name = name
+        self.path = path
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.cancellable = Gio.Cancellable()
+        self.stage = STAGE_QUEUED
+        # Stage in which the error happened
+        self.error = None
+        self.error_stage = None
+        self.config = None
+        # Head of the imported text, the rest of it is not kept
+        self.head = None
+        self.started = time.monotonic()
+        self.finished = None
+        self.running = False
+
+    def cancel(self):
+        self.cancellable.cancel()
+
+###
+#
+# ConfigurationImporter
+#
+###
+
+
+class ConfigurationImporter:
+    # Reads files with Gio on the main loop, and runs the blocking D-Bus
+    # Import and Validate calls in worker threads. Callbacks of jobs are
+    # always called on the main loop.
+
+    def __init__(self, import_configuration, validate_configuration=None, remove_configuration=None, check_configuration=None, workers=IMPORT_WORKERS):
+        self._import_configuration = import_configuration
+        self._check_configuration = check_configuration
+        self._validate_configuration = validate_configuration
+        self._remove_configuration = remove_configuration
+        self._workers = workers
+        self._jobs = set()
+        self._queue = collections.deque()
+        self._running = 0
+
+    def jobs(self):
+        return list(self._jobs)
+
+    def submit(self, name, path, on_progress=None, on_done=None):
+        job = ImportJob(name, path, on_progress=on_progress, on_done=on_done)
+        self._jobs.add(job)
+        self._queue.append(job)
+        self.start_queued()
+        return job
+
+    def start_queued(self):
+        while self._running < self._workers and len(self._queue) > 0:
+            job = self._queue.popleft()
+            if job.cancelled:
+                GLib.idle_add(self.finish, job)
+                continue
+            self._running += 1
+            self.start(job)
+
+    def start(self, job):
+        job.running = True
+        self.set_stage(job, STAGE_READING)
+        Gio.File.new_for_path(job.path).load_contents_async(job.cancellable, self.on_loaded, job)
+
+    def set_stage(self, job, stage):
+        job.stage = stage
+        if job.on_progress is not None:
+            job.on_progress(job)
+        return False
+
+    def on_loaded(self, source, result, job):
+        try:
+            _ok, contents, _etag = source.load_contents_finish(result)
+            text = bytes(contents).decode('utf-8')
+        except (GLib.Error, UnicodeDecodeError) as error:
+            if isinstance(error, GLib.Error) and error.matches(Gio.io_error_quark(), Gio.IOErrorEnum.CANCELLED):
+                self.finish(job)
+                return
+            self.fail(job, STAGE_READING, error)
+            self.finish(job)
+            return
+        if job.cancelled:
+            self.finish(job)
+            return
+        self.set_stage(job, STAGE_CHECKING if self._check_configuration is not None else STAGE_IMPORTING)
+        thread = threading.Thread(target=self.run, args=(job, text), name=f'import {job.name}', daemon=True)
+        thread.start()
+
+    def fail(self, job, stage, error):
+        job.error = error
+        job.error_stage = stage
+        logging.debug('Import of %s from %s failed while %s: %s', job.name, job.path, stage, error)
+
+    def run(self, job, text):
+        # Worker thread, only touches the job and the D-Bus callables
+        if self._check_configuration is not None:
+            # Local check fails fast, before anything is created in the backend
+            try:
+                self._check_configuration(text)
+            except Exception as error:
+                self.fail(job, STAGE_CHECKING, error)
+                GLib.idle_add(self.finish, job)
+                return
+            if job.cancelled:
+                GLib.idle_add(self.finish, job)
+                return
+            GLib.idle_add(self.set_stage, job, STAGE_IMPORTING)
+        try:
+            job.config = self._import_configuration(job.name, text)
+        except Exception as error:
+            logging.debug(traceback.format_exc())
+            self.fail(job, STAGE_IMPORTING, error)
+            GLib.idle_add(self.finish, job)
+            return
+        job.head = scan_configuration_head(io.StringIO(text))
+        if self._validate_configuration is not None and not job.cancelled:
+            GLib.idle_add(self.set_stage, job, STAGE_VALIDATING)
+            try:
+                self._validate_configuration(job.config)
+            except Exception as error:
+                logging.debug(traceback.format_exc())
+                self.fail(job, STAGE_VALIDATING, error)
+        if (job.error is not None or job.cancelled) and self._remove_configuration is not None:
+            try:
+                self._remove_configuration(job.config)
+            except Exception:
+                logging.debug(traceback.format_exc())
+            job.config = None
+        GLib.idle_add(self.finish, job)
+
+    def finish(self, job):
+        job.finished = time.monotonic()
+        self._jobs.discard(job)
+        if job.running:
+            job.running = False
+            self._running -= 1
+            self.start_queued()
+        self.set_stage(job, STAGE_DONE)
+        logging.debug('Import of %s from %s finished in %.3fs', job.name, job.path, job.duration)
+        if job.on_done is not None:
+            job.on_done(job)
+        return False
+
+    def cancel(self):
+        for job in list(self._jobs):
+            job.cancel()
+        while len(self._queue) > 0:
+            GLib.idle_add(self.finish, self._queue.popleft())
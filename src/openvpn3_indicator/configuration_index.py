@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+#
+# openvpn3-indicator - Simple indicator application for OpenVPN3.
+# Copyright (C) 2024 Grzegorz Gutowski <grzegorz.gutowski@uj.edu.pl>
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License,
+# or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.
+# If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+import json
+import logging
+import os
+import pathlib
+import time
+import traceback
+
+INDEX_FILE_NAME = 'configurations.json'
+INDEX_VERSION = 1
+
+###
+#
+# ConfigurationIndex
+#
+###
+
+
+class ConfigurationIndex:
+    # Persisted metadata of configurations known from the backend, good
+    # enough to show menus before the backend has answered
+
+    @property
+    def path(self):
+        return self._path
+
+    def __init__(self, path):
+        self._path = pathlib.Path(path)
+        self._entries = dict()
+        self._dirty = False
+        self.load()
+
+    def load(self):
+        self._entries = dict()
+        try:
+            with open(self._path, 'r', encoding='utf-8') as stream:
+                data = json.load(stream)
+            if data.get('version', None) != INDEX_VERSION:
+                return
+            for config_id, entry in data.get('configurations', dict()).items():
+                if not isinstance(entry, dict) or not isinstance(entry.get('name', None), str):
+                    continue
+                self._entries[str(config_id)] = {
+                    'name' : entry['name'],
+                    'remote' : entry.get('remote', None),
+                    'last_used' : entry.get('last_used', None),
+                    'use_count' : int(entry.get('use_count', 0)),
+                }
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError, AttributeError):
+            logging.debug(traceback.format_exc())
+            logging.warning('Ignoring unreadable configuration index %s', self._path)
+
+    def save(self):
+        if not self._dirty:
+            return
+        data = { 'version' : INDEX_VERSION, 'configurations' : self._entries }
+        temporary = self._path.with_name(f'.{self._path.name}.{os.getpid()}.tmp')
+        try:
+            self._path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            with open(temporary, 'w', encoding='utf-8') as stream:
+                json.dump(data, stream, indent=1, sort_keys=True)
+            os.replace(temporary, self._path)
+            self._dirty = False
+        except OSError:
+            logging.debug(traceback.format_exc())
+            logging.warning('Failed to write configuration index %s', self._path)
+            try:
+                os.unlink(temporary)
+            except OSError:
+                pass
+
+    def __contains__(self, config_id):
+        return config_id in self._entries
+
+    def __getitem__(self, config_id):
+        entry = self._entries.get(config_id, None)
+        return dict(entry) if entry is not None else None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def names(self):
+        return dict((config_id, entry['name']) for config_id, entry in self._entries.items())
+
+    def update(self, config_names):
+        # Reconciles with the configurations listed by the backend
+        for config_id in list(self._entries):
+            if config_id not in config_names:
+                del self._entries[config_id]
+                self._dirty = True
+        for config_id, name in config_names.items():
+            entry = self._entries.get(config_id, None)
+            if entry is None:
+                self._entries[config_id] = { 'name' : name, 'remote' : None, 'last_used' : None, 'use_count' : 0 }
+                self._dirty = True
+            elif entry['name'] != name:
+                entry['name'] = name
+                self._dirty = True
+
+    def set_remote(self, config_id, remote):
+        entry = self._entries.get(config_id, None)
+        if entry is not None and entry['remote'] != remote:
+            entry['remote'] = remote
+            self._dirty = True
+
+    def used(self, config_id, now=None):
+        entry = self._entries.get(config_id, None)
+        if entry is not None:
+            entry['last_used'] = now if now is not None else time.time()
+            entry['use_count'] += 1
+            self._dirty = True
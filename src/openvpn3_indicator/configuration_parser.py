@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+#
+# openvpn3-indicator - Simple indicator application for OpenVPN3.
+# Copyright (C) 2024 Grzegorz Gutowski <grzegorz.gutowski@uj.edu.pl>
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License,
+# or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.
+# If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+import collections
+import os
+import re
+
+# Reading stops after this many bytes when only the head of a file is needed
+CONFIGURATION_HEAD_LIMIT = 16 * 1024
+
+INLINE_TAG_PATTERN = re.compile(r'^\s*<(?P<closing>/?)(?P<tag>[A-Za-z0-9_-]+)>\s*$')
+PROFILE_COMMENT_PATTERN = re.compile(r'^\s*#\s*OVPN_ACCESS_SERVER_PROFILE\s*=\s*(?P<profile>\S+)')
+
+ConfigurationHead = collections.namedtuple(
+        'ConfigurationHead',
+        ['friendly_name', 'profile', 'remotes']
+    )
+
+
+def tokenize_line(line):
+    # Splits a configuration line into tokens like OpenVPN does,
+    # honouring quotes and backslash escapes, and dropping comments
+    tokens = list()
+    token = None
+    quote = None
+    escape = False
+    for character in line:
+        if escape:
+            token = (token or '') + character
+            escape = False
+        elif character == '\\' and quote != "'":
+            escape = True
+            token = token or ''
+        elif quote is not None:
+            if character == quote:
+                quote = None
+            else:
+                token += character
+        elif character in '"\'':
+            quote = character
+            token = token or ''
+        elif character.isspace():
+            if token is not None:
+                tokens.append(token)
+                token = None
+        elif character in '#;' and token is None:
+            break
+        else:
+            token = (token or '') + character
+    if token is not None:
+        tokens.append(token)
+    if tokens and tokens[0].startswith('--'):
+        tokens[0] = tokens[0][2:]
+    return tokens
+
+
+def iter_head_lines(path, limit=CONFIGURATION_HEAD_LIMIT):
+    # At most limit bytes are read, even from a file without line breaks.
+    # The last line is dropped when it was cut by the limit.
+    with open(path, 'rb') as stream:
+        head = stream.read(limit + 1)
+    lines = head[:limit].splitlines(keepends=True)
+    if len(head) > limit and lines and not lines[-1].endswith(b'\n'):
+        lines.pop()
+    for line in lines:
+        yield line.decode('utf-8', errors='replace')
+
+
+def scan_configuration_head(lines):
+    # Stops at the first inline block, keys and certificates are never read
+    friendly_name = None
+    profile = None
+    remotes = list()
+    for line in lines:
+        if INLINE_TAG_PATTERN.match(line):
+            break
+        match = PROFILE_COMMENT_PATTERN.match(line)
+        if match and profile is None:
+            profile = match.group('profile')
+            continue
+        tokens = tokenize_line(line)
+        if len(tokens) == 0:
+            continue
+        directive = tokens[0].lower()
+        if directive == 'setenv' and len(tokens) >= 3:
+            key = tokens[1].upper()
+            if key == 'FRIENDLY_NAME' and friendly_name is None:
+                friendly_name = tokens[2]
+            elif key == 'PROFILE' and profile is None:
+                profile = tokens[2]
+        elif directive == 'remote' and len(tokens) >= 2:
+            remotes.append(tokens[1])
+    return ConfigurationHead(friendly_name=friendly_name, profile=profile, remotes=remotes)
+
+
+def guess_name(path, head=None):
+    try:
+        head = head or scan_configuration_head(iter_head_lines(path))
+    except OSError:
+        head = ConfigurationHead(friendly_name=None, profile=None, remotes=[])
+    for name in [head.friendly_name, head.profile]:
+        if name and name.strip():
+            return name.strip()
+    stem = os.path.splitext(os.path.basename(path))[0].strip()
+    # Generic file names like client.ovpn say less than the server name
+    if head.remotes and stem.lower() in ['', 'client', 'config', 'profile', 'openvpn', 'vpn']:
+        return head.remotes[0]
+    return stem or (head.remotes[0] if head.remotes else None)
+
+# Inline blocks with raw content, and <connection> blocks with directives
+INLINE_BLOCKS = set([
+    'ca', 'cert', 'key', 'extra-certs', 'dh', 'pkcs12', 'secret', 'crl-verify',
+    'tls-auth', 'tls-crypt', 'tls-crypt-v2', 'http-proxy-user-pass', 'auth-user-pass',
+    'peer-fingerprint',
+])
+CONNECTION_BLOCK = 'connection'
+CONFIGURATION_PROBLEMS_REPORTED = 5
+
+KNOWN_DIRECTIVES = set([
+    'allow-compression', 'allow-pull-fqdn', 'allow-recursive-routing', 'auth', 'auth-gen-token',
+    'auth-gen-token-secret', 'auth-nocache', 'auth-retry', 'auth-token', 'auth-token-user',
+    'auth-user-pass', 'auth-user-pass-verify', 'block-outside-dns', 'ca', 'ccd-exclusive', 'cd',
+    'cert', 'chroot', 'cipher', 'client', 'client-cert-not-required', 'client-config-dir',
+    'client-connect', 'client-disconnect', 'client-to-client', 'comp-lzo', 'compress',
+    'connect-retry', 'connect-retry-max', 'connect-timeout', 'crl-verify', 'daemon', 'data-ciphers',
+    'data-ciphers-fallback', 'dev', 'dev-node', 'dev-type', 'dh', 'dhcp-option', 'disable-dco',
+    'dns', 'dns-updown', 'down', 'down-pre', 'duplicate-cn', 'ecdh-curve', 'engine',
+    'explicit-exit-notify', 'extra-certs', 'fast-io', 'float', 'fragment', 'group', 'hand-window',
+    'http-proxy', 'http-proxy-option', 'http-proxy-retry', 'http-proxy-timeout',
+    'http-proxy-user-pass', 'ifconfig', 'ifconfig-ipv6', 'ifconfig-pool', 'ifconfig-pool-persist',
+    'ignore-unknown-option', 'inactive', 'ipchange', 'iroute', 'iroute-ipv6', 'keepalive', 'key',
+    'key-direction', 'learn-address', 'link-mtu', 'local', 'log', 'log-append', 'lport',
+    'machine-readable-output', 'management', 'management-hold', 'management-query-passwords',
+    'mark', 'max-clients', 'max-routes', 'mode', 'mssfix', 'mtu-disc', 'mute',
+    'mute-replay-warnings', 'ncp-ciphers', 'ncp-disable', 'nice', 'nobind', 'ns-cert-type',
+    'opt-verify', 'passtos', 'peer-fingerprint', 'persist-key', 'persist-local-ip',
+    'persist-remote-ip', 'persist-tun', 'ping', 'ping-exit', 'ping-restart', 'ping-timer-rem',
+    'pkcs11-id', 'pkcs11-providers', 'pkcs12', 'port', 'proto', 'proto-force', 'pull',
+    'pull-filter', 'push', 'push-continuation', 'push-peer-info', 'rcvbuf', 'redirect-gateway',
+    'redirect-private', 'register-dns', 'remote', 'remote-cert-eku', 'remote-cert-ku',
+    'remote-cert-tls', 'remote-random', 'remote-random-hostname', 'reneg-bytes', 'reneg-pkts',
+    'reneg-sec', 'replay-window', 'resolv-retry', 'route', 'route-delay', 'route-gateway',
+    'route-ipv6', 'route-metric', 'route-noexec', 'route-nopull', 'route-pre-down', 'route-up',
+    'rport', 'script-security', 'secret', 'server', 'server-ipv6', 'server-poll-timeout', 'setenv',
+    'setenv-safe', 'shaper', 'sndbuf', 'socks-proxy', 'stale-routes-check', 'static-challenge',
+    'status', 'suppress-timestamps', 'tcp-nodelay', 'tls-auth', 'tls-cert-profile', 'tls-cipher',
+    'tls-ciphersuites', 'tls-client', 'tls-crypt', 'tls-crypt-v2', 'tls-exit', 'tls-groups',
+    'tls-server', 'tls-timeout', 'tls-verify', 'tls-version-max', 'tls-version-min', 'tmp-dir',
+    'topology', 'tran-window', 'tun-ipv6', 'tun-mtu', 'tun-mtu-extra', 'txqueuelen', 'up',
+    'up-delay', 'up-restart', 'user', 'username-as-common-name', 'verb', 'verify-client-cert',
+    'verify-x509-name', 'win-sys', 'writepid', 'x509-track', 'x509-username-field',
+])
+
+ConfigurationProblem = collections.namedtuple(
+        'ConfigurationProblem',
+        ['line', 'message', 'fatal']
+    )
+
+
+class ConfigurationSyntaxError(ValueError):
+
+    def __init__(self, problems):
+        self.problems = [ problem for problem in problems if problem.fatal ]
+        super().__init__('\n'.join((f'line {problem.line}: ' if problem.line else '') + problem.message for problem in self.problems[:CONFIGURATION_PROBLEMS_REPORTED]))
+
+
+def validate_configuration_lines(lines):
+    # Single pass over the lines, returns the list of problems found
+    problems = list()
+    block = None
+    block_line = None
+    connection_line = None
+    has_remote = False
+    is_server = False
+    for number, line in enumerate(lines, start=1):
+        match = INLINE_TAG_PATTERN.match(line)
+        if block is not None:
+            if match is None:
+                continue
+            tag = match.group('tag').lower()
+            if match.group('closing') and tag == block:
+                block = None
+            elif match.group('closing'):
+                problems.append(ConfigurationProblem(number, f'Closing tag </{tag}> does not match <{block}> opened on line {block_line}', True))
+            else:
+                problems.append(ConfigurationProblem(number, f'Tag <{tag}> opened inside <{block}> opened on line {block_line}', True))
+            continue
+        if match is not None:
+            tag = match.group('tag').lower()
+            if tag == CONNECTION_BLOCK:
+                if match.group('closing'):
+                    if connection_line is None:
+                        problems.append(ConfigurationProblem(number, f'Closing tag </{tag}> without opening tag', True))
+                    connection_line = None
+                elif connection_line is not None:
+                    problems.append(ConfigurationProblem(number, f'Tag <{tag}> opened inside <{tag}> opened on line {connection_line}', True))
+                else:
+                    connection_line = number
+            elif match.group('closing'):
+                problems.append(ConfigurationProblem(number, f'Closing tag </{tag}> without opening tag', True))
+            elif tag not in INLINE_BLOCKS:
+                # The contents are skipped like those of a known block, only the tag is unknown here
+                problems.append(ConfigurationProblem(number, f'Unknown inline block <{tag}>', False))
+                block, block_line = tag, number
+            else:
+                block, block_line = tag, number
+            continue
+        tokens = tokenize_line(line)
+        if len(tokens) == 0:
+            continue
+        directive = tokens[0].lower()
+        if directive.startswith('<'):
+            problems.append(ConfigurationProblem(number, f'Malformed tag {tokens[0]}', True))
+        elif directive not in KNOWN_DIRECTIVES:
+            problems.append(ConfigurationProblem(number, f'Unknown directive {tokens[0]}', False))
+        elif directive == 'remote':
+            if len(tokens) < 2:
+                problems.append(ConfigurationProblem(number, 'Directive remote requires a host', True))
+            else:
+                has_remote = True
+        elif directive in ['server', 'server-ipv6', 'mode', 'tls-server']:
+            is_server = True
+    if block is not None:
+        problems.append(ConfigurationProblem(block_line, f'Tag <{block}> is never closed', True))
+    if connection_line is not None:
+        problems.append(ConfigurationProblem(connection_line, f'Tag <{CONNECTION_BLOCK}> is never closed', True))
+    if not has_remote and not is_server:
+        problems.append(ConfigurationProblem(0, 'No remote server is specified', True))
+    return problems
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+#
+# openvpn3-indicator - Simple indicator application for OpenVPN3.
+# Copyright (C) 2024 Grzegorz Gutowski <grzegorz.gutowski@uj.edu.pl>
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License,
+# or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.
+# If not, see <https://www.gnu.org/licenses/>.
+#
+
+import logging
+import os
+import pathlib
+import struct
+import time
+import traceback
+
+EVENT_START = 0
+EVENT_CONNECT_REQUESTED = 1
+EVENT_CONNECTED = 2
+EVENT_DISCONNECTED = 3
+EVENT_AUTH_FAILED = 4
+EVENT_CONNECTION_FAILED = 5
+
+# Record: event, wall clock time, monotonic time, length of the key, key (utf-8)
+# The key is the configuration id, or the boot id for EVENT_START.
+RECORD_HEADER = struct.Struct('<BddH')
+HISTORY_FILE_NAME = 'history'
+HISTORY_FILE_SUFFIX = '.bin'
+HISTORY_SEGMENT_SIZE = 256 * 1024
+HISTORY_SEGMENTS = 4
+BOOT_ID_PATH = '/proc/sys/kernel/random/boot_id'
+
+
+def get_boot_id():
+    try:
+        return pathlib.Path(BOOT_ID_PATH).read_text().strip()
+    except OSError:
+        return ''
+
+
+def encode_record(event, wall, monotonic, key):
+    key = key.encode('utf-8')[:0xffff]
+    return RECORD_HEADER.pack(event, wall, monotonic, len(key)) + key
+
+
+def decode_records(data):
+    offset = 0
+    while offset + RECORD_HEADER.size <= len(data):
+        event, wall, monotonic, length = RECORD_HEADER.unpack_from(data, offset)
+        start = offset + RECORD_HEADER.size
+        if start + length > len(data):
+            # Truncated record at the end of an interrupted write
+            break
+        key = data[start:start+length].decode('utf-8', errors='replace')
+        offset = start + length
+        yield event, wall, monotonic, key
+
+###
+#
+# ConfigHistory
+#
+###
+
+
+class ConfigHistory:
+
+    def __init__(self):
+        self.attempts = 0
+        self.connections = 0
+        self.auth_failures = 0
+        self.connection_failures = 0
+        self.total_uptime = 0.0
+        self.connect_time_total = 0.0
+        self.connect_time_count = 0
+        self.last_used = None
+        self.last_connected = None
+        self.attempt_since = None
+        self.connected_since = None
+
+    @property
+    def connected(self):
+        return self.connected_since is not None
+
+    @property
+    def failures(self):
+        return self.auth_failures + self.connection_failures
+
+    @property
+    def failure_rate(self):
+        if self.attempts == 0:
+            return 0.0
+        return min(self.failures / self.attempts, 1.0)
+
+    @property
+    def mean_time_to_connect(self):
+        if self.connect_time_count == 0:
+            return None
+        return self.connect_time_total / self.connect_time_count
+
+    def uptime(self, monotonic=None):
+        uptime = self.total_uptime
+        if self.connected_since is not None and monotonic is not None:
+            uptime += max(monotonic - self.connected_since, 0.0)
+        return uptime
+
+    def reset_pending(self):
+        self.attempt_since = None
+        self.connected_since = None
+
+    def apply(self, event, wall, monotonic):
+        if event == EVENT_CONNECT_REQUESTED:
+            self.attempts += 1
+            self.last_used = wall
+            self.attempt_since = monotonic
+        elif event == EVENT_CONNECTED:
+            if self.connected_since is not None:
+                return False
+            self.connections += 1
+            self.last_connected = wall
+            self.connected_since = monotonic
+            if self.attempt_since is not None and monotonic >= self.attempt_since:
+                self.connect_time_total += monotonic - self.attempt_since
+                self.connect_time_count += 1
+            self.attempt_since = None
+        elif event == EVENT_DISCONNECTED:
+            if self.connected_since is None:
+                return False
+            if monotonic >= self.connected_since:
+                self.total_uptime += monotonic - self.connected_since
+            self.connected_since = None
+        elif event == EVENT_AUTH_FAILED:
+            self.auth_failures += 1
+            self.connected_since = None
+        elif event == EVENT_CONNECTION_FAILED:
+            self.connection_failures += 1
+            self.connected_since = None
+        return True
+
+###
+#
+# ConnectionHistory
+#
+###
+
+
+class ConnectionHistory:
+
+    @property
+    def directory(self):
+        return self._directory
+
+    def __init__(self, directory, segment_size=HISTORY_SEGMENT_SIZE, segments=HISTORY_SEGMENTS):
+        self._directory = pathlib.Path(directory)
+        self._segment_size = segment_size
+        self._segments = segments
+        self._index = dict()
+        self._file = None
+        self._boot_id = get_boot_id()
+        self._directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        self.load()
+        self.write(EVENT_START, self._boot_id)
+
+    def segment_path(self, number):
+        if number == 0:
+            return self._directory / f'{HISTORY_FILE_NAME}{HISTORY_FILE_SUFFIX}'
+        return self._directory / f'{HISTORY_FILE_NAME}.{number}{HISTORY_FILE_SUFFIX}'
+
+    def load(self):
+        self._index = dict()
+        boot_id = None
+        for number in reversed(range(self._segments)):
+            try:
+                data = self.segment_path(number).read_bytes()
+            except FileNotFoundError:
+                continue
+            except OSError:
+                logging.debug(traceback.format_exc())
+                logging.warning('Failed to read connection history segment %s', number)
+                continue
+            for event, wall, monotonic, key in decode_records(data):
+                if event == EVENT_START:
+                    # Monotonic clock readings only compare within one boot
+                    if key != boot_id:
+                        for history in self._index.values():
+                            history.reset_pending()
+                    boot_id = key
+                    continue
+                self.config_history(key).apply(event, wall, monotonic)
+        if boot_id != self._boot_id:
+            for history in self._index.values():
+                history.reset_pending()
+
+    def rotate(self):
+        self.close()
+        for number in reversed(range(self._segments - 1)):
+            path = self.segment_path(number)
+            if path.exists():
+                os.replace(path, self.segment_path(number + 1))
+        self._file = open(self.segment_path(0), 'ab')
+        self._file.write(encode_record(EVENT_START, time.time(), time.monotonic(), self._boot_id))
+
+    def write(self, event, key, wall=None, monotonic=None):
+        if wall is None:
+            wall = time.time()
+        if monotonic is None:
+            monotonic = time.monotonic()
+        record = encode_record(event, wall, monotonic, key)
+        try:
+            if self._file is None:
+                self._file = open(self.segment_path(0), 'ab')
+            if self._file.tell() > 0 and self._file.tell() + len(record) > self._segment_size:
+                self.rotate()
+            self._file.write(record)
+            self._file.flush()
+        except OSError:
+            logging.debug(traceback.format_exc())
+            logging.warning('Failed to write connection history')
+            self.close()
+
+    def record(self, event, config_id):
+        config_id = str(config_id)
+        wall = time.time()
+        monotonic = time.monotonic()
+        if self.config_history(config_id).apply(event, wall, monotonic):
+            self.write(event, config_id, wall, monotonic)
+
+    def config_history(self, config_id):
+        history = self._index.get(config_id, None)
+        if history is None:
+            history = self._index[config_id] = ConfigHistory()
+        return history
+
+    def __getitem__(self, config_id):
+        return self._index.get(str(config_id), None)
+
+    def __contains__(self, config_id):
+        return str(config_id) in self._index
+
+    def keys(self):
+        return sorted(self._index.keys())
+
+    def close(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                logging.debug(traceback.format_exc())
+            self._file = None
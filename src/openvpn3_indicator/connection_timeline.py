@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+#
+# openvpn3-indicator - Simple indicator application for OpenVPN3.
+# Copyright (C) 2024 Grzegorz Gutowski <grzegorz.gutowski@uj.edu.pl>
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License,
+# or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.
+# If not, see <https://www.gnu.org/licenses/>.
+#
+
+import collections
+import json
+import logging
+import os
+import time
+
+from openvpn3_indicator.instrumentation import Histogram
+
+# Phases of a connection attempt, in the order they usually happen
+PHASE_NEW_TUNNEL = 'new_tunnel'
+PHASE_BACKEND = 'backend'
+PHASE_CREDENTIAL_LOOKUP = 'credential_lookup'
+PHASE_USER_INPUT = 'user_input'
+PHASE_READY_CONNECT = 'ready_connect'
+PHASE_CONNECTING = 'connecting'
+PHASE_TOTAL = 'total'
+
+OUTCOME_CONNECTED = 'connected'
+OUTCOME_FAILED = 'failed'
+OUTCOME_AUTH_FAILED = 'auth_failed'
+OUTCOME_ABANDONED = 'abandoned'
+
+TIMELINE_CAPACITY = 100
+
+PhaseSpan = collections.namedtuple(
+        'PhaseSpan',
+        ['phase', 'start', 'end']
+    )
+
+###
+#
+# ConnectionAttempt
+#
+###
+
+
+class ConnectionAttempt:
+
+    @property
+    def config_id(self):
+        return self._config_id
+
+    @property
+    def session_id(self):
+        return self._session_id
+
+    @property
+    def start(self):
+        return self._start
+
+    @property
+    def end(self):
+        return self._end
+
+    @property
+    def phase(self):
+        return self._phase
+
+    @property
+    def outcome(self):
+        return self._outcome
+
+    @property
+    def spans(self):
+        return list(self._spans)
+
+    def __init__(self, config_id, start=None):
+        self._config_id = config_id
+        self._session_id = None
+        self._start = start if start is not None else time.monotonic()
+        self._end = None
+        self._phase = None
+        self._phase_start = None
+        self._spans = list()
+        self._outcome = None
+
+    def begin(self, phase, now=None):
+        now = now if now is not None else time.monotonic()
+        if self._phase is not None:
+            self._spans.append(PhaseSpan(self._phase, self._phase_start, now))
+        self._phase = phase
+        self._phase_start = now
+
+    def finish(self, outcome, now=None):
+        now = now if now is not None else time.monotonic()
+        self.begin(None, now)
+        self._end = now
+        self._outcome = outcome
+
+    def durations(self):
+        durations = dict()
+        for span in self._spans:
+            durations[span.phase] = durations.get(span.phase, 0.0) + span.end - span.start
+        if self._end is not None:
+            durations[PHASE_TOTAL] = self._end - self._start
+        return durations
+
+###
+#
+# ConnectionTimeline
+#
+###
+
+
+class ConnectionTimeline:
+
+    def __init__(self, capacity=TIMELINE_CAPACITY):
+        self._pending = dict()
+        self._finished = collections.deque(maxlen=capacity)
+        self._histograms = dict()
+
+    def start(self, config_id, now=None):
+        attempt = ConnectionAttempt(config_id, start=now)
+        attempt.begin(PHASE_NEW_TUNNEL, now=attempt.start)
+        return attempt
+
+    def bind(self, attempt, session_id, now=None):
+        attempt._session_id = session_id
+        self._pending[session_id] = attempt
+        attempt.begin(PHASE_BACKEND, now=now)
+
+    def __getitem__(self, session_id):
+        return self._pending.get(session_id, None)
+
+    def begin(self, session_id, phase, now=None):
+        attempt = self._pending.get(session_id, None)
+        if attempt is not None and attempt.phase != phase:
+            attempt.begin(phase, now=now)
+
+    def finish(self, session_id, outcome, now=None):
+        attempt = self._pending.pop(session_id, None)
+        if attempt is None:
+            return None
+        attempt.finish(outcome, now=now)
+        self._finished.append(attempt)
+        if outcome == OUTCOME_CONNECTED:
+            histograms = self._histograms.setdefault(attempt.config_id, dict())
+            for phase, duration in attempt.durations().items():
+                histogram = histograms.get(phase, None)
+                if histogram is None:
+                    histogram = histograms[phase] = Histogram()
+                histogram.add(duration)
+        logging.debug('Connection attempt of %s finished as %s: %s', attempt.config_id, outcome, attempt.durations())
+        return attempt
+
+    def retain(self, session_ids, now=None):
+        for session_id in list(self._pending):
+            if session_id not in session_ids:
+                self.finish(session_id, OUTCOME_ABANDONED, now=now)
+
+    def histograms(self, config_id):
+        return dict((phase, histogram.summary()) for phase, histogram in self._histograms.get(config_id, dict()).items())
+
+    def attempts(self):
+        return list(self._finished) + list(self._pending.values())
+
+    def report(self, config_names=None):
+        config_names = config_names or dict()
+        lines = list()
+        for config_id in sorted(self._histograms):
+            lines.append(f'{config_names.get(config_id, config_id)}')
+            lines.append(f'  {"phase":<20} {"count":>8} {"mean s":>10} {"p50 s":>10} {"p90 s":>10} {"max s":>10}')
+            for phase, summary in sorted(self.histograms(config_id).items(), key=lambda item : item[0] == PHASE_TOTAL):
+                lines.append(f'  {phase:<20} {summary["count"]:>8} ' + ' '.join(f'{summary[key]:>10.3f}' for key in ['mean', 'p50', 'p90', 'max']))
+        return '\n'.join(lines) + '\n'
+
+    def chrome_trace(self, config_names=None):
+        # Chrome trace event format: metadata ('M') and complete ('X') events
+        config_names = config_names or dict()
+        pid = os.getpid()
+        events = list()
+        for tid, attempt in enumerate(self.attempts(), start=1):
+            name = config_names.get(attempt.config_id, attempt.config_id)
+            events.append({
+                'name' : 'thread_name', 'ph' : 'M', 'pid' : pid, 'tid' : tid,
+                'args' : { 'name' : f'{name} #{tid}' },
+            })
+            end = attempt.end if attempt.end is not None else time.monotonic()
+            events.append({
+                'name' : name, 'cat' : 'connection', 'ph' : 'X', 'pid' : pid, 'tid' : tid,
+                'ts' : attempt.start * 1000000, 'dur' : (end - attempt.start) * 1000000,
+                'args' : { 'config' : attempt.config_id, 'session' : attempt.session_id, 'outcome' : attempt.outcome },
+            })
+            for span in attempt.spans:
+                events.append({
+                    'name' : span.phase, 'cat' : 'phase', 'ph' : 'X', 'pid' : pid, 'tid' : tid,
+                    'ts' : span.start * 1000000, 'dur' : (span.end - span.start) * 1000000,
+                })
+        return json.dumps({ 'traceEvents' : events, 'displayTimeUnit' : 'ms' }, indent=1)
@@ -133,11 +133,11 @@ class CredentialStore:
                             self.attrs(key),
                             bytes(str(item), 'utf-8'),
                             replace=True)
-                        logging.info(f'Stored secret {label} in Secret Storage')
+                        logging.info('Stored secret %s in Secret Storage', label)
                     else:
                         for item in collection.search_items(self.attrs(key)):
                             item.delete()
-                        logging.info(f'Removed secret {label} from Secret Storage')
+                        logging.info('Removed secret %s from Secret Storage', label)
                 except:  # TODO: Catch only expected exceptions
                     logging.debug(traceback.format_exc())
                     logging.error('Failed to write to Secret Storage')
@@ -149,10 +149,10 @@ class CredentialStore:
                 try:
                     items = list(collection.search_items(self.attrs(key)))
                     if len(items) > 1:
-                        logging.warning(f'There are multiple entries for {self.label(key)} in Secret Storage')
+                        logging.warning('There are multiple entries for %s in Secret Storage', self.label(key))
                     if len(items) > 0:
                         return str(items[0].get_secret(), 'utf-8')
-                    logging.info(f'Retrieved secret {self.label(key)} from Secret Storage')
+                    logging.info('Retrieved secret %s from Secret Storage', self.label(key))
                 except:  # TODO: Catch only expected exceptions
                     logging.debug(traceback.format_exc())
                     logging.error('Failed to read from Secret Storage')
@@ -164,7 +164,7 @@ class CredentialStore:
                 try:
                     for item in collection.search_items(self.attrs(key)):
                         item.delete()
-                    logging.info(f'Removed secret {self.label(key)} from Secret Storage')
+                    logging.info('Removed secret %s from Secret Storage', self.label(key))
                 except:  # TODO: Catch only expected exceptions
                     logging.debug(traceback.format_exc())
                     logging.error('Failed to delete from Secret Storage')
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+#
+# openvpn3-indicator - Simple indicator application for OpenVPN3.
+# Copyright (C) 2024 Grzegorz Gutowski <grzegorz.gutowski@uj.edu.pl>
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License,
+# or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.
+# If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+import logging
+import signal
+import traceback
+
+from gi.repository import GLib, Gio
+
+import dbus
+from dbus.mainloop.glib import DBusGMainLoop
+
+import openvpn3
+
+from openvpn3_indicator.about import APPLICATION_ID, APPLICATION_NAME, APPLICATION_TITLE, APPLICATION_VERSION
+from openvpn3_indicator.credential_store import CredentialStore
+from openvpn3_indicator.log_buffer import setup_logging
+from openvpn3_indicator.uplink_monitor import UplinkMonitor
+from openvpn3_indicator.sleep_monitor import SleepMonitor
+from openvpn3_indicator.session_controller import SessionController
+from openvpn3_indicator.state_service import StateService
+from openvpn3_indicator.remote_control import add_remote_options, get_remote_command, check_remote_output, check_primary_instance, handle_remote_command
+from openvpn3_indicator.user_directories import get_user_data_directory
+
+###
+#
+# Daemon
+#
+###
+
+
+class Daemon(Gio.Application, SessionController):
+    # Runs the session handling of the indicator on a plain GLib main loop,
+    # without Gtk, tray icon or notifications. Credentials are never asked
+    # for, only taken from the secret storage.
+
+    def __init__(self):
+        Gio.Application.__init__(self,
+            application_id=APPLICATION_ID,
+            flags=Gio.ApplicationFlags.HANDLES_COMMAND_LINE,
+            )
+        self.settings = Gio.Settings.new(APPLICATION_ID)
+        self.add_main_option('version', ord('V'), GLib.OptionFlags.NONE, GLib.OptionArg.NONE, "Show version and exit", None)
+        self.add_main_option('verbose', ord('v'), GLib.OptionFlags.NONE, GLib.OptionArg.NONE, "Show more info", None)
+        self.add_main_option('debug', ord('d'), GLib.OptionFlags.NONE, GLib.OptionArg.NONE, "Show debug info", None)
+        self.add_main_option('silent', ord('s'), GLib.OptionFlags.NONE, GLib.OptionArg.NONE, "Show less info", None)
+        self.add_main_option('headless', 0, GLib.OptionFlags.NONE, GLib.OptionArg.NONE, "Run without tray icon and dialogs", None)
+        add_remote_options(self)
+        self.connect('handle-local-options', self.on_handle_local_options)
+        self.connect('command-line', self.on_command_line)
+        self.connect('startup', self.on_startup)
+        self.connect('activate', self.on_activate)
+        self.connect('shutdown', self.on_shutdown)
+
+    def on_handle_local_options(self, application, options):
+        options = options.end().unpack()
+        level=logging.WARNING
+        if options.get('version', False):
+            print(f'{APPLICATION_NAME} {APPLICATION_VERSION}')
+            return 0
+        if options.get('debug', False):
+            level = logging.DEBUG
+        elif options.get('silent', False):
+            level = logging.INFO
+        elif options.get('verbose', False):
+            level = logging.ERROR
+        setup_logging(level)
+        if get_remote_command(options) is not None:
+            if not check_remote_output():
+                logging.critical('Command line verbs need GLib 2.80 or newer')
+                return 1
+            if not check_primary_instance(self):
+                logging.critical('%s is not running', APPLICATION_TITLE)
+                return 1
+        return -1
+
+    def on_command_line(self, application, command_line):
+        command = get_remote_command(command_line.get_options_dict().end().unpack())
+        if command is not None:
+            return handle_remote_command(self, command_line, *command)
+        self.activate()
+        return 0
+
+    def on_activate(self, data):
+        self.info('Activate')
+
+    def on_startup(self, data):
+        self.info('Startup headless')
+        DBusGMainLoop(set_as_default=True)
+        self.dbus = dbus.SystemBus()
+        self.config_manager = openvpn3.ConfigurationManager(self.dbus)
+        self.session_manager = openvpn3.SessionManager(self.dbus)
+        self.session_manager.SessionManagerCallback(self.on_session_manager_event)
+        self.credential_store = CredentialStore()
+        try:
+            history_directory = get_user_data_directory() / 'history'
+        except OSError:
+            self.debug(traceback.format_exc())
+            self.warning('Failed to create user data directory, running without connection history')
+            history_directory = None
+        self.init_sessions(history_directory)
+        try:
+            self.uplink_monitor = UplinkMonitor(self.dbus, self.on_uplink_change, is_tunnel_device=self.is_session_device)
+        except dbus.exceptions.DBusException:
+            self.debug(traceback.format_exc())
+            self.warning('Failed to watch network changes')
+            self.uplink_monitor = None
+        try:
+            self.sleep_monitor = SleepMonitor(self.dbus, self.on_sleep, self.on_wake)
+        except dbus.exceptions.DBusException:
+            self.debug(traceback.format_exc())
+            self.warning('Failed to watch system sleep')
+            self.sleep_monitor = None
+
+        GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGTERM, self.on_signal_quit)
+        GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGINT, self.on_signal_quit)
+        self.state_service = StateService(self)
+        self.state_service.register(self.get_dbus_connection())
+        GLib.timeout_add(1000, self.on_schedule)
+        self.hold()
+
+    def on_shutdown(self, application):
+        self.info('Shutdown')
+        if getattr(self, 'uplink_monitor', None) is not None:
+            self.uplink_monitor.close()
+        if getattr(self, 'sleep_monitor', None) is not None:
+            self.sleep_monitor.close()
+        if hasattr(self, 'session_registry'):
+            self.close_sessions()
+        if hasattr(self, 'state_service'):
+            self.state_service.unregister()
+
+    def on_signal_quit(self):
+        self.info('Received termination signal')
+        self.quit()
+        return False
+
+    def on_schedule(self):
+        self.debug('Schedule')
+        self.schedule_sessions()
+        self.state_service.update()
+        GLib.timeout_add(1000, self.on_schedule)
@@ -22,9 +22,10 @@
 
 import gi
 gi.require_version('Gtk', '3.0')
-from gi.repository import GLib, GObject, Gtk, Gio
+from gi.repository import GLib, GObject, Gtk, Gio, Pango
 
 from openvpn3_indicator.about import APPLICATION_NAME, CONFIGURATION_MIME_TYPE
+from openvpn3_indicator.configuration_parser import guess_name
 
 DEFAULT_CONFIG_NAME = 'NEW'
 
@@ -70,8 +71,9 @@ def construct_configuration_select_dialog(name=None, on_import=None, on_cancel=N
     return dialog
 
 def guess_configuration_name(path):
-    #TODO: Try to guess the name from path contents
-    pass
+    if not path:
+        return None
+    return guess_name(path)
 
 def construct_configuration_import_dialog(path, name=None, on_import=None, on_cancel=None):
     name = name or guess_configuration_name(path) or DEFAULT_CONFIG_NAME
@@ -124,6 +126,142 @@ def construct_configuration_import_dialog(path, name=None, on_import=None, on_ca
     return dialog
 
 
+def construct_configuration_batch_import_dialog(paths, on_import=None, on_cancel=None):
+    dialog = Gtk.Dialog('OpenVPN Configuration Import')
+    dialog.set_position(Gtk.WindowPosition.CENTER)
+    dialog.set_keep_above(True)
+    dialog.set_icon_name(APPLICATION_NAME)
+    dialog.set_default_size(700, 400)
+    dialog.add_buttons(
+            Gtk.STOCK_CANCEL, Gtk.ResponseType.CANCEL,
+            'Import', Gtk.ResponseType.OK,
+        )
+    content_area = dialog.get_content_area()
+    content_area.set_property('hexpand', True)
+    content_area.set_property('vexpand', True)
+    grid = Gtk.Grid(row_spacing=10, column_spacing=10, vexpand=True, hexpand=True, margin_top=20, margin_right=20, margin_bottom=20, margin_left=20)
+
+    # Columns: import, path, name, status, status details
+    store = Gtk.ListStore(bool, str, str, str, str)
+    for path in paths:
+        name = guess_configuration_name(path) or DEFAULT_CONFIG_NAME
+        store.append([True, path, name, '', ''])
+    view = Gtk.TreeView(model=store, headers_visible=True, enable_search=False, tooltip_column=4)
+    toggle_renderer = Gtk.CellRendererToggle(activatable=True)
+    view.append_column(Gtk.TreeViewColumn('Import', toggle_renderer, active=0))
+    view.append_column(Gtk.TreeViewColumn('Configuration File', Gtk.CellRendererText(ellipsize=Pango.EllipsizeMode.START), text=1))
+    name_renderer = Gtk.CellRendererText(editable=True)
+    view.append_column(Gtk.TreeViewColumn('Configuration Name', name_renderer, text=2))
+    status_column = Gtk.TreeViewColumn('Status', Gtk.CellRendererText(ellipsize=Pango.EllipsizeMode.END), text=3)
+    status_column.set_expand(True)
+    view.append_column(status_column)
+    for column in view.get_columns()[1:3]:
+        column.set_resizable(True)
+        column.set_expand(True)
+
+    def on_toggled(_renderer, tree_path):
+        store[tree_path][0] = not store[tree_path][0]
+
+    def on_edited(_renderer, tree_path, text):
+        store[tree_path][2] = text.strip() or store[tree_path][2]
+
+    toggle_renderer.connect('toggled', on_toggled)
+    name_renderer.connect('edited', on_edited)
+
+    scrolled = Gtk.ScrolledWindow(hexpand=True, vexpand=True)
+    scrolled.add(view)
+    grid.attach(scrolled, 0, 0, 1, 1)
+    summary = Gtk.Label(label=f'{len(paths)} configuration files', hexpand=True, xalign=0)
+    grid.attach(summary, 0, 1, 1, 1)
+
+    content_area.add(grid)
+    dialog.batch_store = store
+    dialog.batch_summary = summary
+    dialog.batch_started = False
+
+    def on_dialog_destroy(_object):
+        if on_cancel is not None:
+            on_cancel()
+
+    def on_dialog_response(_object, response):
+        if response == Gtk.ResponseType.OK and not dialog.batch_started:
+            dialog.batch_started = True
+            dialog.get_widget_for_response(response_id=Gtk.ResponseType.OK).set_sensitive(False)
+            toggle_renderer.set_property('activatable', False)
+            name_renderer.set_property('editable', False)
+            entries = list()
+            for row in store:
+                if row[0]:
+                    row[3] = 'Queued'
+                    entries.append((row[2], row[1]))
+                else:
+                    row[3] = 'Skipped'
+            if on_import is not None:
+                on_import(entries)
+            return
+        dialog.destroy()
+
+    dialog.connect('destroy', on_dialog_destroy)
+    dialog.connect('response', on_dialog_response)
+    default = dialog.get_widget_for_response(response_id=Gtk.ResponseType.OK)
+    default.set_can_default(True)
+    default.grab_default()
+    dialog.show_all()
+    return dialog
+
+
+def set_configuration_batch_status(dialog, path, status, details=''):
+    for row in dialog.batch_store:
+        if row[1] == path:
+            row[3] = status
+            row[4] = details
+
+
+def set_configuration_batch_summary(dialog, summary):
+    dialog.batch_summary.set_text(summary)
+    cancel = dialog.get_widget_for_response(response_id=Gtk.ResponseType.CANCEL)
+    if cancel is not None:
+        cancel.set_label('Close')
+
+
+def construct_configuration_progress_dialog(name, path, on_cancel=None):
+    dialog = Gtk.Dialog('OpenVPN Configuration Import')
+    dialog.set_position(Gtk.WindowPosition.CENTER)
+    dialog.set_keep_above(True)
+    dialog.set_icon_name(APPLICATION_NAME)
+    dialog.add_buttons(
+            Gtk.STOCK_CANCEL, Gtk.ResponseType.CANCEL,
+        )
+    content_area = dialog.get_content_area()
+    content_area.set_property('hexpand', True)
+    content_area.set_property('vexpand', True)
+    grid = Gtk.Grid(row_spacing=10, column_spacing=10, vexpand=True, hexpand=True, margin_top=20, margin_right=20, margin_bottom=20, margin_left=20)
+
+    grid.attach(Gtk.Label(label='Configuration File', hexpand=True, xalign=0, margin_right=10), 0, 0, 1, 1)
+    grid.attach(Gtk.Label(label=path, hexpand=True), 1, 0, 1, 1)
+    grid.attach(Gtk.Label(label='Configuration Name', hexpand=True, xalign=0, margin_right=10), 0, 1, 1, 1)
+    grid.attach(Gtk.Label(label=name, hexpand=True), 1, 1, 1, 1)
+    progress_bar = Gtk.ProgressBar(hexpand=True, show_text=True)
+    grid.attach(progress_bar, 0, 2, 2, 1)
+
+    content_area.add(grid)
+    dialog.progress_bar = progress_bar
+
+    def on_dialog_response(_object, response):
+        if on_cancel is not None:
+            on_cancel()
+        dialog.destroy()
+
+    dialog.connect('response', on_dialog_response)
+    dialog.show_all()
+    return dialog
+
+
+def set_configuration_progress(dialog, text, fraction):
+    dialog.progress_bar.set_text(text)
+    dialog.progress_bar.set_fraction(fraction)
+
+
 def construct_configuration_remove_dialog(name, on_remove=None, on_cancel=None):
     dialog = Gtk.Dialog('OpenVPN Configuration Remove')
     dialog.set_position(Gtk.WindowPosition.CENTER)
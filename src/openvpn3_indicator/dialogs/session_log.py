@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+#
+# openvpn3-indicator - Simple indicator application for OpenVPN3.
+# Copyright (C) 2024 Grzegorz Gutowski <grzegorz.gutowski@uj.edu.pl>
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License,
+# or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.
+# If not, see <https://www.gnu.org/licenses/>.
+#
+
+import time
+
+import gi
+gi.require_version('Gtk', '3.0')
+from gi.repository import GLib, GObject, Gtk, Gio, Pango
+
+from openvpn3_indicator.about import APPLICATION_NAME
+from openvpn3_indicator.session_log import SESSION_LOG_CAPACITY
+
+# Above this many new rows the view is detached from the model while filling it
+SESSION_LOG_DETACH_THRESHOLD = 200
+
+
+def construct_session_log_dialog(name, entries=None, capacity=SESSION_LOG_CAPACITY, on_close=None):
+    dialog = Gtk.Window(title=f'OpenVPN Log: {name}')
+    dialog.set_position(Gtk.WindowPosition.CENTER)
+    dialog.set_icon_name(APPLICATION_NAME)
+    dialog.set_default_size(800, 500)
+
+    store = Gtk.ListStore(str, str, str)
+    view = Gtk.TreeView(model=store, headers_visible=True, enable_search=False)
+    for title, column_id, expand in [('Time', 0, False), ('Category', 1, False), ('Message', 2, True)]:
+        renderer = Gtk.CellRendererText(family='monospace', ellipsize=Pango.EllipsizeMode.END if expand else Pango.EllipsizeMode.NONE)
+        column = Gtk.TreeViewColumn(title, renderer, text=column_id)
+        # Fixed sizing lets the view render only visible rows
+        column.set_sizing(Gtk.TreeViewColumnSizing.FIXED)
+        column.set_resizable(True)
+        column.set_expand(expand)
+        column.set_fixed_width(-1 if expand else (180 if column_id == 0 else 100))
+        view.append_column(column)
+    view.set_fixed_height_mode(True)
+
+    scrolled = Gtk.ScrolledWindow(hexpand=True, vexpand=True)
+    scrolled.add(view)
+    dialog.add(scrolled)
+
+    dialog.log_store = store
+    dialog.log_view = view
+    dialog.log_scrolled = scrolled
+    dialog.log_capacity = capacity
+
+    def on_dialog_destroy(_object):
+        if on_close is not None:
+            on_close()
+
+    dialog.connect('destroy', on_dialog_destroy)
+    if entries:
+        append_session_log_entries(dialog, entries)
+    dialog.show_all()
+    return dialog
+
+
+def format_session_log_entry(entry):
+    timestamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry.timestamp))
+    return [timestamp, str(entry.category), str(entry.message).rstrip()]
+
+
+def append_session_log_entries(dialog, entries):
+    store = dialog.log_store
+    view = dialog.log_view
+    capacity = dialog.log_capacity
+    if len(entries) == 0:
+        return
+    entries = entries[-capacity:]
+    adjustment = dialog.log_scrolled.get_vadjustment()
+    follow = adjustment.get_value() + adjustment.get_page_size() >= adjustment.get_upper() - 1
+    detach = len(entries) > SESSION_LOG_DETACH_THRESHOLD
+    if detach:
+        view.set_model(None)
+    overflow = len(store) + len(entries) - capacity
+    if overflow >= len(store):
+        store.clear()
+    else:
+        for _ in range(max(overflow, 0)):
+            store.remove(store.get_iter_first())
+    for entry in entries:
+        store.append(format_session_log_entry(entry))
+    if detach:
+        view.set_model(store)
+    if follow and len(store) > 0:
+        view.scroll_to_cell(Gtk.TreePath.new_from_indices([len(store) - 1]), None, False, 0, 0)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+#
+# openvpn3-indicator - Simple indicator application for OpenVPN3.
+# Copyright (C) 2024 Grzegorz Gutowski <grzegorz.gutowski@uj.edu.pl>
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License,
+# or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.
+# If not, see <https://www.gnu.org/licenses/>.
+#
+
+import functools
+import time
+
+###
+#
+# Histogram
+#
+###
+
+# Bucket n holds durations d (in microseconds) with 2^(n-1) <= d < 2^n
+HISTOGRAM_BUCKETS = 32
+
+
+class Histogram:
+
+    @property
+    def count(self):
+        return self._count
+
+    @property
+    def total(self):
+        return self._total
+
+    @property
+    def minimum(self):
+        return self._minimum
+
+    @property
+    def maximum(self):
+        return self._maximum
+
+    @property
+    def mean(self):
+        if self._count == 0:
+            return 0.0
+        return self._total / self._count
+
+    @property
+    def buckets(self):
+        return list(self._buckets)
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._count = 0
+        self._total = 0.0
+        self._minimum = None
+        self._maximum = None
+        self._buckets = [0] * HISTOGRAM_BUCKETS
+
+    def add(self, duration):
+        self._count += 1
+        self._total += duration
+        if self._minimum is None or duration < self._minimum:
+            self._minimum = duration
+        if self._maximum is None or duration > self._maximum:
+            self._maximum = duration
+        bucket = min(int(duration * 1000000).bit_length(), HISTOGRAM_BUCKETS - 1)
+        self._buckets[bucket] += 1
+
+    def quantile(self, q):
+        if self._count == 0:
+            return 0.0
+        rank = q * self._count
+        seen = 0
+        for bucket, count in enumerate(self._buckets):
+            seen += count
+            if seen >= rank and count > 0:
+                return min((1 << bucket) / 1000000, self._maximum)
+        return self._maximum
+
+    def summary(self):
+        return {
+            'count' : self.count,
+            'total' : self.total,
+            'mean' : self.mean,
+            'min' : self.minimum or 0.0,
+            'max' : self.maximum or 0.0,
+            'p50' : self.quantile(0.50),
+            'p90' : self.quantile(0.90),
+            'p99' : self.quantile(0.99),
+        }
+
+###
+#
+# Instrumentation
+#
+###
+
+
+class Instrumentation:
+
+    @property
+    def enabled(self):
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, enabled):
+        self._enabled = bool(enabled)
+
+    def __init__(self, enabled=False):
+        self._enabled = bool(enabled)
+        self._histograms = dict()
+        self._counters = dict()
+        self._null_span = self.NullSpan()
+
+    class NullSpan:
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            return False
+
+    class Span:
+
+        def __init__(self, parent, name):
+            self._parent = parent
+            self._name = name
+            self._start = None
+
+        def __enter__(self):
+            self._start = time.perf_counter()
+            return self
+
+        def __exit__(self, *args):
+            self._parent.record(self._name, time.perf_counter() - self._start)
+            return False
+
+    def span(self, name):
+        if not self._enabled:
+            return self._null_span
+        return self.Span(self, name)
+
+    def record(self, name, duration):
+        histogram = self._histograms.get(name, None)
+        if histogram is None:
+            histogram = self._histograms[name] = Histogram()
+        histogram.add(duration)
+
+    def count(self, name, value=1):
+        if self._enabled:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def timed(self, name):
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self._enabled:
+                    return function(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def histograms(self):
+        return dict((name, histogram.summary()) for name, histogram in self._histograms.items())
+
+    def counters(self):
+        return dict(self._counters)
+
+    def reset(self):
+        self._histograms = dict()
+        self._counters = dict()
+
+    def report(self):
+        lines = list()
+        lines.append(f'{"span":<40} {"count":>8} {"mean ms":>10} {"p50 ms":>10} {"p90 ms":>10} {"p99 ms":>10} {"max ms":>10}')
+        for name, summary in sorted(self.histograms().items()):
+            lines.append(f'{name:<40} {summary["count"]:>8} ' + ' '.join(f'{summary[key]*1000:>10.3f}' for key in ['mean', 'p50', 'p90', 'p99', 'max']))
+        lines.append('')
+        lines.append(f'{"counter":<40} {"value":>8}')
+        for name, value in sorted(self.counters().items()):
+            lines.append(f'{name:<40} {value:>8}')
+        return '\n'.join(lines) + '\n'
+
+
+instrumentation = Instrumentation()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+#
+# openvpn3-indicator - Simple indicator application for OpenVPN3.
+# Copyright (C) 2024 Grzegorz Gutowski <grzegorz.gutowski@uj.edu.pl>
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License,
+# or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.
+# If not, see <https://www.gnu.org/licenses/>.
+#
+
+import collections
+import copy
+import logging
+
+DEFAULT_LOG_BUFFER_CAPACITY = 2000
+DEFAULT_LOG_BUFFER_LEVEL = logging.INFO
+DEFAULT_LOG_FORMAT = '%(asctime)s %(levelname)s:%(name)s:%(message)s'
+
+###
+#
+# Lazy
+#
+###
+
+
+class Lazy:
+    # Defers an expensive computation until the log record is formatted
+
+    def __init__(self, function, *args, **kwargs):
+        self._function = function
+        self._args = args
+        self._kwargs = kwargs
+
+    def __str__(self):
+        return str(self._function(*self._args, **self._kwargs))
+
+    def __repr__(self):
+        return repr(self._function(*self._args, **self._kwargs))
+
+
+def lazy(function, *args, **kwargs):
+    return Lazy(function, *args, **kwargs)
+
+###
+#
+# RingBufferHandler
+#
+###
+
+
+class RingBufferHandler(logging.Handler):
+
+    @property
+    def capacity(self):
+        return self._records.maxlen
+
+    def __init__(self, capacity=DEFAULT_LOG_BUFFER_CAPACITY, level=logging.NOTSET):
+        logging.Handler.__init__(self, level)
+        self._records = collections.deque(maxlen=capacity)
+        self.setFormatter(logging.Formatter(DEFAULT_LOG_FORMAT))
+
+    def emit(self, record):
+        # The message is formatted now, so the dump shows the state at logging time
+        # and the buffer does not keep the logged objects alive
+        record = copy.copy(record)
+        try:
+            record.msg = record.getMessage()
+        except Exception:
+            record.msg = f'{record.msg!r} (formatting failed)'
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatter.formatException(record.exc_info)
+        record.args = None
+        record.exc_info = None
+        self._records.append(record)
+
+    def records(self):
+        return list(self._records)
+
+    def clear(self):
+        self._records.clear()
+
+    def dump(self):
+        lines = list()
+        for record in list(self._records):
+            lines.append(self.format(record))
+        return '\n'.join(lines) + '\n'
+
+
+def setup_logging(level, capacity=DEFAULT_LOG_BUFFER_CAPACITY, buffer_level=DEFAULT_LOG_BUFFER_LEVEL):
+    # The console and the ring buffer have separate thresholds, the root logger
+    # drops records below both of them before any message is formatted.
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    root = logging.getLogger()
+    console = logging.StreamHandler()
+    console.setLevel(level)
+    console.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    ring_buffer = RingBufferHandler(capacity=capacity, level=buffer_level)
+    root.addHandler(console)
+    root.addHandler(ring_buffer)
+    root.setLevel(min(level, buffer_level))
+    return ring_buffer
@@ -34,6 +34,7 @@ except (ValueError, ImportError):
     from gi.repository import AppIndicator3
 
 from openvpn3_indicator.about import *
+from openvpn3_indicator.instrumentation import instrumentation
 
 ###
 #
@@ -74,6 +75,7 @@ class MultiIndicator():
         self.invalid = False
 
     def invalidate(self):
+        instrumentation.count('invalidate.indicator')
         self.invalid = True
 
     class Indicator():
@@ -169,7 +171,7 @@ class MultiIndicator():
         identifier = str(uuid.uuid4())
         indicator = self.Indicator(self, identifier, **kwargs)
         self._indicators[identifier] = indicator
-        logging.debug(f'Created Indicator {identifier}')
+        logging.debug('Created Indicator %s', identifier)
         if indicator.active:
             self.invalidate()
         return indicator
@@ -180,7 +182,7 @@ class MultiIndicator():
                 del self._indicators[indicator.identifier]
                 if indicator.active:
                     self.invalidate()
-                logging.debug(f'Destroyed Indicator {indicator.identifier}')
+                logging.debug('Destroyed Indicator %s', indicator.identifier)
             indicator._parent = None
 
     def commit_indicator(self, indicator, num):
@@ -205,6 +207,7 @@ class MultiIndicator():
         self._sub_indicators = list()
         self.invalid = True
 
+    @instrumentation.timed('MultiIndicator.update')
     def update(self):
         if self.invalid:
             logging.debug('Repairing Indicators')
@@ -29,6 +29,7 @@ gi.require_version('Gtk', '3.0')
 from gi.repository import Gio
 
 from openvpn3_indicator.about import *
+from openvpn3_indicator.instrumentation import instrumentation
 
 ###
 #
@@ -60,6 +61,7 @@ class MultiNotifier():
         self.invalid = False
 
     def invalidate(self):
+        instrumentation.count('invalidate.notifier')
         self.invalid = True
 
     class Notifier():
@@ -172,7 +174,7 @@ class MultiNotifier():
         identifier = self.sub_identifier(identifier or str(uuid.uuid4()))
         notifier = self.Notifier(self, identifier=identifier, **kwargs)
         self._notifiers[identifier] = notifier
-        logging.debug(f'Created Notifier {identifier}')
+        logging.debug('Created Notifier %s', identifier)
         if notifier.active:
             self.invalidate()
         return notifier
@@ -182,7 +184,7 @@ class MultiNotifier():
                 if notifier.active:
                     self._pending.append(notifier)
                 del self._notifiers[notifier.identifier]
-                logging.debug(f'Destroyed Notifier {notifier.identifier}')
+                logging.debug('Destroyed Notifier %s', notifier.identifier)
             notifier._parent = None
 
     def commit_notifier(self, notifier):
@@ -214,6 +216,7 @@ class MultiNotifier():
             notifier._timeout = None
             self.application.withdraw_notification(notifier.identifier)
 
+    @instrumentation.timed('MultiNotifier.update')
     def update(self):
         for notifier in self._notifiers.values():
             self.commit_notifier(notifier)
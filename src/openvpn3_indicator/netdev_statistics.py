@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+#
+# openvpn3-indicator - Simple indicator application for OpenVPN3.
+# Copyright (C) 2024 Grzegorz Gutowski <grzegorz.gutowski@uj.edu.pl>
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License,
+# or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.
+# If not, see <https://www.gnu.org/licenses/>.
+#
+
+import logging
+import os
+import re
+import traceback
+
+SYSFS_NET = '/sys/class/net'
+NETDEV_STATISTICS = {
+    'BYTES_IN' : 'rx_bytes',
+    'BYTES_OUT' : 'tx_bytes',
+    'PACKETS_IN' : 'rx_packets',
+    'PACKETS_OUT' : 'tx_packets',
+}
+DEVICE_NAME_PATTERN = re.compile(r'^[^/\s]{1,15}$')
+
+###
+#
+# NetdevCounters
+#
+###
+
+
+class NetdevCounters:
+    # Keeps sysfs statistics files open, every read at offset 0
+    # makes the kernel render a fresh value
+
+    @property
+    def device(self):
+        return self._device
+
+    def __init__(self, device, sysfs=SYSFS_NET):
+        if not DEVICE_NAME_PATTERN.match(device) or device in ['.', '..']:
+            raise ValueError(f'Invalid network device name {device!r}')
+        self._device = device
+        self._files = dict()
+        try:
+            for key, name in NETDEV_STATISTICS.items():
+                self._files[key] = os.open(os.path.join(sysfs, device, 'statistics', name), os.O_RDONLY | os.O_CLOEXEC)
+        except OSError:
+            self.close()
+            raise
+
+    def read(self):
+        return dict((key, int(os.pread(fd, 32, 0))) for key, fd in self._files.items())
+
+    def close(self):
+        for fd in self._files.values():
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._files = dict()
+
+###
+#
+# NetdevStatisticsSource
+#
+###
+
+
+class NetdevStatisticsSource:
+    # Reads counters of the tunnel device from sysfs, or from the fallback
+    # when the device is not known. A failed device lookup is not repeated
+    # until the session is invalidated, on_switch is called with the session
+    # id when its counters start coming from a different source.
+
+    def __init__(self, device_name, fallback=None, sysfs=SYSFS_NET, on_switch=None):
+        self._device_name = device_name
+        self._fallback = fallback
+        self._sysfs = sysfs
+        self._on_switch = on_switch
+        self._counters = dict()
+        self._unavailable = set()
+        self._sources = dict()
+
+    def counters(self, session_id):
+        counters = self._counters.get(session_id, None)
+        if counters is None:
+            if session_id in self._unavailable:
+                return None
+            try:
+                device = self._device_name(session_id)
+            except: #TODO: Catch only expected exceptions
+                logging.debug(traceback.format_exc())
+                device = None
+            if not device:
+                self._unavailable.add(session_id)
+                return None
+            try:
+                counters = NetdevCounters(str(device), sysfs=self._sysfs)
+            except (OSError, ValueError):
+                logging.debug(traceback.format_exc())
+                self._unavailable.add(session_id)
+                return None
+            logging.debug('Reading statistics of session %s from device %s', session_id, device)
+            self._counters[session_id] = counters
+        return counters
+
+    def switch(self, session_id, source):
+        previous = self._sources.get(session_id, None)
+        self._sources[session_id] = source
+        if previous is not None and previous is not source and self._on_switch is not None:
+            logging.debug('Statistics source of session %s changed', session_id)
+            self._on_switch(session_id)
+
+    def __call__(self, session_id):
+        counters = self.counters(session_id)
+        if counters is not None:
+            try:
+                values = counters.read()
+                self.switch(session_id, counters)
+                return values
+            except (OSError, ValueError):
+                # Device is gone, probably recreated on reconnect
+                logging.debug(traceback.format_exc())
+                self.forget(session_id)
+        if self._fallback is not None:
+            values = self._fallback(session_id)
+            if values is not None:
+                self.switch(session_id, self._fallback)
+            return values
+        return None
+
+    def invalidate(self, session_id):
+        # The device may have appeared or changed, look it up again
+        self._unavailable.discard(session_id)
+
+    def forget(self, session_id):
+        self._unavailable.discard(session_id)
+        counters = self._counters.pop(session_id, None)
+        if counters is not None:
+            counters.close()
+
+    def retain(self, session_ids):
+        for session_id in list(self._sources):
+            if session_id not in session_ids:
+                del self._sources[session_id]
+        self._unavailable.intersection_update(session_ids)
+        for session_id in list(self._counters):
+            if session_id not in session_ids:
+                self.forget(session_id)
+
+    def close(self):
+        for session_id in list(self._counters):
+            self.forget(session_id)
+        self._unavailable.clear()
+        self._sources.clear()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+#
+# openvpn3-indicator - Simple indicator application for OpenVPN3.
+# Copyright (C) 2024 Grzegorz Gutowski <grzegorz.gutowski@uj.edu.pl>
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License,
+# or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.
+# If not, see <https://www.gnu.org/licenses/>.
+#
+
+import cProfile
+import io
+import logging
+import pstats
+import tracemalloc
+
+from openvpn3_indicator.user_directories import get_user_cache_file
+
+PROFILE_REPORT_LINES = 50
+MEMORY_REPORT_LINES = 50
+MEMORY_TRACEBACK_FRAMES = 10
+
+###
+#
+# Profiler
+#
+###
+
+
+class Profiler:
+
+    @property
+    def profiling(self):
+        return self._profile is not None
+
+    @property
+    def tracing(self):
+        return tracemalloc.is_tracing()
+
+    def __init__(self):
+        self._profile = None
+        self._snapshot = None
+
+    def start_profile(self):
+        if self._profile is None:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+            logging.info('Started profiling')
+
+    def stop_profile(self):
+        if self._profile is None:
+            return None
+        profile = self._profile
+        self._profile = None
+        profile.disable()
+        path = get_user_cache_file('profile', 'pstats')
+        profile.dump_stats(str(path))
+        report = io.StringIO()
+        stats = pstats.Stats(profile, stream=report)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(PROFILE_REPORT_LINES)
+        path.with_suffix('.txt').write_text(report.getvalue())
+        logging.info('Stopped profiling, results written to %s', path)
+        return path
+
+    def toggle_profile(self):
+        if self.profiling:
+            return self.stop_profile()
+        self.start_profile()
+        return None
+
+    def start_memory_tracing(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(MEMORY_TRACEBACK_FRAMES)
+            self._snapshot = None
+            logging.info('Started memory tracing')
+
+    def toggle_memory_tracing(self):
+        if self.tracing:
+            self.stop_memory_tracing()
+        else:
+            self.start_memory_tracing()
+
+    def take_memory_snapshot(self):
+        # Only allocations made while tracing are seen, so the first call
+        # starts tracing and returns None, snapshots are written from the second
+        if not tracemalloc.is_tracing():
+            self.start_memory_tracing()
+            return None
+        snapshot = tracemalloc.take_snapshot()
+        snapshot = snapshot.filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+            ])
+        path = get_user_cache_file('memory', 'tracemalloc')
+        snapshot.dump(str(path))
+        report = list()
+        current, peak = tracemalloc.get_traced_memory()
+        report.append(f'Traced memory: current {current} B, peak {peak} B')
+        report.append('')
+        report.append('Top allocations:')
+        for stat in snapshot.statistics('lineno')[:MEMORY_REPORT_LINES]:
+            report.append(str(stat))
+        if self._snapshot is not None:
+            report.append('')
+            report.append('Top differences since previous snapshot:')
+            for stat in snapshot.compare_to(self._snapshot, 'lineno')[:MEMORY_REPORT_LINES]:
+                report.append(str(stat))
+        path.with_suffix('.txt').write_text('\n'.join(report) + '\n')
+        self._snapshot = snapshot
+        logging.info('Memory snapshot written to %s', path)
+        return path
+
+    def stop_memory_tracing(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            logging.info('Stopped memory tracing')
+        self._snapshot = None
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+#
+# openvpn3-indicator - Simple indicator application for OpenVPN3.
+# Copyright (C) 2024 Grzegorz Gutowski <grzegorz.gutowski@uj.edu.pl>
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License,
+# or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.
+# If not, see <https://www.gnu.org/licenses/>.
+#
+
+import logging
+import random
+import time
+
+RECONNECT_INITIAL_DELAY = 2.0
+RECONNECT_MAXIMAL_DELAY = 300.0
+RECONNECT_FACTOR = 2.0
+# Fraction of the delay that is randomized, so that many clients
+# failing together do not come back in lockstep
+RECONNECT_JITTER = 0.5
+RECONNECT_MAX_ATTEMPTS = 8
+
+###
+#
+# ReconnectScheduler
+#
+###
+
+
+class ReconnectScheduler:
+
+    def __init__(self,
+            initial_delay=RECONNECT_INITIAL_DELAY,
+            maximal_delay=RECONNECT_MAXIMAL_DELAY,
+            factor=RECONNECT_FACTOR,
+            jitter=RECONNECT_JITTER,
+            max_attempts=RECONNECT_MAX_ATTEMPTS,
+            rng=None):
+        self._initial_delay = initial_delay
+        self._maximal_delay = maximal_delay
+        self._factor = factor
+        self._jitter = jitter
+        self._max_attempts = max_attempts
+        self._random = rng if rng is not None else random.Random()
+        self._attempts = dict()
+        self._deadlines = dict()
+
+    def attempts(self, config_id):
+        return self._attempts.get(config_id, 0)
+
+    def delay(self, attempt):
+        delay = min(self._initial_delay * self._factor ** (attempt - 1), self._maximal_delay)
+        return delay * (1.0 - self._jitter * self._random.random())
+
+    def schedule(self, config_id, now=None):
+        # Returns the delay of the next attempt, or None if the budget is spent
+        now = now if now is not None else time.monotonic()
+        attempt = self._attempts.get(config_id, 0) + 1
+        if attempt > self._max_attempts:
+            self._deadlines.pop(config_id, None)
+            logging.debug('Reconnect budget of %s exhausted after %d attempts', config_id, attempt - 1)
+            return None
+        self._attempts[config_id] = attempt
+        delay = self.delay(attempt)
+        self._deadlines[config_id] = now + delay
+        logging.debug('Reconnect attempt %d of %s scheduled in %.1fs', attempt, config_id, delay)
+        return delay
+
+    def pending(self, config_id, now=None):
+        # Seconds left until the scheduled attempt, or None
+        deadline = self._deadlines.get(config_id, None)
+        if deadline is None:
+            return None
+        now = now if now is not None else time.monotonic()
+        return max(deadline - now, 0.0)
+
+    def due(self, now=None):
+        now = now if now is not None else time.monotonic()
+        due = [ config_id for config_id, deadline in self._deadlines.items() if deadline <= now ]
+        for config_id in due:
+            del self._deadlines[config_id]
+        return due
+
+    def expedite(self, now=None):
+        # Pull pending attempts forward, e.g. when the network came back
+        now = now if now is not None else time.monotonic()
+        for config_id in self._deadlines:
+            self._deadlines[config_id] = min(self._deadlines[config_id], now)
+
+    def succeeded(self, config_id):
+        self._attempts.pop(config_id, None)
+        self._deadlines.pop(config_id, None)
+
+    def cancel(self, config_id):
+        if config_id in self._deadlines or config_id in self._attempts:
+            logging.debug('Reconnect of %s cancelled', config_id)
+        self._attempts.pop(config_id, None)
+        self._deadlines.pop(config_id, None)
+
+    def retain(self, config_ids):
+        for config_id in list(self._attempts):
+            if config_id not in config_ids:
+                self.cancel(config_id)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+#
+# openvpn3-indicator - Simple indicator application for OpenVPN3.
+# Copyright (C) 2024 Grzegorz Gutowski <grzegorz.gutowski@uj.edu.pl>
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License,
+# or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.
+# If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+import logging
+import traceback
+
+from gi.repository import GLib, Gio
+
+from openvpn3.constants import StatusMajor, StatusMinor
+
+from openvpn3_indicator.status import get_status_description
+
+# Command line verbs forwarded to the primary instance
+REMOTE_OPTIONS = [
+    ('connect', GLib.OptionArg.STRING, 'Connect configuration NAME in the running instance', 'NAME'),
+    ('disconnect', GLib.OptionArg.STRING, 'Disconnect sessions of configuration NAME in the running instance', 'NAME'),
+    ('status', GLib.OptionArg.NONE, 'Show configurations and sessions of the running instance', None),
+    ('pause-all', GLib.OptionArg.NONE, 'Pause all connected sessions of the running instance', None),
+]
+REMOTE_DISCONNECTED = 'Disconnected'
+
+
+def add_remote_options(application):
+    for name, argument, description, argument_description in REMOTE_OPTIONS:
+        application.add_main_option(name, 0, GLib.OptionFlags.NONE, argument, description, argument_description)
+
+
+def get_remote_command(options):
+    # Returns (verb, argument) of the first verb in the unpacked options, or None
+    for name, argument, description, argument_description in REMOTE_OPTIONS:
+        if name in options:
+            return name, options[name]
+    return None
+
+
+def check_remote_output():
+    # Printing to the invoking terminal needs GLib 2.80
+    return GLib.check_version(2, 80, 0) is None
+
+
+def check_primary_instance(application):
+    # Called in the invoking process, verbs need an instance to talk to.
+    # The invoking process never becomes the primary instance itself.
+    try:
+        bus = Gio.bus_get_sync(Gio.BusType.SESSION, None)
+        owned = bus.call_sync(
+                'org.freedesktop.DBus', '/org/freedesktop/DBus', 'org.freedesktop.DBus', 'NameHasOwner',
+                GLib.Variant('(s)', (application.get_application_id(),)), GLib.VariantType('(b)'),
+                Gio.DBusCallFlags.NONE, -1, None,
+            ).unpack()[0]
+        if not owned:
+            return False
+        application.set_flags(application.get_flags() | Gio.ApplicationFlags.IS_LAUNCHER)
+        application.register(None)
+    except GLib.Error:
+        logging.debug(traceback.format_exc())
+        return False
+    return application.get_is_remote()
+
+
+def run_remote_command(application, verb, argument, source=None):
+    # Works on the cached state of the running instance, returns (exit status, output lines)
+    if verb == 'status':
+        lines = list()
+        for config_id, config_name in sorted(application.config_names.items(), key=lambda item : item[1]):
+            session_ids = [ session_id for session_id in application.config_sessions.get(config_id, []) if session_id in application.session_statuses ]
+            if not session_ids:
+                lines.append(f'{config_name}\t{REMOTE_DISCONNECTED}')
+            for session_id in session_ids:
+                status = application.session_statuses[session_id]
+                lines.append(f'{config_name}\t{get_status_description(status["major"], status["minor"])}')
+        return 0, lines
+    if verb == 'pause-all':
+        paused = list()
+        for session_id, status in sorted(application.session_statuses.items()):
+            if StatusMajor.CONNECTION == status['major'] and status['minor'] in [StatusMinor.CONN_CONNECTED, StatusMinor.CONN_RECONNECTING]:
+                application.action_session_pause(source, session_id)
+                paused.append(session_id)
+        return 0, [ f'Pausing {len(paused)} sessions' ]
+    config_id = application.name_configs.get(argument, None)
+    if config_id is None:
+        return 1, [ f'Unknown configuration {argument}' ]
+    if verb == 'connect':
+        application.action_config_connect(source, config_id)
+        return 0, [ f'Connecting {argument}' ]
+    if verb == 'disconnect':
+        session_ids = list(application.config_sessions.get(config_id, []))
+        if not session_ids:
+            return 1, [ f'Configuration {argument} is not connected' ]
+        for session_id in session_ids:
+            application.action_session_disconnect(source, session_id)
+        return 0, [ f'Disconnecting {argument}' ]
+    return 1, [ f'Unknown command {verb}' ]
+
+
+def handle_remote_command(application, command_line, verb, argument):
+    # Runs in the primary instance, output goes to the invoking terminal
+    status, lines = run_remote_command(application, verb, argument, source=command_line)
+    logging.info('Command line %s %s: %s', verb, argument or '', status)
+    text = ''.join(f'{line}\n' for line in lines)
+    if status == 0:
+        command_line.print_literal(text)
+    else:
+        command_line.printerr_literal(text)
+    return status
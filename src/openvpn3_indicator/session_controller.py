@@ -0,0 +1,640 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+#
+# openvpn3-indicator - Simple indicator application for OpenVPN3.
+# Copyright (C) 2024 Grzegorz Gutowski <grzegorz.gutowski@uj.edu.pl>
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License,
+# or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.
+# If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+import functools
+import gettext
+import logging
+import time
+import traceback
+
+import openvpn3
+
+from openvpn3_indicator.instrumentation import instrumentation
+from openvpn3_indicator.log_buffer import lazy
+from openvpn3_indicator.connection_history import ConnectionHistory, EVENT_CONNECT_REQUESTED, EVENT_CONNECTED, EVENT_DISCONNECTED, EVENT_AUTH_FAILED, EVENT_CONNECTION_FAILED
+from openvpn3_indicator.connection_timeline import ConnectionTimeline, PHASE_READY_CONNECT, PHASE_CONNECTING, OUTCOME_CONNECTED, OUTCOME_FAILED, OUTCOME_AUTH_FAILED, OUTCOME_ABANDONED
+from openvpn3_indicator.reconnect_scheduler import ReconnectScheduler
+from openvpn3_indicator.session_log import SessionLogBuffer
+from openvpn3_indicator.session_registry import SessionRegistry
+from openvpn3_indicator.session_state_machine import SessionStateMachine
+from openvpn3_indicator.startup_plan import StartupPlan, parse_startup_action
+
+DEFAULT_CONFIG_NAME = gettext.gettext('UNKNOWN')
+# Seconds between forced refreshes of the session list
+SESSION_REFRESH_INTERVAL = 30
+
+###
+#
+# SessionController
+#
+###
+
+
+class SessionController:
+    # Session bookkeeping shared by the indicator and the headless daemon:
+    # the session list, the status transitions, stored credentials,
+    # reconnects, startup connections and the uplink and sleep handlers.
+    #
+    # The front-end sets settings, config_manager, session_manager and
+    # credential_store, calls init_sessions on startup, schedule_sessions
+    # every tick and close_sessions on shutdown. The defaults suit
+    # a front-end without a user to ask; the indicator overrides
+    # the credential and web authentication handlers.
+
+    def init_sessions(self, history_directory):
+        self.configs = dict()
+        self.config_names = dict()
+        self.name_configs = dict()
+        self.config_sessions = dict()
+        self.sessions = dict()
+        self.session_configs = dict()
+        self.session_statuses = dict()
+        self.sessions_connected = set()
+        self.failed_authentications = set()
+        self.sessions_paused_for_sleep = set()
+        self.provisional_sessions = set()
+        self.session_logs = dict()
+        self.session_devices = dict()
+        self.session_registry = SessionRegistry()
+        self.session_state_machine = self.construct_session_transitions()
+        self.connection_timeline = ConnectionTimeline()
+        self.reconnect_scheduler = ReconnectScheduler()
+        self.connection_history = None
+        if history_directory is not None:
+            try:
+                self.connection_history = ConnectionHistory(history_directory)
+            except OSError:
+                self.debug(traceback.format_exc())
+                self.warning('Failed to open connection history')
+        self.startup_plan = self.construct_startup_plan()
+        self.last_invalid = time.monotonic()
+        self.invalid_sessions = True
+        self.sessions_listed = False
+
+    def close_sessions(self):
+        self.session_registry.close()
+        if self.connection_history is not None:
+            self.connection_history.close()
+
+    def construct_startup_plan(self):
+        startup_config_ids, startup_config_names = list(), list()
+        try:
+            startup_action = self.settings.get_string('startup-action')
+            self.debug('Startup action: %s', startup_action)
+            startup_config_ids, startup_config_names = parse_startup_action(
+                    startup_action,
+                    self.settings.get_string('most-recent-configuration-id'),
+                    self.settings.get_strv('startup-configuration-names'),
+                )
+        except:
+            pass
+        if startup_config_ids or startup_config_names:
+            self.info('Startup configurations set to %s', ', '.join(startup_config_ids + startup_config_names))
+        return StartupPlan(startup_config_ids, startup_config_names)
+
+    def debug(self, msg, *args, notify=False, **kwargs):
+        logging.debug(msg, *args, **kwargs)
+
+    def info(self, msg, *args, notify=False, **kwargs):
+        logging.info(msg, *args, **kwargs)
+
+    def warning(self, msg, *args, notify=False, **kwargs):
+        logging.warning(msg, *args, **kwargs)
+
+    def error(self, msg, *args, notify=False, **kwargs):
+        logging.error(msg, *args, **kwargs)
+
+    def get_config_name(self, config_id):
+        return self.config_names.get(config_id, DEFAULT_CONFIG_NAME)
+
+    def get_session_name(self, session_id):
+        return self.get_config_name(self.session_configs.get(session_id, ''))
+
+    def record_history(self, event, config_id):
+        if self.connection_history is not None and config_id is not None:
+            self.connection_history.record(event, config_id)
+
+    def invalidate_sessions(self):
+        instrumentation.count('invalidate.sessions')
+        self.invalid_sessions = True
+
+    def schedule_sessions(self):
+        if self.last_invalid + SESSION_REFRESH_INTERVAL < time.monotonic():
+            self.debug('Forced refresh of sessions')
+            self.invalidate_sessions()
+        if self.invalid_sessions:
+            self.last_invalid = time.monotonic()
+            self.refresh_sessions()
+        for config_id in self.reconnect_scheduler.due():
+            self.debug('Reconnecting config %s, attempt %d.', config_id, self.reconnect_scheduler.attempts(config_id))
+            self.action_config_connect(None, config_id)
+        if self.startup_plan.pending:
+            # Configurations known only from the index are not resolved before the backend listed them,
+            # a configuration is retried every tick until it starts or the readiness timeout passes
+            if self.sessions_listed:
+                config_ids, missing = self.startup_plan.resolve(self.configs, self.name_configs)
+            else:
+                config_ids, missing = self.startup_plan.resolve(dict(), dict())
+            for config_id in config_ids:
+                if len(self.config_sessions.get(config_id, [])) > 0:
+                    self.startup_plan.dismiss(config_id)
+                    continue
+                self.debug('Starting config %s as requested in startup settings.', config_id)
+                if self.action_config_connect(None, config_id):
+                    self.startup_plan.started(config_id)
+            for target in missing:
+                self.warning('Startup configuration %s is not available', target, notify=True)
+
+    @instrumentation.timed('refresh_sessions')
+    def refresh_sessions(self):
+        if not self.invalid_sessions:
+            return
+        new_session_ids = set()
+        try:
+            new_sessions = dict()
+            instrumentation.count('dbus.FetchAvailableSessions')
+            for session in self.session_manager.FetchAvailableSessions():
+                session_id = str(session.GetPath())
+                if session_id not in self.sessions:
+                    new_sessions[session_id] = session
+                    self.subscribe_session_status(session_id, session)
+                    new_session_ids.add(session_id)
+                else:
+                    new_sessions[session_id] = self.sessions[session_id]
+            # Restored sessions get their current status replayed once
+            new_session_ids.update(self.provisional_sessions.intersection(new_sessions))
+            new_configs = dict()
+            instrumentation.count('dbus.FetchAvailableConfigs')
+            for config in self.config_manager.FetchAvailableConfigs():
+                config_id = str(config.GetPath())
+                if config_id not in self.configs:
+                    new_configs[config_id] = config
+                else:
+                    new_configs[config_id] = self.configs[config_id]
+            new_config_names = dict()
+            for config_id, config in new_configs.items():
+                instrumentation.count('dbus.GetConfigName')
+                config_name = str(config.GetConfigName())
+                new_config_names[config_id] = config_name
+            new_config_sessions = dict()
+            new_session_configs = dict()
+            for config_id, config_name in new_config_names.items():
+                new_config_sessions[config_id] = list()
+                instrumentation.count('dbus.LookupConfigName')
+                for session_id in self.session_manager.LookupConfigName(config_name):
+                    session_id = str(session_id)
+                    new_config_sessions[config_id].append(session_id)
+                    new_session_configs[session_id] = config_id
+            new_session_statuses = dict()
+            for session_id, session in new_sessions.items():
+                instrumentation.count('dbus.GetStatus')
+                status = session.GetStatus()
+                new_session_statuses[session_id] = {
+                    'major' : openvpn3.StatusMajor(status['major']),
+                    'minor' : openvpn3.StatusMinor(status['minor']),
+                    'message' : str(status['message']),
+                }
+            for session_id in self.sessions_connected.difference(new_sessions):
+                self.record_history(EVENT_DISCONNECTED, self.session_configs.get(session_id, None))
+            self.sessions = new_sessions
+            self.configs = new_configs
+            self.config_names = new_config_names
+            self.name_configs = dict([(value, key) for key,value in new_config_names.items()])
+            self.config_sessions = new_config_sessions
+            self.session_configs = new_session_configs
+            self.session_statuses = new_session_statuses
+            self.provisional_sessions = set()
+            self.sessions_connected.intersection_update(self.sessions)
+            self.failed_authentications.intersection_update(self.configs)
+            self.sessions_paused_for_sleep.intersection_update(self.sessions)
+            for session_id in list(self.session_devices):
+                if session_id not in self.sessions:
+                    del self.session_devices[session_id]
+            self.connection_timeline.retain(self.sessions)
+            self.reconnect_scheduler.retain(self.configs)
+            self.sessions_listed = True
+            self.sessions_refreshed()
+
+            self.debug('Configs: %s', lazy(sorted, new_configs.keys()))
+            self.debug('Sessions: %s', lazy(sorted, new_sessions.keys()))
+            self.debug('Config names: %s', new_config_names)
+            self.debug('Config sessions: %s', new_config_sessions)
+            self.debug('Session configs: %s', new_session_configs)
+            self.debug('Session statuses: %s', new_session_statuses)
+            self.invalid_sessions = False
+        except: #TODO: Catch only expected exceptions
+            self.debug(traceback.format_exc())
+            self.warning('Session list refresh failed')
+        for session_id in new_session_ids.intersection(self.session_statuses):
+            session_status = self.session_statuses[session_id]
+            self.on_session_event(session_id, session_status['major'], session_status['minor'], session_status['message'])
+        # Subscriptions, dialogs, logs and indicators of sessions that are gone
+        self.session_registry.retain(self.sessions)
+        self.session_state_machine.retain(self.sessions)
+
+    def sessions_refreshed(self):
+        # Called after refresh_sessions replaced the session list
+        pass
+
+    def subscribe_session_status(self, session_id, session):
+        # Bind session_id now, a closure over a loop variable would see its last value
+        instrumentation.count('dbus.StatusChangeCallback')
+        session.StatusChangeCallback(functools.partial(self.on_session_event, session_id))
+        self.session_registry.own(session_id, 'status', session, self.unsubscribe_session_status)
+
+    def unsubscribe_session_status(self, session):
+        instrumentation.count('dbus.StatusChangeCallback')
+        session.StatusChangeCallback(None)
+
+    def subscribe_session_log(self, session_id):
+        log = self.session_logs.get(session_id, None)
+        if log is None:
+            log = self.session_logs[session_id] = SessionLogBuffer()
+            self.session_registry.own(session_id, 'log_buffer', log, lambda log : self.session_logs.pop(session_id, None))
+        resources = self.session_registry.get(session_id)
+        if resources is not None and 'log' in resources:
+            # Already subscribed, a second callback would add another match rule
+            return log
+        try:
+            session = self.sessions[session_id]
+            instrumentation.count('dbus.LogCallback')
+            session.LogCallback(functools.partial(self.on_session_log, session_id))
+            self.session_registry.own(session_id, 'log', session, self.unsubscribe_session_log)
+        except: #TODO: Catch only expected exceptions
+            self.debug(traceback.format_exc())
+            self.warning('Failed to subscribe to log of session %s', session_id)
+        return log
+
+    def unsubscribe_session_log(self, session):
+        instrumentation.count('dbus.LogCallback')
+        session.LogCallback(None)
+
+    def on_session_log(self, session_id, group, category, message):
+        log = self.session_logs.get(session_id, None)
+        if log is None:
+            return
+        try:
+            category = openvpn3.LogCategory(category).name
+        except ValueError:
+            pass
+        log.append(group, category, message)
+
+    def on_session_manager_event(self, event):
+        self.info('Session Manager Event %s', event)
+        event_type = event.GetType()
+        if openvpn3.SessionManagerEventType.SESS_CREATED == event_type:
+            self.invalidate_sessions()
+        elif openvpn3.SessionManagerEventType.SESS_DESTROYED == event_type:
+            self.invalidate_sessions()
+
+    @instrumentation.timed('on_session_event')
+    def on_session_event(self, session_id, major, minor, message):
+        if session_id not in self.sessions:
+            return
+        major = openvpn3.StatusMajor(major)
+        minor = openvpn3.StatusMinor(minor)
+        message = str(message)
+        self.info('Session Event %s %s %s', major, minor, message)
+        self.session_statuses[session_id] = {
+            'major' : major,
+            'minor' : minor,
+            'message' : message,
+        }
+        self.session_devices.pop(session_id, None)
+        if not (openvpn3.StatusMajor.CONNECTION == major and openvpn3.StatusMinor.CFG_REQUIRE_USER == minor):
+            # The session moved on without the credentials from the dialog
+            self.session_registry.release(session_id, 'credentials')
+        self.session_state_machine.dispatch(session_id, major, minor, message)
+        self.session_status_changed(session_id)
+
+    def session_status_changed(self, session_id):
+        # Called after on_session_event dispatched a new status
+        pass
+
+    def construct_session_transitions(self):
+        machine = SessionStateMachine()
+        machine.on(openvpn3.StatusMajor.CONNECTION, openvpn3.StatusMinor.CFG_OK, self.on_session_config_ok, guard=self.is_session_not_connected)
+        machine.on(openvpn3.StatusMajor.CONNECTION, openvpn3.StatusMinor.CFG_REQUIRE_USER, self.on_session_require_user)
+        machine.on(openvpn3.StatusMajor.SESSION, openvpn3.StatusMinor.SESS_AUTH_URL, self.on_session_auth_url)
+        machine.on(openvpn3.StatusMajor.CONNECTION, openvpn3.StatusMinor.CONN_CONNECTED, self.on_session_connected)
+        machine.on(openvpn3.StatusMajor.CONNECTION, openvpn3.StatusMinor.CONN_AUTH_FAILED, self.on_session_auth_failed)
+        machine.on(openvpn3.StatusMajor.CONNECTION, openvpn3.StatusMinor.CONN_AUTH_FAILED, self.on_session_auth_retry, guard=self.is_session_config_known)
+        machine.on(openvpn3.StatusMajor.CONNECTION, openvpn3.StatusMinor.CONN_FAILED, self.on_session_failed)
+        machine.on(openvpn3.StatusMajor.CONNECTION, openvpn3.StatusMinor.CONN_DISCONNECTED, self.on_session_disconnected)
+        return machine
+
+    def is_session_not_connected(self, event):
+        return event.session_id not in self.sessions_connected
+
+    def is_session_config_known(self, event):
+        return self.session_configs.get(event.session_id, None) is not None
+
+    def on_session_config_ok(self, event):
+        try:
+            self.session_ready_connect(event.session_id)
+        except: #TODO: Catch only expected exceptions
+            self.debug(traceback.format_exc())
+
+    def session_ready_connect(self, session_id):
+        session = self.sessions[session_id]
+        self.connection_timeline.begin(session_id, PHASE_READY_CONNECT)
+        instrumentation.count('dbus.Ready')
+        session.Ready()
+        instrumentation.count('dbus.Connect')
+        session.Connect()
+        self.connection_timeline.begin(session_id, PHASE_CONNECTING)
+        self.sessions_connected.add(session_id)
+
+    def can_store_input_slot(self, input_slot):
+        type, group = input_slot.GetTypeGroup()
+        result = type == openvpn3.ClientAttentionType.CREDENTIALS and group in [
+                openvpn3.ClientAttentionGroup.UNSET,
+                openvpn3.ClientAttentionGroup.USER_PASSWORD,
+                openvpn3.ClientAttentionGroup.HTTP_PROXY_CREDS,
+                openvpn3.ClientAttentionGroup.PK_PASSPHRASE,
+                #openvpn3.ClientAttentionGroup.CHALLENGE_STATIC,
+                #openvpn3.ClientAttentionGroup.CHALLENGE_DYNAMIC,
+                #openvpn3.ClientAttentionGroup.CHALLENGE_AUTH_PENDING,
+            ]
+        self.debug('Input slot %s of type %s, group %s is decided %ssafe for storage', lazy(input_slot.GetLabel), type, group, '' if result else 'not ')
+        return result
+
+    def session_required_credentials(self, session_id):
+        # Returns (description, mask, can_store) of every credentials input slot
+        required_credentials = list()
+        instrumentation.count('dbus.FetchUserInputSlots')
+        for input_slot in self.sessions[session_id].FetchUserInputSlots():
+            if input_slot.GetTypeGroup()[0] != openvpn3.ClientAttentionType.CREDENTIALS:
+                continue
+            description = str(input_slot.GetLabel())
+            mask = bool(input_slot.GetInputMask())
+            can_store = self.can_store_input_slot(input_slot)
+            required_credentials.append((description, mask, can_store))
+        return required_credentials
+
+    @instrumentation.timed('store_get_credentials')
+    def store_get_credentials(self, config_id):
+        credentials = dict()
+        store = self.credential_store[config_id]
+        for key in store.keys():
+            credentials[key] = store[key]
+        return credentials
+
+    def on_session_require_user(self, event):
+        # Without a user to ask, stored credentials are the only option
+        session_id = event.session_id
+        config_id = self.session_configs.get(session_id, None)
+        try:
+            credentials = dict()
+            if config_id is not None and config_id not in self.failed_authentications:
+                credentials = self.store_get_credentials(config_id)
+            missing = [ description for description, mask, can_store in self.session_required_credentials(session_id) if description not in credentials ]
+        except: #TODO: Catch only expected exceptions
+            self.debug(traceback.format_exc())
+            self.action_session_disconnect(None, session_id)
+            return
+        if missing:
+            self.error('Session %s requires credentials that are not stored: %s', self.get_session_name(session_id), ', '.join(missing))
+            self.give_up(config_id)
+            self.action_session_disconnect(None, session_id)
+            return
+        self.on_session_credentials(session_id, credentials)
+
+    def on_session_credentials(self, session_id, credentials):
+        session = self.sessions[session_id]
+        try:
+            instrumentation.count('dbus.FetchUserInputSlots')
+            for input_slot in session.FetchUserInputSlots():
+                if input_slot.GetTypeGroup()[0] != openvpn3.ClientAttentionType.CREDENTIALS:
+                    continue
+                instrumentation.count('dbus.ProvideInput')
+                input_slot.ProvideInput(credentials.get(input_slot.GetLabel(), ''))
+            self.session_ready_connect(session_id)
+        except: #TODO: Catch only expected exceptions
+            self.debug(traceback.format_exc())
+            self.action_session_disconnect(None, session_id)
+
+    def on_session_auth_url(self, event):
+        self.warning('Session %s requires web authentication at %s', self.get_session_name(event.session_id), event.message)
+
+    def on_session_connected(self, event):
+        session_id = event.session_id
+        config_id = self.session_configs.get(session_id, None)
+        self.record_history(EVENT_CONNECTED, config_id)
+        self.connection_timeline.finish(session_id, OUTCOME_CONNECTED)
+        if config_id is not None:
+            self.reconnect_scheduler.succeeded(config_id)
+            self.report_startup_connected(config_id)
+            self.failed_authentications.discard(config_id)
+
+    def on_session_auth_failed(self, event):
+        #TODO: Notify authentication failure
+        session_id = event.session_id
+        self.connection_timeline.finish(session_id, OUTCOME_AUTH_FAILED)
+        self.action_session_disconnect(None, session_id)
+        self.record_history(EVENT_AUTH_FAILED, self.session_configs.get(session_id, None))
+
+    def on_session_auth_retry(self, event):
+        # Retrying with the same stored credentials could lock the account
+        config_id = self.session_configs[event.session_id]
+        self.failed_authentications.add(config_id)
+        self.error('Authentication of %s failed, not retrying with stored credentials', self.get_config_name(config_id))
+        self.give_up(config_id)
+
+    def on_session_failed(self, event):
+        #TODO: Notify connection failure
+        session_id = event.session_id
+        self.record_history(EVENT_CONNECTION_FAILED, self.session_configs.get(session_id, None))
+        self.connection_timeline.finish(session_id, OUTCOME_FAILED)
+        self.action_session_disconnect(None, session_id)
+        self.schedule_reconnect(self.session_configs.get(session_id, None))
+
+    def on_session_disconnected(self, event):
+        self.connection_timeline.finish(event.session_id, OUTCOME_ABANDONED)
+
+    def report_startup_connected(self, config_id):
+        duration = self.startup_plan.connected(config_id)
+        if duration is None:
+            return
+        self.info('Startup configuration %s connected in %.1f seconds', self.get_config_name(config_id), duration)
+        if self.startup_plan.done:
+            times = self.startup_plan.times()
+            summary = ', '.join(gettext.gettext('{name} in {seconds:.1f} s').format(name=self.get_config_name(config_id), seconds=seconds) for config_id, seconds in sorted(times.items(), key=lambda item : item[1]))
+            self.info('Startup connections ready: %s', summary, notify=len(times) > 1)
+
+    def schedule_reconnect(self, config_id):
+        if config_id is None:
+            return
+        attempts = self.reconnect_scheduler.attempts(config_id)
+        delay = self.reconnect_scheduler.schedule(config_id)
+        if delay is None:
+            self.give_up(config_id)
+            self.warning('Giving up reconnecting %s after %d attempts', self.get_config_name(config_id), attempts, notify=True)
+            return
+        self.info('Reconnecting %s in %.0f seconds', self.get_config_name(config_id), delay)
+
+    def give_up(self, config_id):
+        # No more retries or startup attempts until the user connects again
+        if config_id is not None:
+            self.reconnect_scheduler.cancel(config_id)
+            self.startup_plan.forget(config_id)
+
+    def sessions_in_progress(self):
+        session_ids = list()
+        for session_id, status in list(self.session_statuses.items()):
+            if openvpn3.StatusMajor.CONNECTION != status['major']:
+                continue
+            if status['minor'] not in [openvpn3.StatusMinor.CONN_CONNECTED, openvpn3.StatusMinor.CONN_RECONNECTING]:
+                continue
+            session_ids.append(session_id)
+        return session_ids
+
+    def on_uplink_change(self, reasons):
+        self.info('Uplink changed: %s', ', '.join(reasons))
+        for session_id in self.sessions_in_progress():
+            self.action_session_restart(None, session_id)
+        self.reconnect_scheduler.expedite()
+
+    def on_sleep(self):
+        self.info('Preparing for sleep')
+        for session_id in self.sessions_in_progress():
+            self.action_session_pause(None, session_id)
+            self.sessions_paused_for_sleep.add(session_id)
+
+    def on_wake(self):
+        self.info('Woke up from sleep')
+        for session_id in sorted(self.sessions_paused_for_sleep):
+            self.action_session_resume(None, session_id)
+        self.sessions_paused_for_sleep.clear()
+        self.reconnect_scheduler.expedite()
+        self.invalidate_sessions()
+
+    def get_session_device_name(self, session_id):
+        session = self.sessions.get(session_id, None)
+        if session is None:
+            return None
+        instrumentation.count('dbus.GetDeviceName')
+        return str(session.GetDeviceName())
+
+    def is_session_device(self, name):
+        # Device names are cached until the session status changes, the tunnel device
+        # does not exist before the session connects and may be replaced on reconnect
+        for session_id in self.sessions:
+            if session_id not in self.session_devices:
+                try:
+                    device_name = self.get_session_device_name(session_id)
+                except: #TODO: Catch only expected exceptions
+                    self.debug(traceback.format_exc())
+                    continue
+                if not device_name:
+                    continue
+                self.session_devices[session_id] = device_name
+            if self.session_devices[session_id] == name:
+                return True
+        return False
+
+    def action_config_connect(self, _object, config_id):
+        # Returns True when a new session was requested
+        self.info('Connect Config %s', config_id)
+        if _object is not None:
+            # Menu actions pass the menu item and command line verbs the command line,
+            # retries and startup pass None
+            self.reconnect_scheduler.cancel(config_id)
+        if config_id not in self.configs and config_id in self.config_names:
+            # Known only from the index, the backend has not been listed yet
+            try:
+                instrumentation.count('dbus.Retrieve')
+                self.configs[config_id] = self.config_manager.Retrieve(config_id)
+            except: #TODO: Catch only expected exceptions
+                self.debug(traceback.format_exc())
+                self.invalidate_sessions()
+        if config_id not in self.configs:
+            return False
+        try:
+            attempt = self.connection_timeline.start(config_id)
+            instrumentation.count('dbus.NewTunnel')
+            session = self.session_manager.NewTunnel(self.configs[config_id])
+            self.connection_timeline.bind(attempt, str(session.GetPath()))
+            self.settings.set_string('most-recent-configuration-id', config_id)
+            self.record_history(EVENT_CONNECT_REQUESTED, config_id)
+        except: #TODO: Catch only expected exceptions
+            self.debug(traceback.format_exc())
+            return False
+        return True
+
+    def action_session_connect(self, _object, session_id):
+        self.info('Connect Session %s', session_id)
+        if session_id not in self.sessions:
+            return
+        try:
+            instrumentation.count('dbus.Connect')
+            self.sessions[session_id].Connect()
+        except: #TODO: Catch only expected exceptions
+            self.debug(traceback.format_exc())
+            pass
+
+    def action_session_pause(self, _object, session_id):
+        self.info('Pause Session %s', session_id)
+        if session_id not in self.sessions:
+            return
+        try:
+            instrumentation.count('dbus.Pause')
+            self.sessions[session_id].Pause()
+        except: #TODO: Catch only expected exceptions
+            self.debug(traceback.format_exc())
+            pass
+
+    def action_session_resume(self, _object, session_id):
+        self.info('Resume Session %s', session_id)
+        if session_id not in self.sessions:
+            return
+        try:
+            instrumentation.count('dbus.Resume')
+            self.sessions[session_id].Resume()
+        except: #TODO: Catch only expected exceptions
+            self.debug(traceback.format_exc())
+            pass
+
+    def action_session_restart(self, _object, session_id):
+        self.info('Restart Session %s', session_id)
+        if session_id not in self.sessions:
+            return
+        try:
+            instrumentation.count('dbus.Restart')
+            self.sessions[session_id].Restart()
+        except: #TODO: Catch only expected exceptions
+            self.debug(traceback.format_exc())
+            pass
+
+    def action_session_disconnect(self, _object, session_id):
+        self.info('Disconnect Session %s', session_id)
+        if _object is not None:
+            self.give_up(self.session_configs.get(session_id, None))
+        if session_id not in self.sessions:
+            return
+        try:
+            instrumentation.count('dbus.Disconnect')
+            self.sessions[session_id].Disconnect()
+        except: #TODO: Catch only expected exceptions
+            self.debug(traceback.format_exc())
+            pass
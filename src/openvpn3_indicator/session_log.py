@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+#
+# openvpn3-indicator - Simple indicator application for OpenVPN3.
+# Copyright (C) 2024 Grzegorz Gutowski <grzegorz.gutowski@uj.edu.pl>
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License,
+# or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.
+# If not, see <https://www.gnu.org/licenses/>.
+#
+
+import collections
+import time
+
+SESSION_LOG_CAPACITY = 5000
+
+SessionLogEntry = collections.namedtuple(
+        'SessionLogEntry',
+        ['timestamp', 'group', 'category', 'message']
+    )
+
+###
+#
+# SessionLogBuffer
+#
+###
+
+
+class SessionLogBuffer:
+
+    @property
+    def capacity(self):
+        return self._entries.maxlen
+
+    @property
+    def dropped(self):
+        return self._dropped
+
+    def __init__(self, capacity=SESSION_LOG_CAPACITY):
+        self._entries = collections.deque(maxlen=capacity)
+        self._pending = collections.deque(maxlen=capacity)
+        self._dropped = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def append(self, group, category, message, timestamp=None):
+        entry = SessionLogEntry(
+                timestamp=timestamp if timestamp is not None else time.time(),
+                group=group,
+                category=category,
+                message=message,
+            )
+        if len(self._pending) == self._pending.maxlen:
+            self._dropped += 1
+        self._entries.append(entry)
+        self._pending.append(entry)
+        return entry
+
+    def entries(self):
+        return list(self._entries)
+
+    def take_pending(self):
+        # Entries appended since the previous call, at most capacity of them
+        pending = list(self._pending)
+        self._pending.clear()
+        return pending
+
+    def clear(self):
+        self._entries.clear()
+        self._pending.clear()
+        self._dropped = 0
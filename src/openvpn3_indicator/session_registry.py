@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+#
+# openvpn3-indicator - Simple indicator application for OpenVPN3.
+# Copyright (C) 2024 Grzegorz Gutowski <grzegorz.gutowski@uj.edu.pl>
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License,
+# or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.
+# If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+import logging
+import traceback
+
+###
+#
+# SessionResources
+#
+###
+
+
+class SessionResources:
+    # Resources owned by one session, each with the function that releases it
+
+    @property
+    def session_id(self):
+        return self._session_id
+
+    def __init__(self, session_id):
+        self._session_id = session_id
+        self._resources = dict()
+
+    def __contains__(self, name):
+        return name in self._resources
+
+    def __len__(self):
+        return len(self._resources)
+
+    def names(self):
+        return list(self._resources)
+
+    def get(self, name, default=None):
+        entry = self._resources.get(name, None)
+        if entry is None:
+            return default
+        return entry[0]
+
+    def own(self, name, resource, release):
+        # Takes over the resource, releasing the one it replaces
+        previous = self._resources.get(name, None)
+        self._resources[name] = (resource, release)
+        if previous is not None and previous[0] is not resource:
+            self.call(name, *previous)
+
+    def disown(self, name, resource=None):
+        # Forgets the resource without releasing it, if given only when it is still owned
+        entry = self._resources.get(name, None)
+        if entry is None or (resource is not None and entry[0] is not resource):
+            return None
+        del self._resources[name]
+        return entry[0]
+
+    def release(self, name):
+        entry = self._resources.pop(name, None)
+        if entry is not None:
+            self.call(name, *entry)
+
+    def close(self):
+        # Resources are released in reverse order of acquisition
+        for name in reversed(list(self._resources)):
+            self.release(name)
+
+    def call(self, name, resource, release):
+        try:
+            release(resource)
+        except Exception:
+            logging.debug(traceback.format_exc())
+            logging.warning('Failed to release %s of session %s', name, self._session_id)
+
+###
+#
+# SessionRegistry
+#
+###
+
+
+class SessionRegistry:
+
+    def __init__(self):
+        self._sessions = dict()
+
+    def __contains__(self, session_id):
+        return session_id in self._sessions
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __getitem__(self, session_id):
+        resources = self._sessions.get(session_id, None)
+        if resources is None:
+            resources = self._sessions[session_id] = SessionResources(session_id)
+        return resources
+
+    def get(self, session_id):
+        return self._sessions.get(session_id, None)
+
+    def own(self, session_id, name, resource, release):
+        self[session_id].own(name, resource, release)
+
+    def disown(self, session_id, name, resource=None):
+        resources = self._sessions.get(session_id, None)
+        if resources is None:
+            return None
+        return resources.disown(name, resource)
+
+    def release(self, session_id, name):
+        resources = self._sessions.get(session_id, None)
+        if resources is not None:
+            resources.release(name)
+
+    def remove(self, session_id):
+        resources = self._sessions.pop(session_id, None)
+        if resources is not None:
+            logging.debug('Releasing %s resources of session %s', len(resources), session_id)
+            resources.close()
+
+    def retain(self, session_ids):
+        removed = [ session_id for session_id in self._sessions if session_id not in session_ids ]
+        for session_id in removed:
+            self.remove(session_id)
+        return removed
+
+    def counts(self):
+        counts = dict()
+        for resources in self._sessions.values():
+            for name in resources.names():
+                counts[name] = counts.get(name, 0) + 1
+        return counts
+
+    def close(self):
+        for session_id in list(self._sessions):
+            self.remove(session_id)
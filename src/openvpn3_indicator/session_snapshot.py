@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+#
+# openvpn3-indicator - Simple indicator application for OpenVPN3.
+# Copyright (C) 2024 Grzegorz Gutowski <grzegorz.gutowski@uj.edu.pl>
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License,
+# or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.
+# If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+import json
+import logging
+import os
+import pathlib
+import traceback
+
+from openvpn3_indicator.connection_history import get_boot_id
+
+SNAPSHOT_FILE_NAME = 'sessions.json'
+SNAPSHOT_VERSION = 1
+
+###
+#
+# SessionSnapshot
+#
+###
+
+
+class SessionSnapshot:
+    # Last known state of sessions, written atomically on change and
+    # used as a provisional view by the next instance in the same boot
+
+    @property
+    def path(self):
+        return self._path
+
+    def __init__(self, path):
+        self._path = pathlib.Path(path)
+        self._written = None
+
+    def load(self):
+        try:
+            with open(self._path, 'r', encoding='utf-8') as stream:
+                data = json.load(stream)
+            if data.get('version', None) != SNAPSHOT_VERSION:
+                return None
+            # Sessions do not survive a reboot
+            if data.get('boot_id', None) != get_boot_id():
+                return None
+            sessions = dict()
+            for session_id, session in data.get('sessions', dict()).items():
+                sessions[str(session_id)] = {
+                    'config' : session.get('config', None),
+                    'major' : int(session['major']),
+                    'minor' : int(session['minor']),
+                    'message' : str(session.get('message', '')),
+                }
+            return {
+                'sessions' : sessions,
+                'sessions_connected' : set(str(session_id) for session_id in data.get('sessions_connected', list()) if session_id in sessions),
+                'failed_authentications' : set(str(config_id) for config_id in data.get('failed_authentications', list())),
+            }
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError, KeyError, AttributeError):
+            logging.debug(traceback.format_exc())
+            logging.warning('Ignoring unreadable session snapshot %s', self._path)
+            return None
+
+    def save(self, sessions, sessions_connected, failed_authentications):
+        data = json.dumps({
+            'version' : SNAPSHOT_VERSION,
+            'boot_id' : get_boot_id(),
+            'sessions' : sessions,
+            'sessions_connected' : sorted(sessions_connected),
+            'failed_authentications' : sorted(failed_authentications),
+        }, indent=1, sort_keys=True)
+        if data == self._written:
+            return False
+        temporary = self._path.with_name(f'.{self._path.name}.{os.getpid()}.tmp')
+        try:
+            self._path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            with open(temporary, 'w', encoding='utf-8') as stream:
+                stream.write(data)
+            os.replace(temporary, self._path)
+            self._written = data
+            return True
+        except OSError:
+            logging.debug(traceback.format_exc())
+            logging.warning('Failed to write session snapshot %s', self._path)
+            try:
+                os.unlink(temporary)
+            except OSError:
+                pass
+            return False
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+#
+# openvpn3-indicator - Simple indicator application for OpenVPN3.
+# Copyright (C) 2024 Grzegorz Gutowski <grzegorz.gutowski@uj.edu.pl>
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License,
+# or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.
+# If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+import collections
+import logging
+import time
+
+TRANSITION_LOG_CAPACITY = 500
+
+SessionEvent = collections.namedtuple(
+        'SessionEvent',
+        ['session_id', 'major', 'minor', 'message', 'previous']
+    )
+
+Transition = collections.namedtuple(
+        'Transition',
+        ['name', 'action', 'guard']
+    )
+
+TransitionRecord = collections.namedtuple(
+        'TransitionRecord',
+        ['timestamp', 'session_id', 'previous', 'state', 'message', 'actions']
+    )
+
+
+def format_state(state):
+    if state is None:
+        return '<none>'
+    return '/'.join(str(getattr(part, 'name', part)) for part in state)
+
+###
+#
+# SessionStateMachine
+#
+###
+
+
+class SessionStateMachine:
+    # Maps a (major, minor) status to the transitions it triggers.
+    # Actions and guards receive a SessionEvent, guards return whether
+    # their action runs. Actions of one status run in registration order.
+
+    def __init__(self, log_capacity=TRANSITION_LOG_CAPACITY):
+        self._table = dict()
+        self._states = dict()
+        self._log = collections.deque(maxlen=log_capacity)
+
+    def on(self, major, minor, action, guard=None, name=None):
+        name = name if name is not None else getattr(action, '__name__', str(action))
+        self._table.setdefault((major, minor), list()).append(Transition(name=name, action=action, guard=guard))
+
+    def transitions(self):
+        return dict((state, [ transition.name for transition in transitions ]) for state, transitions in self._table.items())
+
+    def state(self, session_id):
+        return self._states.get(session_id, None)
+
+    def dispatch(self, session_id, major, minor, message='', timestamp=None):
+        state = (major, minor)
+        previous = self._states.get(session_id, None)
+        self._states[session_id] = state
+        event = SessionEvent(session_id=session_id, major=major, minor=minor, message=message, previous=previous)
+        actions = list()
+        for transition in self._table.get(state, ()):
+            if transition.guard is not None and not transition.guard(event):
+                continue
+            actions.append(transition.name)
+            transition.action(event)
+        record = TransitionRecord(
+                timestamp=timestamp if timestamp is not None else time.time(),
+                session_id=session_id,
+                previous=previous,
+                state=state,
+                message=message,
+                actions=actions,
+            )
+        self._log.append(record)
+        if actions:
+            logging.debug('Session %s went from %s to %s: %s', session_id, format_state(previous), format_state(state), ', '.join(actions))
+        return actions
+
+    def forget(self, session_id):
+        self._states.pop(session_id, None)
+
+    def retain(self, session_ids):
+        for session_id in list(self._states):
+            if session_id not in session_ids:
+                self.forget(session_id)
+
+    def log(self, session_id=None):
+        return [ record for record in self._log if session_id is None or record.session_id == session_id ]
+
+    def report(self, session_names=None):
+        session_names = session_names or dict()
+        lines = list()
+        for record in self._log:
+            timestamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(record.timestamp))
+            name = session_names.get(record.session_id, record.session_id)
+            lines.append(f'{timestamp} {name}: {format_state(record.previous)} -> {format_state(record.state)} [{", ".join(record.actions)}] {record.message}'.rstrip())
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+#
+# openvpn3-indicator - Simple indicator application for OpenVPN3.
+# Copyright (C) 2024 Grzegorz Gutowski <grzegorz.gutowski@uj.edu.pl>
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License,
+# or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.
+# If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+import logging
+import os
+import traceback
+
+import dbus
+
+from openvpn3_indicator.about import APPLICATION_TITLE
+
+LOGIND_BUS_NAME = 'org.freedesktop.login1'
+LOGIND_PATH = '/org/freedesktop/login1'
+LOGIND_MANAGER_INTERFACE = 'org.freedesktop.login1.Manager'
+
+###
+#
+# SleepMonitor
+#
+###
+
+
+class SleepMonitor:
+    # Holds a logind delay inhibitor while awake, so that sleep waits
+    # until on_sleep returns and the inhibitor is released
+
+    @property
+    def inhibited(self):
+        return self._inhibitor is not None
+
+    def __init__(self, bus, on_sleep, on_wake):
+        self._bus = bus
+        self._on_sleep = on_sleep
+        self._on_wake = on_wake
+        self._inhibitor = None
+        self._manager = dbus.Interface(self._bus.get_object(LOGIND_BUS_NAME, LOGIND_PATH), dbus_interface=LOGIND_MANAGER_INTERFACE)
+        self._signal_match = self._bus.add_signal_receiver(
+            self.on_prepare_for_sleep,
+            signal_name='PrepareForSleep',
+            dbus_interface=LOGIND_MANAGER_INTERFACE,
+            bus_name=LOGIND_BUS_NAME,
+            path=LOGIND_PATH,
+        )
+        self.inhibit()
+
+    def inhibit(self):
+        if self._inhibitor is not None:
+            return
+        try:
+            self._inhibitor = self._manager.Inhibit('sleep', APPLICATION_TITLE, 'Pausing VPN sessions before sleep', 'delay').take()
+            logging.debug('Sleep delay inhibitor taken')
+        except dbus.exceptions.DBusException:
+            logging.debug(traceback.format_exc())
+            logging.warning('Failed to take sleep delay inhibitor')
+
+    def release(self):
+        if self._inhibitor is None:
+            return
+        try:
+            os.close(self._inhibitor)
+        except OSError:
+            logging.debug(traceback.format_exc())
+        self._inhibitor = None
+        logging.debug('Sleep delay inhibitor released')
+
+    def on_prepare_for_sleep(self, sleeping):
+        if sleeping:
+            try:
+                self._on_sleep()
+            finally:
+                self.release()
+        else:
+            self.inhibit()
+            self._on_wake()
+
+    def close(self):
+        self._signal_match.remove()
+        self.release()
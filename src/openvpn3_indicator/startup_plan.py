@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+#
+# openvpn3-indicator - Simple indicator application for OpenVPN3.
+# Copyright (C) 2024 Grzegorz Gutowski <grzegorz.gutowski@uj.edu.pl>
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License,
+# or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.
+# If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+import logging
+import re
+import time
+
+# How long to wait for the backend to list the startup configurations
+STARTUP_READINESS_TIMEOUT = 30.0
+
+STARTUP_NONE = ''
+STARTUP_RESTART = 'RESTART'
+STARTUP_NAMES = 'STARTNAMES'
+
+
+def parse_startup_action(startup_action, most_recent_id='', names=None):
+    # Returns lists of configuration ids and names to start
+    startup_action = startup_action or STARTUP_NONE
+    if startup_action == STARTUP_RESTART:
+        return ([most_recent_id] if most_recent_id else []), []
+    if startup_action == STARTUP_NAMES:
+        return [], [ name for name in (names or []) if name ]
+    start_id = re.match(r'STARTID:(?P<id>.*)', startup_action)
+    if start_id:
+        return [start_id.group('id')], []
+    start_name = re.match(r'STARTNAME:(?P<name>.*)', startup_action)
+    if start_name:
+        return [], [start_name.group('name')]
+    return [], []
+
+
+def toggle_startup_name(startup_action, names, name):
+    # Returns new startup action and list of names, after selecting
+    # or deselecting a configuration in the startup menu
+    _ids, current = parse_startup_action(startup_action, names=names)
+    current = [ entry for entry in current if entry != name ] if name in current else current + [name]
+    if len(current) == 0:
+        return STARTUP_NONE, []
+    if len(current) == 1:
+        return f'STARTNAME:{current[0]}', []
+    return STARTUP_NAMES, sorted(current)
+
+###
+#
+# StartupPlan
+#
+###
+
+
+class StartupPlan:
+
+    @property
+    def pending(self):
+        return not self._resolved
+
+    @property
+    def done(self):
+        return self._resolved and len(self._connecting) == 0
+
+    def __init__(self, config_ids=None, config_names=None, timeout=STARTUP_READINESS_TIMEOUT, now=None):
+        self._start = now if now is not None else time.monotonic()
+        self._deadline = self._start + timeout
+        self._config_ids = list(config_ids or [])
+        self._config_names = list(config_names or [])
+        self._name_configs = dict()
+        self._resolved = len(self._config_ids) + len(self._config_names) == 0
+        self._connecting = dict()
+        self._times = dict()
+
+    def resolve(self, configs, name_configs, now=None):
+        # Call once the backend listed configurations. Returns ids to start
+        # now and targets given up on after the readiness timeout. Targets
+        # stay pending until started, so a failed start is retried
+        now = now if now is not None else time.monotonic()
+        to_start = list()
+        for config_id in self._config_ids:
+            if config_id in configs:
+                to_start.append(config_id)
+        self._name_configs = dict()
+        for name in self._config_names:
+            config_id = name_configs.get(name, None)
+            if config_id is not None:
+                self._name_configs[name] = config_id
+                if config_id not in to_start:
+                    to_start.append(config_id)
+        missing = list()
+        if now >= self._deadline:
+            # Last attempt for the listed targets, the rest is given up on
+            missing = [ config_id for config_id in self._config_ids if config_id not in to_start ]
+            missing += [ name for name in self._config_names if name not in self._name_configs ]
+            self._config_ids = list()
+            self._config_names = list()
+        self._resolved = len(self._config_ids) + len(self._config_names) == 0
+        return to_start, missing
+
+    def dismiss(self, config_id):
+        # Removes the targets resolved to the configuration from the plan
+        self._config_ids = [ entry for entry in self._config_ids if entry != config_id ]
+        self._config_names = [ name for name in self._config_names if self._name_configs.get(name, None) != config_id ]
+        self._resolved = len(self._config_ids) + len(self._config_names) == 0
+
+    def started(self, config_id, now=None):
+        self.dismiss(config_id)
+        self._connecting[config_id] = now if now is not None else time.monotonic()
+
+    def connected(self, config_id, now=None):
+        # Returns time to connect measured from the start of the application
+        if config_id not in self._connecting:
+            return None
+        del self._connecting[config_id]
+        now = now if now is not None else time.monotonic()
+        self._times[config_id] = now - self._start
+        logging.debug('Startup configuration %s connected after %.3fs', config_id, self._times[config_id])
+        return self._times[config_id]
+
+    def forget(self, config_id):
+        self.dismiss(config_id)
+        self._connecting.pop(config_id, None)
+
+    def times(self):
+        return dict(self._times)
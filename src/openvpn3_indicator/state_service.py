@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+#
+# openvpn3-indicator - Simple indicator application for OpenVPN3.
+# Copyright (C) 2024 Grzegorz Gutowski <grzegorz.gutowski@uj.edu.pl>
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License,
+# or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.
+# If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+import logging
+import traceback
+
+from gi.repository import GLib, Gio
+
+from openvpn3_indicator.about import APPLICATION_ID
+from openvpn3_indicator.status import get_status_description
+
+STATE_PATH = '/' + APPLICATION_ID.replace('.', '/') + '/State'
+STATE_INTERFACE = f'{APPLICATION_ID}.State1'
+STATE_INTROSPECTION = f'''
+<node>
+  <interface name="{STATE_INTERFACE}">
+    <method name="GetState">
+      <arg direction="out" name="serial" type="t"/>
+      <arg direction="out" name="configs" type="a{{sa{{sv}}}}"/>
+      <arg direction="out" name="sessions" type="a{{sa{{sv}}}}"/>
+    </method>
+    <signal name="Changed">
+      <arg name="serial" type="t"/>
+      <arg name="configs" type="a{{sa{{sv}}}}"/>
+      <arg name="removed_configs" type="as"/>
+      <arg name="sessions" type="a{{sa{{sv}}}}"/>
+      <arg name="removed_sessions" type="as"/>
+    </signal>
+  </interface>
+</node>
+'''
+
+
+def collect_state(application, rates=False):
+    # Returns (configs, sessions), dictionaries of plain values keyed by object path.
+    # Traffic rates change on every sample, they are only collected on request
+    configs = dict()
+    for config_id, config_name in application.config_names.items():
+        configs[config_id] = {
+            'name' : config_name,
+            'sessions' : sorted(application.config_sessions.get(config_id, [])),
+        }
+    traffic_statistics = getattr(application, 'traffic_statistics', None) if rates else None
+    sessions = dict()
+    for session_id, status in application.session_statuses.items():
+        config_id = application.session_configs.get(session_id, '')
+        session = {
+            'config' : config_id,
+            'name' : application.config_names.get(config_id, ''),
+            'major' : int(status['major'].value),
+            'minor' : int(status['minor'].value),
+            'description' : get_status_description(status['major'], status['minor']),
+            'message' : status['message'],
+        }
+        session_rates = traffic_statistics.rates(session_id) if traffic_statistics is not None else None
+        if session_rates is not None:
+            session['rate-in'] = float(session_rates[0])
+            session['rate-out'] = float(session_rates[1])
+        sessions[session_id] = session
+    return configs, sessions
+
+
+def diff_entries(old, new):
+    # Returns (changed or added entries, removed keys)
+    changed = dict((key, value) for key, value in new.items() if old.get(key, None) != value)
+    removed = sorted(key for key in old if key not in new)
+    return changed, removed
+
+
+def variant_entries(entries):
+    result = dict()
+    for key, entry in entries.items():
+        values = dict()
+        for name, value in entry.items():
+            if isinstance(value, str):
+                values[name] = GLib.Variant('s', value)
+            elif isinstance(value, int):
+                values[name] = GLib.Variant('u', value)
+            elif isinstance(value, float):
+                values[name] = GLib.Variant('d', value)
+            else:
+                values[name] = GLib.Variant('as', list(value))
+        result[key] = values
+    return result
+
+###
+#
+# StateService
+#
+###
+
+
+class StateService:
+    # Exports a snapshot of configurations and sessions on the session bus
+    # and signals the differences, so clients need not poll openvpn3
+
+    @property
+    def serial(self):
+        return self._serial
+
+    def __init__(self, application):
+        self._application = application
+        self._connection = None
+        self._registration = None
+        self._serial = 0
+        self._configs = dict()
+        self._sessions = dict()
+
+    def register(self, connection):
+        if connection is None:
+            return False
+        try:
+            node = Gio.DBusNodeInfo.new_for_xml(STATE_INTROSPECTION)
+            self._registration = connection.register_object(STATE_PATH, node.interfaces[0], self.on_method_call, None, None)
+            self._connection = connection
+        except GLib.Error:
+            logging.debug(traceback.format_exc())
+            logging.warning('Failed to export state on the session bus')
+            return False
+        self.update()
+        return True
+
+    def unregister(self):
+        if self._registration is not None:
+            self._connection.unregister_object(self._registration)
+            self._registration = None
+            self._connection = None
+
+    def update(self):
+        # Collects the state and signals what changed since the previous update
+        configs, sessions = collect_state(self._application)
+        changed_configs, removed_configs = diff_entries(self._configs, configs)
+        changed_sessions, removed_sessions = diff_entries(self._sessions, sessions)
+        if not (changed_configs or removed_configs or changed_sessions or removed_sessions):
+            return False
+        self._serial += 1
+        self._configs = configs
+        self._sessions = sessions
+        if self._connection is not None:
+            try:
+                self._connection.emit_signal(None, STATE_PATH, STATE_INTERFACE, 'Changed', GLib.Variant('(ta{sa{sv}}asa{sa{sv}}as)', (
+                        self._serial,
+                        variant_entries(changed_configs),
+                        removed_configs,
+                        variant_entries(changed_sessions),
+                        removed_sessions,
+                    )))
+            except GLib.Error:
+                logging.debug(traceback.format_exc())
+        return True
+
+    def on_method_call(self, connection, sender, path, interface, method, parameters, invocation):
+        if method == 'GetState':
+            # Publish pending changes first, so the serial matches the snapshot,
+            # which also carries the current traffic rates
+            self.update()
+            configs, sessions = collect_state(self._application, rates=True)
+            invocation.return_value(GLib.Variant('(ta{sa{sv}}a{sa{sv}})', (
+                    self._serial,
+                    variant_entries(configs),
+                    variant_entries(sessions),
+                )))
+        else:
+            invocation.return_dbus_error('org.freedesktop.DBus.Error.UnknownMethod', f'Unknown method {method}')
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+import logging
+import pathlib
+import sys
+import tempfile
+import time
+
+from gi.repository import GLib
+
+from openvpn3_indicator.configuration_importer import *
+
+class Config:
+    def __init__(self, name, text):
+        self.name = name
+        self.text = text
+
+running = 0
+most_running = 0
+
+def import_configuration(name, text):
+    global running, most_running
+    running += 1
+    most_running = max(most_running, running)
+    time.sleep(0.2)
+    running -= 1
+    if 'broken' in text:
+        raise ValueError('broken configuration')
+    return Config(name, text)
+
+def validate_configuration(config):
+    time.sleep(0.2)
+
+def test(directory):
+    loop = GLib.MainLoop()
+    removed = list()
+    importer = ConfigurationImporter(import_configuration, validate_configuration, removed.append, workers=2)
+    paths = dict()
+    for name, text in [('good', 'remote example.com\n' * 10000), ('broken', 'broken\n'), ('cancelled', 'remote example.com\n')] + [ (f'extra{number}', 'remote example.com\n') for number in range(6) ]:
+        paths[name] = pathlib.Path(directory) / f'{name}.ovpn'
+        paths[name].write_text(text)
+    paths['missing'] = pathlib.Path(directory) / 'missing.ovpn'
+    done = dict()
+    stages = list()
+    def on_done(job):
+        done[job.name] = job
+        if len(done) == len(paths):
+            loop.quit()
+    for name, path in paths.items():
+        job = importer.submit(name, str(path), on_progress=lambda job : stages.append((job.name, job.stage)), on_done=on_done)
+        if name == 'cancelled':
+            GLib.timeout_add(100, job.cancel)
+    ticks = 0
+    def on_tick():
+        nonlocal ticks
+        ticks += 1
+        return True
+    GLib.timeout_add(10, on_tick)
+    GLib.timeout_add(5000, loop.quit)
+    loop.run()
+    print(f'stages: {stages}')
+    print(f'main loop ticks during import: {ticks}')
+    assert done['good'].succeeded and done['good'].config.name == 'good'
+    assert done['good'].head.remotes[0] == 'example.com'
+    assert done['broken'].error_stage == STAGE_IMPORTING
+    assert done['missing'].error_stage == STAGE_READING
+    assert done['cancelled'].cancelled and len(removed) == 1
+    assert ticks > 10
+    assert most_running == 2
+    assert all(done[f'extra{number}'].succeeded for number in range(6))
+
+if __name__ == '__main__':
+    logging.basicConfig(level = logging.DEBUG)
+    with tempfile.TemporaryDirectory() as directory:
+        test(directory)
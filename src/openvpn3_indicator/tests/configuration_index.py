@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+import json
+import logging
+import pathlib
+import sys
+import tempfile
+
+from openvpn3_indicator.configuration_index import *
+
+def test(directory):
+    path = pathlib.Path(directory) / INDEX_FILE_NAME
+    index = ConfigurationIndex(path)
+    assert len(index) == 0
+    index.update({ '/config/a' : 'A', '/config/b' : 'B' })
+    index.set_remote('/config/a', 'vpn.example.com')
+    index.used('/config/a', now=1000.0)
+    index.save()
+    print(path.read_text())
+
+    reloaded = ConfigurationIndex(path)
+    assert reloaded.names() == { '/config/a' : 'A', '/config/b' : 'B' }
+    assert reloaded['/config/a'] == { 'name' : 'A', 'remote' : 'vpn.example.com', 'last_used' : 1000.0, 'use_count' : 1 }
+    reloaded.update({ '/config/a' : 'A2' })
+    reloaded.save()
+    assert ConfigurationIndex(path).names() == { '/config/a' : 'A2' }
+    assert sorted(p.name for p in pathlib.Path(directory).iterdir()) == [INDEX_FILE_NAME]
+
+    path.write_text('{ broken')
+    assert len(ConfigurationIndex(path)) == 0
+
+if __name__ == '__main__':
+    logging.basicConfig(level = logging.DEBUG)
+    with tempfile.TemporaryDirectory() as directory:
+        test(directory)
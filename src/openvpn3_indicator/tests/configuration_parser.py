@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+import logging
+import pathlib
+import sys
+import tempfile
+import time
+
+from openvpn3_indicator.configuration_parser import *
+
+def test(directory):
+    assert tokenize_line('remote  vpn.example.com 1194 udp # comment') == ['remote', 'vpn.example.com', '1194', 'udp']
+    assert tokenize_line('setenv FRIENDLY_NAME "Office \\"East\\""') == ['setenv', 'FRIENDLY_NAME', 'Office "East"']
+    assert tokenize_line("--auth-user-pass 'C:\\path'") == ['auth-user-pass', 'C:\\path']
+    assert tokenize_line('; commented out') == []
+
+    path = pathlib.Path(directory) / 'client.ovpn'
+    path.write_text('client\nremote vpn.example.com 1194\n<ca>\nsetenv FRIENDLY_NAME Hidden\n' + 'A' * 64 + '\n</ca>\n')
+    print(f'{path.name}: {guess_name(str(path))}')
+    assert guess_name(str(path)) == 'vpn.example.com'
+
+    path = pathlib.Path(directory) / 'office.ovpn'
+    path.write_text('# OVPN_ACCESS_SERVER_PROFILE=user@vpn.example.com/AUTOLOGIN\nsetenv FRIENDLY_NAME "Office VPN"\nremote vpn.example.com\n')
+    print(f'{path.name}: {guess_name(str(path))}')
+    assert guess_name(str(path)) == 'Office VPN'
+
+    path = pathlib.Path(directory) / 'large.ovpn'
+    path.write_text('remote vpn.example.com\n' + '# padding\n' * 1000000)
+    start = time.monotonic()
+    name = guess_name(str(path))
+    print(f'{path.name}: {name} in {time.monotonic() - start:.6f}s')
+    assert name == 'large'
+
+    path = pathlib.Path(directory) / 'binary.ovpn'
+    path.write_bytes(b'remote vpn.example.com\n' + b'A' * 10000000)
+    assert list(iter_head_lines(str(path), limit=100)) == ['remote vpn.example.com\n']
+    assert guess_name(str(path)) == 'binary'
+
+    for configuration in sorted(pathlib.Path(__file__).resolve().parents[3].glob('tests/configurations/client_*.ovpn')):
+        problems = validate_configuration_lines(configuration.read_text().splitlines())
+        print(f'{configuration.name}: {problems}')
+        assert not any(problem.fatal for problem in problems)
+
+    problems = validate_configuration_lines([
+        'client', 'frobnicate yes', '<ca>', 'AAAA', '</cert>', '</ca>', '<connection>', 'remote vpn.example.com', '</connection>', '<key>', 'BBBB',
+    ])
+    print(problems)
+    assert [ (problem.line, problem.fatal) for problem in problems ] == [(2, False), (5, True), (10, True)]
+    assert [ problem.message for problem in validate_configuration_lines(['client', 'dev tun']) ] == ['No remote server is specified']
+    print(ConfigurationSyntaxError(problems))
+
+    problems = validate_configuration_lines(['remote vpn.example.com', '<frobnicate>', 'CCCC', '</frobnicate>'])
+    assert [ (problem.line, problem.fatal) for problem in problems ] == [(2, False)]
+
+    lines = ['remote vpn.example.com', '<ca>'] + ['A' * 64] * 100000 + ['</ca>']
+    start = time.monotonic()
+    assert validate_configuration_lines(lines) == []
+    print(f'validated {len(lines)} lines in {time.monotonic() - start:.3f}s')
+
+if __name__ == '__main__':
+    logging.basicConfig(level = logging.DEBUG)
+    with tempfile.TemporaryDirectory() as directory:
+        test(directory)
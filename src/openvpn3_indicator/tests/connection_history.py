@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+import logging
+import sys
+import tempfile
+
+from openvpn3_indicator.connection_history import *
+
+def test(directory):
+    history = ConnectionHistory(directory, segment_size=4096, segments=3)
+    for attempt in range(200):
+        history.record(EVENT_CONNECT_REQUESTED, '/config/a')
+        if attempt % 4 == 0:
+            history.record(EVENT_AUTH_FAILED, '/config/a')
+            continue
+        history.record(EVENT_CONNECTED, '/config/a')
+        history.record(EVENT_CONNECTED, '/config/a')
+        history.record(EVENT_DISCONNECTED, '/config/a')
+    history.record(EVENT_CONNECT_REQUESTED, '/config/b')
+    history.record(EVENT_CONNECTED, '/config/b')
+    history.close()
+    a = history['/config/a']
+    print(f'a: attempts {a.attempts}, failure rate {a.failure_rate}, mean time to connect {a.mean_time_to_connect}, uptime {a.uptime()}')
+    assert a.attempts == 200
+    assert a.failure_rate == 0.25
+    assert history['/config/b'].connected
+
+    reloaded = ConnectionHistory(directory, segment_size=4096, segments=3)
+    a = reloaded['/config/a']
+    print(f'reloaded a: attempts {a.attempts}, failure rate {a.failure_rate}, segments {sorted(p.name for p in reloaded.directory.iterdir())}')
+    assert 0 < a.attempts < 200
+    assert reloaded['/config/b'].connected
+    reloaded.close()
+
+if __name__ == '__main__':
+    logging.basicConfig(level = logging.DEBUG)
+    with tempfile.TemporaryDirectory() as directory:
+        test(directory)
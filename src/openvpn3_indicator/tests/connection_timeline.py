@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+import json
+import logging
+import sys
+
+from openvpn3_indicator.connection_timeline import *
+
+def test():
+    timeline = ConnectionTimeline(capacity=10)
+    for number in range(20):
+        now = 100.0 * number
+        session_id = f'/session/{number}'
+        attempt = timeline.start('/config/a', now=now)
+        timeline.bind(attempt, session_id, now=now + 0.1)
+        timeline.begin(session_id, PHASE_CREDENTIAL_LOOKUP, now=now + 0.5)
+        timeline.begin(session_id, PHASE_READY_CONNECT, now=now + 0.6)
+        timeline.begin(session_id, PHASE_CONNECTING, now=now + 0.8)
+        timeline.finish(session_id, OUTCOME_CONNECTED if number % 5 else OUTCOME_AUTH_FAILED, now=now + 2.0 + number / 10)
+    attempt = timeline.start('/config/b', now=3000.0)
+    timeline.bind(attempt, '/session/b', now=3000.2)
+    timeline.retain(set(), now=3001.0)
+
+    histograms = timeline.histograms('/config/a')
+    print(timeline.report({ '/config/a' : 'A' }))
+    assert histograms[PHASE_TOTAL]['count'] == 16
+    assert abs(histograms[PHASE_BACKEND]['mean'] - 0.4) < 0.05
+    assert timeline.histograms('/config/b') == dict()
+    assert len(timeline.attempts()) == 10
+    assert timeline.attempts()[-1].outcome == OUTCOME_ABANDONED
+
+    trace = json.loads(timeline.chrome_trace({ '/config/a' : 'A' }))
+    phases = [ event['name'] for event in trace['traceEvents'] if event.get('cat', None) == 'phase' ]
+    print(f'trace events: {len(trace["traceEvents"])}, phases: {sorted(set(phases))}')
+    assert PHASE_CONNECTING in phases
+
+if __name__ == '__main__':
+    logging.basicConfig(level = logging.DEBUG)
+    test()
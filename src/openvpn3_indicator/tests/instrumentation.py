@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+import logging
+import time
+
+from openvpn3_indicator.instrumentation import Instrumentation
+
+def test():
+    instrumentation = Instrumentation()
+
+    @instrumentation.timed('sleep')
+    def sleep(duration):
+        time.sleep(duration)
+
+    sleep(0.001)
+    instrumentation.count('calls')
+    assert instrumentation.histograms() == dict()
+    assert instrumentation.counters() == dict()
+
+    instrumentation.enabled = True
+    for duration in [0.001, 0.002, 0.004, 0.008]:
+        sleep(duration)
+        instrumentation.count('calls')
+    with instrumentation.span('block'):
+        time.sleep(0.001)
+    histograms = instrumentation.histograms()
+    assert histograms['sleep']['count'] == 4
+    assert histograms['block']['count'] == 1
+    assert instrumentation.counters()['calls'] == 4
+    print(instrumentation.report())
+
+if __name__ == '__main__':
+    logging.basicConfig(level = logging.DEBUG)
+    test()
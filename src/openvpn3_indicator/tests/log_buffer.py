@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+import logging
+
+from openvpn3_indicator.log_buffer import lazy, setup_logging
+
+def test():
+    evaluated = list()
+    def expensive():
+        evaluated.append(True)
+        return 'expensive'
+
+    log_buffer = setup_logging(logging.WARNING, capacity=5)
+    for i in range(10):
+        logging.debug('Debug %s %s', i, lazy(expensive))
+    # Below both thresholds, the message is never formatted
+    assert len(evaluated) == 0
+    assert len(log_buffer.records()) == 0
+    state = { 'status' : 'connecting' }
+    logging.info('State %s', state)
+    state['status'] = 'connected'
+    logging.warning('Warning %s', lazy(expensive))
+    assert len(evaluated) == 2
+    assert len(log_buffer.records()) == 2
+    assert all(record.args is None for record in log_buffer.records())
+    dump = log_buffer.dump()
+    print(dump)
+    assert 'connecting' in dump and 'connected\'' not in dump
+    assert len(evaluated) == 2
+    log_buffer.clear()
+    logging.getLogger().setLevel(logging.DEBUG)
+    log_buffer.setLevel(logging.INFO)
+    logging.debug('Debug %s', lazy(expensive))
+    # Below the buffer threshold, the record is dropped before formatting
+    assert len(evaluated) == 2
+    assert len(log_buffer.records()) == 0
+
+if __name__ == '__main__':
+    test()
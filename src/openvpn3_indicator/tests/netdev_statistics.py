@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+import logging
+import os
+import pathlib
+import sys
+import tempfile
+
+from openvpn3_indicator.netdev_statistics import NetdevStatisticsSource, SYSFS_NET
+
+def test(device):
+    fallbacks = list()
+    def fallback(session_id):
+        fallbacks.append(session_id)
+        return None
+    source = NetdevStatisticsSource(lambda session_id : device if session_id == 'session' else None, fallback=fallback)
+    print(f'{device}: {source("session")}')
+    print(f'{device}: {source("session")}')
+    assert source('other') is None
+    assert fallbacks == ['other']
+    source.close()
+
+    # Failed lookups are not repeated until invalidated, switching sources resets the samples
+    with tempfile.TemporaryDirectory() as sysfs:
+        for name in ['rx_bytes', 'tx_bytes', 'rx_packets', 'tx_packets']:
+            path = pathlib.Path(sysfs) / 'tun0' / 'statistics' / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text('100\n')
+        devices = { 'session' : '' }
+        lookups = list()
+        def device_name(session_id):
+            lookups.append(session_id)
+            return devices[session_id]
+        switches = list()
+        source = NetdevStatisticsSource(device_name, fallback=lambda session_id : { 'BYTES_IN' : 5 }, sysfs=sysfs, on_switch=switches.append)
+        assert source('session') == { 'BYTES_IN' : 5 }
+        assert source('session') == { 'BYTES_IN' : 5 }
+        assert lookups == ['session'] and switches == []
+        devices['session'] = 'tun0'
+        source.invalidate('session')
+        assert source('session')['BYTES_IN'] == 100
+        assert lookups == ['session', 'session'] and switches == ['session']
+        assert source('session')['BYTES_IN'] == 100
+        assert switches == ['session']
+        source.close()
+
+if __name__ == '__main__':
+    logging.basicConfig(level = logging.DEBUG)
+    test(sys.argv[1] if len(sys.argv) > 1 else sorted(os.listdir(SYSFS_NET))[0])
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+import logging
+
+from openvpn3_indicator.profiling import Profiler
+
+def test():
+    profiler = Profiler()
+    profiler.toggle_profile()
+    garbage = [ str(i) * 10 for i in range(100000) ]
+    path = profiler.toggle_profile()
+    print(f'Profile: {path}')
+    print(path.with_suffix('.txt').read_text())
+    assert profiler.take_memory_snapshot() is None
+    assert profiler.tracing
+    garbage = [ str(i) * 10 for i in range(100000) ]
+    path = profiler.take_memory_snapshot()
+    print(f'Memory snapshot: {path}')
+    report = path.with_suffix('.txt').read_text()
+    print(report)
+    assert 'tests/profiling.py' in report
+    profiler.toggle_memory_tracing()
+    assert not profiler.tracing
+
+if __name__ == '__main__':
+    logging.basicConfig(level = logging.DEBUG)
+    test()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+import logging
+import random
+import sys
+
+from openvpn3_indicator.reconnect_scheduler import *
+
+def test():
+    scheduler = ReconnectScheduler(initial_delay=1.0, maximal_delay=10.0, max_attempts=6, rng=random.Random(1))
+    now = 0.0
+    delays = list()
+    while True:
+        delay = scheduler.schedule('/config/a', now=now)
+        if delay is None:
+            break
+        delays.append(delay)
+        assert scheduler.due(now=now + delay - 0.01) == []
+        now += delay
+        assert scheduler.due(now=now) == ['/config/a']
+    print(f'delays: {[round(delay, 2) for delay in delays]}')
+    assert len(delays) == 6
+    assert all(0.5 * min(2 ** number, 10.0) <= delay <= min(2 ** number, 10.0) for number, delay in enumerate(delays))
+
+    scheduler.cancel('/config/a')
+    assert scheduler.attempts('/config/a') == 0
+    scheduler.schedule('/config/a', now=0.0)
+    scheduler.schedule('/config/b', now=0.0)
+    scheduler.cancel('/config/a')
+    scheduler.succeeded('/config/b')
+    assert scheduler.due(now=1000.0) == []
+    assert scheduler.pending('/config/a') is None
+
+if __name__ == '__main__':
+    logging.basicConfig(level = logging.DEBUG)
+    test()
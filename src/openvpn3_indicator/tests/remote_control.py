@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+import logging
+import sys
+
+from openvpn3.constants import StatusMajor, StatusMinor
+
+from openvpn3_indicator.remote_control import *
+
+class StandInApplication:
+    def __init__(self):
+        self.config_names = { '/config/a' : 'alpha', '/config/b' : 'beta' }
+        self.name_configs = dict((name, config_id) for config_id, name in self.config_names.items())
+        self.config_sessions = { '/config/a' : ['/session/a'], '/config/b' : [] }
+        self.session_statuses = {
+            '/session/a' : { 'major' : StatusMajor.CONNECTION, 'minor' : StatusMinor.CONN_CONNECTED, 'message' : '' },
+        }
+        self.calls = list()
+
+    def action_config_connect(self, _object, config_id):
+        self.calls.append(('connect', _object, config_id))
+
+    def action_session_disconnect(self, _object, session_id):
+        self.calls.append(('disconnect', _object, session_id))
+
+    def action_session_pause(self, _object, session_id):
+        self.calls.append(('pause', _object, session_id))
+
+def test():
+    application = StandInApplication()
+    assert get_remote_command({ 'debug' : True }) is None
+    assert get_remote_command({ 'connect' : 'beta' }) == ('connect', 'beta')
+
+    status, lines = run_remote_command(application, 'status', None)
+    print('\n'.join(lines))
+    assert status == 0
+    assert lines == ['alpha\tConnected', f'beta\t{REMOTE_DISCONNECTED}']
+
+    assert run_remote_command(application, 'connect', 'beta', source='cli')[0] == 0
+    assert run_remote_command(application, 'connect', 'gamma', source='cli')[0] == 1
+    assert run_remote_command(application, 'disconnect', 'beta', source='cli')[0] == 1
+    assert run_remote_command(application, 'disconnect', 'alpha', source='cli')[0] == 0
+    assert run_remote_command(application, 'pause-all', True, source='cli')[0] == 0
+    assert application.calls == [
+        ('connect', 'cli', '/config/b'),
+        ('disconnect', 'cli', '/session/a'),
+        ('pause', 'cli', '/session/a'),
+    ]
+
+if __name__ == '__main__':
+    logging.basicConfig(level = logging.DEBUG)
+    test()
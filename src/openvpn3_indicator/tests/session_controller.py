@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+import logging
+import sys
+import tempfile
+
+from openvpn3_indicator.session_controller import SessionController
+
+class StandInSettings:
+    def __init__(self, values):
+        self._values = dict(values)
+
+    def get_string(self, key):
+        return self._values.get(key, '')
+
+    def set_string(self, key, value):
+        self._values[key] = value
+
+    def get_strv(self, key):
+        return self._values.get(key, [])
+
+class StandInConfig:
+    def __init__(self, path, name):
+        self._path = path
+        self._name = name
+
+    def GetPath(self):
+        return self._path
+
+    def GetConfigName(self):
+        return self._name
+
+class StandInConfigManager:
+    def __init__(self):
+        self.available = False
+
+    def FetchAvailableConfigs(self):
+        if not self.available:
+            raise RuntimeError('Configuration manager is not available')
+        return [ StandInConfig('/config/a', 'A') ]
+
+class StandInSession:
+    def __init__(self, path):
+        self._path = path
+
+    def GetPath(self):
+        return self._path
+
+class StandInSessionManager:
+    def __init__(self):
+        self.failures = 0
+        self.tunnels = list()
+
+    def FetchAvailableSessions(self):
+        return list()
+
+    def LookupConfigName(self, config_name):
+        return list()
+
+    def NewTunnel(self, config):
+        self.tunnels.append(config.GetPath())
+        if self.failures > 0:
+            self.failures -= 1
+            raise RuntimeError('Session manager is not ready')
+        return StandInSession(f'/session/{len(self.tunnels)}')
+
+class StandInFrontEnd(SessionController):
+    def __init__(self, history_directory):
+        self.settings = StandInSettings({ 'startup-action' : 'STARTNAME:A' })
+        self.config_manager = StandInConfigManager()
+        self.session_manager = StandInSessionManager()
+        self.credential_store = dict()
+        self.init_sessions(history_directory)
+        # Known from the index before the backend lists anything
+        self.config_names = { '/config/a' : 'A' }
+        self.name_configs = { 'A' : '/config/a' }
+
+    def sessions_refreshed(self):
+        pass
+
+    def session_status_changed(self, session_id):
+        pass
+
+def test():
+    with tempfile.TemporaryDirectory() as history_directory:
+        front_end = StandInFrontEnd(history_directory)
+        front_end.session_manager.failures = 1
+
+        # The backend has not listed configurations, index names are not started
+        front_end.schedule_sessions()
+        assert front_end.session_manager.tunnels == []
+        assert front_end.startup_plan.pending
+
+        # The first connect attempt fails, the configuration stays pending
+        front_end.config_manager.available = True
+        front_end.invalidate_sessions()
+        front_end.schedule_sessions()
+        assert front_end.session_manager.tunnels == ['/config/a']
+        assert front_end.startup_plan.pending
+
+        # The next tick retries and starts the configuration
+        front_end.schedule_sessions()
+        assert front_end.session_manager.tunnels == ['/config/a', '/config/a']
+        assert not front_end.startup_plan.pending
+
+        front_end.schedule_sessions()
+        assert len(front_end.session_manager.tunnels) == 2
+        front_end.close_sessions()
+
+if __name__ == '__main__':
+    logging.basicConfig(level = logging.DEBUG)
+    test()
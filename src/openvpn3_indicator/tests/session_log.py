@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+import logging
+import sys
+
+import gi
+gi.require_version("Gtk", "3.0")
+from gi.repository import GLib, Gtk
+
+from openvpn3_indicator.about import APPLICATION_ID
+from openvpn3_indicator.session_log import SessionLogBuffer
+from openvpn3_indicator.dialogs.session_log import construct_session_log_dialog, append_session_log_entries
+
+class Test(Gtk.Application):
+    def __init__(self):
+        Gtk.Application.__init__(self,
+            application_id=APPLICATION_ID,
+            )
+        self.connect('startup', self.on_startup)
+        self.connect('activate', self.on_activate)
+        self.counter = 0
+
+    def on_activate(self, *args, **kwargs):
+        pass
+    def on_startup(self, *args, **kwargs):
+        self.hold()
+        self.log = SessionLogBuffer(capacity=2000)
+        self.dialog = construct_session_log_dialog('Test', entries=self.log.entries(), capacity=self.log.capacity, on_close=self.action_quit)
+        self.dialog.set_visible(True)
+
+        GLib.timeout_add(10, self.on_produce)
+        GLib.timeout_add(200, self.on_schedule)
+        GLib.timeout_add(60000, self.action_quit)
+
+    def on_produce(self, *args, **kwargs):
+        for _ in range(50):
+            self.counter += 1
+            self.log.append(1, 'DEBUG', f'Reconnect storm line {self.counter}')
+        return True
+
+    def on_schedule(self, *args, **kwargs):
+        append_session_log_entries(self.dialog, self.log.take_pending())
+        return True
+
+    def action_quit(self, *args, **kwargs):
+        self.release()
+
+if __name__ == '__main__':
+    logging.basicConfig(level = logging.DEBUG)
+    test = Test()
+    test.run(sys.argv)
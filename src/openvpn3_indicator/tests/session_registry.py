@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+import logging
+import sys
+
+from openvpn3_indicator.session_registry import *
+
+def test():
+    released = list()
+    registry = SessionRegistry()
+    registry.own('/session/a', 'status', 'a-status', released.append)
+    registry.own('/session/a', 'log', 'a-log', released.append)
+    registry.own('/session/a', 'dialog', 'a-dialog', released.append)
+    registry.own('/session/b', 'status', 'b-status', released.append)
+    assert registry.counts() == { 'status' : 2, 'log' : 1, 'dialog' : 1 }
+
+    registry.own('/session/a', 'dialog', 'a-dialog-2', released.append)
+    assert released == ['a-dialog']
+    assert registry.disown('/session/a', 'dialog', 'a-dialog') is None
+    assert registry.disown('/session/a', 'dialog', 'a-dialog-2') == 'a-dialog-2'
+    registry.release('/session/a', 'dialog')
+    registry.release('/session/c', 'dialog')
+    assert '/session/c' not in registry
+    assert released == ['a-dialog']
+
+    def failing(resource):
+        raise RuntimeError(resource)
+    registry.own('/session/a', 'broken', 'a-broken', failing)
+    registry.own('/session/a', 'dialog', 'a-dialog-3', released.append)
+    assert registry.retain(['/session/b']) == ['/session/a']
+    assert released == ['a-dialog', 'a-dialog-3', 'a-log', 'a-status']
+    assert len(registry) == 1
+
+    registry.close()
+    assert released[-1] == 'b-status'
+    assert len(registry) == 0
+    assert registry.counts() == dict()
+
+if __name__ == '__main__':
+    logging.basicConfig(level = logging.DEBUG)
+    test()
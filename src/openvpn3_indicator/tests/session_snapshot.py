@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+import json
+import logging
+import pathlib
+import sys
+import tempfile
+
+from openvpn3_indicator.session_snapshot import *
+
+def test(directory):
+    path = pathlib.Path(directory) / SNAPSHOT_FILE_NAME
+    snapshot = SessionSnapshot(path)
+    assert snapshot.load() is None
+    sessions = {
+        '/session/a' : { 'config' : '/config/a', 'major' : 2, 'minor' : 7, 'message' : '' },
+        '/session/b' : { 'config' : None, 'major' : 2, 'minor' : 6, 'message' : 'waiting' },
+    }
+    assert snapshot.save(sessions, set(['/session/a']), set(['/config/b']))
+    assert not snapshot.save(sessions, set(['/session/a']), set(['/config/b']))
+    print(path.read_text())
+
+    restored = SessionSnapshot(path).load()
+    assert restored['sessions'] == sessions
+    assert restored['sessions_connected'] == set(['/session/a'])
+    assert restored['failed_authentications'] == set(['/config/b'])
+
+    data = json.loads(path.read_text())
+    data['boot_id'] = 'another boot'
+    path.write_text(json.dumps(data))
+    assert SessionSnapshot(path).load() is None
+
+if __name__ == '__main__':
+    logging.basicConfig(level = logging.DEBUG)
+    with tempfile.TemporaryDirectory() as directory:
+        test(directory)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+import logging
+import sys
+import time
+
+from openvpn3_indicator.session_state_machine import *
+
+CONNECTION = 2
+SESSION = 3
+CFG_OK = 6
+CFG_REQUIRE_USER = 8
+CONN_CONNECTED = 7
+CONN_AUTH_FAILED = 13
+CONN_FAILED = 12
+
+def test():
+    calls = list()
+    connected = set()
+    machine = SessionStateMachine(log_capacity=10)
+
+    def ready_connect(event):
+        calls.append(('connect', event.session_id))
+        connected.add(event.session_id)
+
+    def not_connected(event):
+        return event.session_id not in connected
+
+    machine.on(CONNECTION, CFG_OK, ready_connect, guard=not_connected)
+    machine.on(CONNECTION, CONN_AUTH_FAILED, lambda event : calls.append(('disconnect', event.session_id)), name='disconnect')
+    machine.on(CONNECTION, CONN_AUTH_FAILED, lambda event : calls.append(('retry', event.previous)), name='retry')
+
+    assert machine.dispatch('/session/a', CONNECTION, CFG_OK) == ['ready_connect']
+    assert machine.dispatch('/session/a', CONNECTION, CFG_OK) == []
+    assert machine.dispatch('/session/a', CONNECTION, CONN_CONNECTED) == []
+    assert machine.dispatch('/session/a', CONNECTION, CONN_AUTH_FAILED, 'bad password') == ['disconnect', 'retry']
+    assert calls == [('connect', '/session/a'), ('disconnect', '/session/a'), ('retry', (CONNECTION, CONN_CONNECTED))]
+    assert machine.state('/session/a') == (CONNECTION, CONN_AUTH_FAILED)
+    assert [ record.actions for record in machine.log('/session/a') ] == [['ready_connect'], [], [], ['disconnect', 'retry']]
+    assert machine.transitions()[(CONNECTION, CONN_AUTH_FAILED)] == ['disconnect', 'retry']
+    print(machine.report({ '/session/a' : 'a' }))
+
+    machine.dispatch('/session/b', SESSION, 1)
+    machine.retain(['/session/b'])
+    assert machine.state('/session/a') is None
+    assert machine.state('/session/b') == (SESSION, 1)
+
+    for number in range(20):
+        machine.dispatch('/session/b', CONNECTION, number)
+    assert len(machine.log()) == 10
+
+def benchmark(count=100000):
+    # Measure dispatch, not the debug log handler
+    logging.disable(logging.DEBUG)
+    machine = SessionStateMachine()
+    for minor in range(32):
+        machine.on(CONNECTION, minor, lambda event : None, guard=lambda event : event.previous is not None)
+    start = time.perf_counter()
+    for number in range(count):
+        machine.dispatch(f'/session/{number % 8}', CONNECTION, number % 40)
+    elapsed = time.perf_counter() - start
+    print(f'{count} dispatches in {elapsed:.3f}s, {elapsed / count * 1000000:.2f}us per dispatch')
+
+if __name__ == '__main__':
+    logging.basicConfig(level = logging.DEBUG)
+    test()
+    if '--benchmark' in sys.argv[1:]:
+        benchmark()
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+import logging
+import sys
+
+import dbus
+from dbus.mainloop.glib import DBusGMainLoop
+from gi.repository import GLib
+
+from openvpn3_indicator.sleep_monitor import SleepMonitor
+
+# Suspend the machine while this runs, the log should show
+# the sleep callback before suspend and the wake callback after resume
+
+def test():
+    DBusGMainLoop(set_as_default=True)
+    loop = GLib.MainLoop()
+    monitor = SleepMonitor(dbus.SystemBus(), lambda : logging.info('Going to sleep'), lambda : logging.info('Woke up'))
+    logging.info('Inhibitor taken: %s', monitor.inhibited)
+    GLib.timeout_add(60000, loop.quit)
+    loop.run()
+    monitor.close()
+
+if __name__ == '__main__':
+    logging.basicConfig(level = logging.DEBUG)
+    test()
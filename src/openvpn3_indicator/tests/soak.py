@@ -0,0 +1,499 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+# Drives the session handling shared by the indicator and the daemon
+# (SessionController) through many session create/destroy cycles against
+# stand-in OpenVPN3 managers, samples resource usage and fails if anything
+# grows without bound.
+#
+#   soak.py [--cycles N] [--sessions N] [--seed N] [--samples N]
+#
+# Credentials dialogs and notifiers are real Gtk/Gio objects when a display
+# is available.
+
+import argparse
+import collections
+import gc
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+import openvpn3
+
+from openvpn3_indicator.session_controller import SessionController
+from openvpn3_indicator.reconnect_scheduler import ReconnectScheduler
+
+try:
+    import gi
+    gi.require_version('Gtk', '3.0')
+    from gi.repository import Gtk
+    from openvpn3_indicator.dialogs.credentials import CredentialsUserInput, construct_credentials_dialog, close_credentials_dialog
+    from openvpn3_indicator.multi_notifier import MultiNotifier
+    if not Gtk.init_check(sys.argv)[0]:
+        Gtk = None
+except (ImportError, ValueError):
+    Gtk = None
+
+CONFIGS = 6
+# Configurations without stored credentials
+CONFIGS_WITHOUT_CREDENTIALS = 1
+# Short retry delays, so that reconnects come due during the run
+RECONNECT_INITIAL_DELAY = 0.01
+RECONNECT_MAXIMAL_DELAY = 0.1
+
+# Allowed growth between the first and the second half of the samples:
+# absolute, relative to the first half, and per live session
+GROWTH_ALLOWANCE = {
+    'rss_kib' : (8192, 0.10, 0),
+    'objects' : (2000, 0.05, 0),
+    'widgets' : (0, 0.0, 1),
+    'match_rules' : (0, 0.0, 2),
+    'resources' : (0, 0.0, 6),
+    'history' : (0, 0.0, 0),
+}
+
+###
+#
+# Stand-in services
+#
+###
+
+
+class StandInBus:
+    # Counts match rules like the bus daemon would
+
+    def __init__(self):
+        self.match_rules = 0
+
+
+class StandInSettings:
+
+    def __init__(self):
+        self._values = dict()
+
+    def get_string(self, key):
+        return self._values.get(key, '')
+
+    def set_string(self, key, value):
+        self._values[key] = value
+
+    def get_strv(self, key):
+        return self._values.get(key, [])
+
+
+class StandInCredentialStore:
+
+    def __init__(self):
+        self._stores = dict()
+
+    def __getitem__(self, config_id):
+        return self._stores.setdefault(config_id, dict())
+
+
+class StandInEvent:
+
+    def __init__(self, event_type):
+        self._type = event_type
+
+    def GetType(self):
+        return self._type
+
+
+class StandInInputSlot:
+
+    def __init__(self, label):
+        self._label = label
+        self.value = None
+
+    def GetTypeGroup(self):
+        return (openvpn3.ClientAttentionType.CREDENTIALS, openvpn3.ClientAttentionGroup.USER_PASSWORD)
+
+    def GetLabel(self):
+        return self._label
+
+    def GetInputMask(self):
+        return True
+
+    def ProvideInput(self, value):
+        self.value = value
+
+
+class StandInConfig:
+
+    def __init__(self, path, name):
+        self._path = path
+        self._name = name
+
+    def GetPath(self):
+        return self._path
+
+    def GetConfigName(self):
+        return self._name
+
+
+class StandInConfigManager:
+
+    def __init__(self, configs):
+        self._configs = dict((config.GetPath(), config) for config in configs)
+
+    def FetchAvailableConfigs(self):
+        return list(self._configs.values())
+
+    def Retrieve(self, path):
+        return self._configs[path]
+
+
+class StandInSession:
+
+    def __init__(self, manager, path, config, status):
+        self._manager = manager
+        self._path = path
+        self._config = config
+        self._status_callback = None
+        self._log_callback = None
+        self._input_slots = [ StandInInputSlot('Password') ]
+        self.status = status
+
+    def GetPath(self):
+        return self._path
+
+    def GetStatus(self):
+        major, minor, message = self.status
+        return { 'major' : major.value, 'minor' : minor.value, 'message' : message }
+
+    def GetConfigName(self):
+        return self._config.GetConfigName()
+
+    # Like openvpn3.Session, every callback adds a match rule and None removes the last one
+    def StatusChangeCallback(self, callback):
+        if callback is not None:
+            self._manager.bus.match_rules += 1
+        elif self._status_callback is not None:
+            self._manager.bus.match_rules -= 1
+        self._status_callback = callback
+
+    def LogCallback(self, callback):
+        if callback is not None:
+            self._manager.bus.match_rules += 1
+        elif self._log_callback is not None:
+            self._manager.bus.match_rules -= 1
+        self._log_callback = callback
+
+    def FetchUserInputSlots(self):
+        return list(self._input_slots)
+
+    def Ready(self):
+        pass
+
+    def Connect(self):
+        pass
+
+    def Pause(self):
+        pass
+
+    def Resume(self):
+        pass
+
+    def Restart(self):
+        pass
+
+    def Disconnect(self):
+        self._manager.post(self.emit_status, openvpn3.StatusMajor.CONNECTION, openvpn3.StatusMinor.CONN_DISCONNECTED)
+        self._manager.post(self._manager.destroy, self._path)
+
+    def emit_status(self, major, minor, message=''):
+        self.status = (major, minor, message)
+        if self._status_callback is not None:
+            self._status_callback(major.value, minor.value, message)
+
+    def emit_log(self, group, category, message):
+        if self._log_callback is not None:
+            self._log_callback(group, category, message)
+
+
+class StandInSessionManager:
+    # Signals are queued and delivered by dispatch, like the main loop would
+
+    def __init__(self, bus, rng):
+        self.bus = bus
+        self.created = 0
+        self._rng = rng
+        self._sessions = dict()
+        self._callback = None
+        self._pending = collections.deque()
+
+    def SessionManagerCallback(self, callback):
+        self._callback = callback
+
+    def NewTunnel(self, config):
+        self.created += 1
+        path = f'/net/openvpn/v3/sessions/soak{self.created}'
+        if self._rng.random() < 0.3:
+            status = (openvpn3.StatusMajor.CONNECTION, openvpn3.StatusMinor.CFG_REQUIRE_USER, '')
+        else:
+            status = (openvpn3.StatusMajor.CONNECTION, openvpn3.StatusMinor.CFG_OK, '')
+        session = self._sessions[path] = StandInSession(self, path, config, status)
+        self.post(self.emit, openvpn3.SessionManagerEventType.SESS_CREATED)
+        return session
+
+    def FetchAvailableSessions(self):
+        return list(self._sessions.values())
+
+    def LookupConfigName(self, config_name):
+        return [ path for path, session in self._sessions.items() if session.GetConfigName() == config_name ]
+
+    def destroy(self, path):
+        if self._sessions.pop(path, None) is not None:
+            self.emit(openvpn3.SessionManagerEventType.SESS_DESTROYED)
+
+    def emit(self, event_type):
+        if self._callback is not None:
+            self._callback(StandInEvent(event_type))
+
+    def post(self, function, *args):
+        self._pending.append((function, args))
+
+    def dispatch(self):
+        while self._pending:
+            function, args = self._pending.popleft()
+            function(*args)
+
+
+class StandInApplication:
+    # Receives notifications from MultiNotifier
+
+    def __init__(self):
+        self.notifications = dict()
+
+    def send_notification(self, identifier, notification):
+        self.notifications[identifier] = notification
+
+    def withdraw_notification(self, identifier):
+        self.notifications.pop(identifier, None)
+
+###
+#
+# SoakFrontEnd
+#
+###
+
+
+class SoakFrontEnd(SessionController):
+    # Stands in for the indicator: the session handling is the real one,
+    # only the credentials dialog and the notifiers are wired here
+
+    def __init__(self, rng, max_sessions, history_directory):
+        self.rng = rng
+        self.max_sessions = max_sessions
+        self.bus = StandInBus()
+        self.settings = StandInSettings()
+        configs = [ StandInConfig(f'/net/openvpn/v3/configuration/soak{number}', f'soak{number}') for number in range(CONFIGS) ]
+        self.config_manager = StandInConfigManager(configs)
+        self.session_manager = StandInSessionManager(self.bus, rng)
+        self.session_manager.SessionManagerCallback(self.on_session_manager_event)
+        self.credential_store = StandInCredentialStore()
+        for config in configs[CONFIGS_WITHOUT_CREDENTIALS:]:
+            self.credential_store[config.GetPath()]['Password'] = 'secret'
+        self.init_sessions(history_directory)
+        self.reconnect_scheduler = ReconnectScheduler(initial_delay=RECONNECT_INITIAL_DELAY, maximal_delay=RECONNECT_MAXIMAL_DELAY, rng=rng)
+        self.multi_notifier = MultiNotifier(StandInApplication(), 'soak') if Gtk is not None else None
+        self.notifiers = dict()
+
+    def sessions_refreshed(self):
+        if self.multi_notifier is None:
+            return
+        for session_id in self.sessions:
+            if session_id not in self.notifiers:
+                notifier = self.notifiers[session_id] = self.multi_notifier.new_notifier(f'session-{session_id}-status', mute_repetitions=True)
+                self.session_registry.own(session_id, 'notifier', notifier, self.close_notifier)
+
+    def close_notifier(self, notifier):
+        for session_id, known in list(self.notifiers.items()):
+            if known is notifier:
+                del self.notifiers[session_id]
+        notifier.close()
+
+    def session_status_changed(self, session_id):
+        notifier = self.notifiers.get(session_id, None)
+        if notifier is not None:
+            status = self.session_statuses[session_id]
+            notifier.active = False
+            notifier.body = f'{status["major"].name}/{status["minor"].name}'
+            notifier.timespan = 3
+            notifier.active = True
+
+    def on_session_require_user(self, event):
+        session_id = event.session_id
+        if Gtk is None or self.rng.random() < 0.5:
+            SessionController.on_session_require_user(self, event)
+            return
+        # Left open, a later status closes it through the registry
+        user_inputs = [ CredentialsUserInput(name=description, mask=mask, value=None, can_store=can_store) for description, mask, can_store in self.session_required_credentials(session_id) ]
+        dialog = construct_credentials_dialog(self.get_session_name(session_id), user_inputs, on_cancel=lambda : self.session_registry.disown(session_id, 'credentials', dialog))
+        self.session_registry.own(session_id, 'credentials', dialog, close_credentials_dialog)
+
+    def step(self):
+        rng = self.rng
+        # A new connection next to the retries that came due
+        self.action_config_connect(None, rng.choice(sorted(self.configs)) if self.configs else None)
+        self.session_manager.dispatch()
+        self.schedule_sessions()
+        for session_id in rng.sample(sorted(self.sessions), min(len(self.sessions), 3)):
+            session = self.sessions[session_id]
+            if rng.random() < 0.2:
+                self.subscribe_session_log(session_id)
+            outcome = rng.random()
+            if outcome < 0.6:
+                session.emit_status(openvpn3.StatusMajor.CONNECTION, openvpn3.StatusMinor.CFG_OK)
+                session.emit_status(openvpn3.StatusMajor.CONNECTION, openvpn3.StatusMinor.CONN_CONNECTED)
+            elif outcome < 0.7:
+                # Re-prompt replaces the credentials
+                session.emit_status(openvpn3.StatusMajor.CONNECTION, openvpn3.StatusMinor.CFG_REQUIRE_USER)
+            elif outcome < 0.85:
+                session.emit_status(openvpn3.StatusMajor.CONNECTION, openvpn3.StatusMinor.CONN_AUTH_FAILED)
+            else:
+                session.emit_status(openvpn3.StatusMajor.CONNECTION, openvpn3.StatusMinor.CONN_FAILED)
+            if rng.random() < 0.1:
+                # Notifier and log burst
+                for number in range(rng.randint(10, 100)):
+                    session.emit_status(openvpn3.StatusMajor.CONNECTION, openvpn3.StatusMinor.CONN_CONNECTED, f'burst {number}')
+                    session.emit_log(1, 1, f'burst {number}')
+            if rng.random() < 0.1:
+                self.session_registry.release(session_id, 'log')
+        event = rng.random()
+        if event < 0.01:
+            self.on_uplink_change(['soak'])
+        elif event < 0.02:
+            self.on_sleep()
+            self.on_wake()
+        self.session_manager.dispatch()
+        self.schedule_sessions()
+        if self.multi_notifier is not None:
+            self.multi_notifier.update()
+        # User disconnects above the limit
+        while len(self.sessions) > self.max_sessions:
+            self.action_session_disconnect(self, rng.choice(sorted(self.sessions)))
+            self.session_manager.dispatch()
+            self.schedule_sessions()
+        if Gtk is not None:
+            while Gtk.events_pending():
+                Gtk.main_iteration_do(False)
+
+    def shutdown(self):
+        for session_id in list(self.sessions):
+            self.action_session_disconnect(self, session_id)
+        self.session_manager.dispatch()
+        self.schedule_sessions()
+        self.close_sessions()
+        if self.multi_notifier is not None:
+            self.multi_notifier.close()
+        if Gtk is not None:
+            while Gtk.events_pending():
+                Gtk.main_iteration_do(False)
+
+###
+#
+# Sampling
+#
+###
+
+
+class CountingHandler(logging.Handler):
+    # Counts warnings and errors by message, the run itself logs only critical
+
+    def __init__(self):
+        logging.Handler.__init__(self, logging.WARNING)
+        self.counts = collections.Counter()
+
+    def emit(self, record):
+        self.counts[record.msg] += 1
+
+
+def get_rss():
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+
+
+def sample(front_end):
+    gc.collect()
+    return {
+        'rss_kib' : get_rss(),
+        'objects' : len(gc.get_objects()),
+        'widgets' : len(Gtk.Window.list_toplevels()) if Gtk is not None else 0,
+        'match_rules' : front_end.bus.match_rules,
+        'resources' : sum(front_end.session_registry.counts().values()),
+        'history' : len(list(front_end.connection_history.keys())) if front_end.connection_history is not None else 0,
+    }
+
+
+def check_growth(samples, max_sessions):
+    # Compares peaks of the two halves after dropping the warm-up quarter
+    samples = samples[len(samples) // 4:]
+    first = samples[:len(samples) // 2]
+    second = samples[len(samples) // 2:]
+    failures = list()
+    for key, (absolute, relative, per_session) in GROWTH_ALLOWANCE.items():
+        first_peak = max(sample[key] for sample in first)
+        second_peak = max(sample[key] for sample in second)
+        allowance = absolute + relative * first_peak + per_session * max_sessions
+        print(f'{key:<12} first half peak {first_peak:>10} second half peak {second_peak:>10} allowed growth {allowance:>10.0f}')
+        if second_peak - first_peak > allowance:
+            failures.append(key)
+    return failures
+
+
+def test(cycles, max_sessions, seed, sample_count):
+    rng = random.Random(seed)
+    counting = CountingHandler()
+    logging.getLogger().addHandler(counting)
+    with tempfile.TemporaryDirectory() as history_directory:
+        front_end = SoakFrontEnd(rng, max_sessions, history_directory)
+        baseline = sample(front_end)
+        samples = list()
+        interval = max(cycles // sample_count, 1)
+        start = time.monotonic()
+        for cycle in range(1, cycles + 1):
+            front_end.step()
+            if cycle % interval == 0:
+                samples.append(sample(front_end))
+                logging.info('Cycle %d of %d: %s', cycle, cycles, samples[-1])
+        elapsed = time.monotonic() - start
+        print(f'{cycles} cycles, {front_end.session_manager.created} sessions in {elapsed:.1f}s')
+        print(f'Dialogs and notifiers: {"Gtk" if Gtk is not None else "none, no display"}')
+        failures = check_growth(samples, max_sessions)
+
+        front_end.shutdown()
+        final = sample(front_end)
+    for key in ['match_rules', 'resources', 'widgets']:
+        if final[key] != baseline[key]:
+            print(f'{key} did not return to baseline: {baseline[key]} -> {final[key]}')
+            failures.append(key)
+    for message, count in counting.counts.most_common():
+        print(f'{count:>8} x {message}')
+    if counting.counts['Session list refresh failed'] > 0:
+        failures.append('refresh')
+    assert len(front_end.sessions) == 0
+    assert len(front_end.session_logs) == 0
+    assert len(front_end.sessions_connected) == 0
+    if failures:
+        print(f'Failed: {", ".join(failures)}')
+    return not failures
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Soak test of session handling')
+    parser.add_argument('--cycles', type=int, default=100000)
+    parser.add_argument('--sessions', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--samples', type=int, default=40)
+    parser.add_argument('--debug', action='store_true')
+    args = parser.parse_args()
+    # Debug logging of every transition would dominate the run,
+    # warnings and errors are counted and summarized at the end
+    logging.basicConfig(level = logging.DEBUG if args.debug else logging.WARNING)
+    if not args.debug:
+        logging.getLogger().handlers[0].setLevel(logging.CRITICAL)
+    if not test(args.cycles, args.sessions, args.seed, args.samples):
+        sys.exit(1)
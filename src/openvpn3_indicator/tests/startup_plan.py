@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+import logging
+import sys
+
+from openvpn3_indicator.startup_plan import *
+
+def test():
+    assert parse_startup_action('RESTART', '/config/a') == (['/config/a'], [])
+    assert parse_startup_action('STARTNAME:A') == ([], ['A'])
+    assert parse_startup_action('STARTNAMES', names=['A', 'B']) == ([], ['A', 'B'])
+    assert toggle_startup_name('STARTNAME:A', [], 'B') == ('STARTNAMES', ['A', 'B'])
+    assert toggle_startup_name('STARTNAMES', ['A', 'B'], 'A') == ('STARTNAME:B', [])
+    assert toggle_startup_name('STARTNAME:B', [], 'B') == ('', [])
+    assert toggle_startup_name('RESTART', [], 'B') == ('STARTNAME:B', [])
+
+    plan = StartupPlan(['/config/c'], ['A', 'B', 'Z'], timeout=30.0, now=0.0)
+    assert plan.resolve(dict(), dict(), now=1.0) == ([], [])
+    configs = { '/config/a' : None, '/config/b' : None, '/config/c' : None }
+    name_configs = { 'A' : '/config/a', 'B' : '/config/b', 'C' : '/config/c' }
+    config_ids, missing = plan.resolve(configs, name_configs, now=2.0)
+    assert config_ids == ['/config/c', '/config/a', '/config/b'] and missing == []
+    assert plan.pending
+    for config_id in config_ids:
+        plan.started(config_id, now=2.0)
+    assert plan.resolve(configs, name_configs, now=40.0) == ([], ['Z'])
+    assert not plan.pending and not plan.done
+    plan.connected('/config/a', now=3.5)
+    plan.forget('/config/c')
+    plan.connected('/config/b', now=4.0)
+    print(plan.times())
+    assert plan.done
+    assert plan.times() == { '/config/a' : 3.5, '/config/b' : 4.0 }
+
+    # The first start fails, the configuration is retried until it starts
+    plan = StartupPlan([], ['A'], timeout=30.0, now=0.0)
+    assert plan.resolve(configs, name_configs, now=1.0) == (['/config/a'], [])
+    assert plan.pending
+    assert plan.resolve(configs, name_configs, now=2.0) == (['/config/a'], [])
+    plan.started('/config/a', now=2.0)
+    assert not plan.pending
+    assert plan.resolve(configs, name_configs, now=3.0) == ([], [])
+    plan.connected('/config/a', now=5.0)
+    assert plan.done and plan.times() == { '/config/a' : 5.0 }
+
+    # Starts keep failing, the last attempt is at the readiness timeout
+    plan = StartupPlan(['/config/c'], ['Z'], timeout=30.0, now=0.0)
+    assert plan.resolve(configs, name_configs, now=10.0) == (['/config/c'], [])
+    assert plan.resolve(configs, name_configs, now=30.0) == (['/config/c'], ['Z'])
+    assert not plan.pending and plan.done
+
+if __name__ == '__main__':
+    logging.basicConfig(level = logging.DEBUG)
+    test()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+import logging
+import sys
+
+from openvpn3.constants import StatusMajor, StatusMinor
+
+from openvpn3_indicator.state_service import *
+
+class StandInApplication:
+    def __init__(self):
+        self.config_names = { '/config/a' : 'alpha', '/config/b' : 'beta' }
+        self.config_sessions = { '/config/a' : ['/session/a'], '/config/b' : [] }
+        self.session_configs = { '/session/a' : '/config/a' }
+        self.session_statuses = {
+            '/session/a' : { 'major' : StatusMajor.CONNECTION, 'minor' : StatusMinor.CONN_CONNECTING, 'message' : '' },
+        }
+
+def test():
+    application = StandInApplication()
+    service = StateService(application)
+    assert service.update()
+    assert service.serial == 1
+    assert not service.update()
+
+    configs, sessions = collect_state(application)
+    assert configs['/config/a'] == { 'name' : 'alpha', 'sessions' : ['/session/a'] }
+    assert sessions['/session/a']['name'] == 'alpha'
+    assert 'rate-in' not in sessions['/session/a']
+    print(variant_entries(sessions))
+
+    application.session_statuses['/session/a']['minor'] = StatusMinor.CONN_CONNECTED
+    del application.config_names['/config/b']
+    new_configs, new_sessions = collect_state(application)
+    assert diff_entries(configs, new_configs) == ({}, ['/config/b'])
+    changed, removed = diff_entries(sessions, new_sessions)
+    assert list(changed) == ['/session/a'] and removed == []
+    assert changed['/session/a']['description'] == 'Connected'
+    assert service.update()
+    assert service.serial == 2
+
+    # Rates are only part of GetState, new samples do not signal a change
+    class StandInTrafficStatistics:
+        def rates(self, session_id):
+            return (1000.0, 10.0)
+    application.traffic_statistics = StandInTrafficStatistics()
+    assert not service.update()
+    configs, sessions = collect_state(application, rates=True)
+    assert sessions['/session/a']['rate-in'] == 1000.0
+
+if __name__ == '__main__':
+    logging.basicConfig(level = logging.DEBUG)
+    test()
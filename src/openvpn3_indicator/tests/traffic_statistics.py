@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+import logging
+
+from openvpn3_indicator.traffic_statistics import RingBuffer, TrafficStatisticsCollector, format_rate
+
+def test():
+    buffer = RingBuffer('Q', 3)
+    for value in range(5):
+        buffer.append(value)
+    assert buffer.values() == [2, 3, 4]
+    assert buffer[-1] == 4
+
+    counters = { 'BYTES_IN' : 0, 'BYTES_OUT' : 0 }
+    samples = list()
+    def source(session_id):
+        samples.append(session_id)
+        return counters
+
+    collector = TrafficStatisticsCollector(source, capacity=10)
+    collector.track('session', 0.0, True)
+    now = 0.0
+    while now < 20.0:
+        counters['BYTES_IN'] += 125000
+        counters['BYTES_OUT'] += 1000
+        collector.update(now)
+        now += 1.0
+    print(f'Active samples: {len(samples)}, rates: {collector.rates("session")}')
+    rate_in, rate_out = collector.rates('session')
+    print(f'{format_rate(rate_in)} {format_rate(rate_out)}')
+
+    collector.reset('session')
+    assert len(collector['session']) == 0 and collector.rates('session') is None
+
+    samples.clear()
+    while now < 200.0:
+        collector.update(now)
+        now += 1.0
+    print(f'Idle samples: {len(samples)}')
+    assert len(samples) < 15
+
+    collector.track('session', now, False)
+    samples.clear()
+    while now < 300.0:
+        collector.update(now)
+        now += 1.0
+    assert len(samples) == 0
+
+if __name__ == '__main__':
+    logging.basicConfig(level = logging.DEBUG)
+    test()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+import logging
+import socket
+import struct
+import sys
+
+from openvpn3_indicator.uplink_monitor import *
+
+def attribute(attribute_type, value):
+    data = NETLINK_ATTRIBUTE.pack(NETLINK_ATTRIBUTE.size + len(value), attribute_type) + value
+    return data + b'\0' * (align(len(data)) - len(data))
+
+def message(message_type, payload):
+    return NETLINK_HEADER.pack(NETLINK_HEADER.size + len(payload), message_type, 0, 0, 0) + payload
+
+def default_route(message_type, index):
+    return message(message_type, RTMSG.pack(socket.AF_INET, 0, 0, 0, RT_TABLE_MAIN, 0, 0, 1, 0) + attribute(RTA_OIF, struct.pack('=i', index)))
+
+def link(index, name, flags):
+    return message(RTM_NEWLINK, IFINFOMSG.pack(socket.AF_UNSPEC, 1, index, flags, 0) + attribute(IFLA_IFNAME, name.encode() + b'\0'))
+
+def test():
+    watch = RouteWatch(lambda reason : None, is_tunnel_device=lambda name : name.startswith('tun'))
+    data = b''.join([
+        link(1000, 'eth9', IFF_LOWER_UP),
+        link(1001, 'tun9', IFF_LOWER_UP),
+        default_route(RTM_NEWROUTE, 1001),
+        link(1001, 'tun9', 0),
+        default_route(RTM_DELROUTE, 1000),
+        link(1000, 'eth9', 0),
+        message(RTM_NEWROUTE, RTMSG.pack(socket.AF_INET, 1, 0, 0, RT_TABLE_MAIN, 0, 0, 1, 0)),
+    ])
+    reasons = watch.process(data)
+    watch.close()
+    print(reasons)
+    assert reasons == ['default route removed via eth9', 'carrier down on eth9']
+
+if __name__ == '__main__':
+    logging.basicConfig(level = logging.DEBUG)
+    test()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+#
+# openvpn3-indicator - Simple indicator application for OpenVPN3.
+# Copyright (C) 2024 Grzegorz Gutowski <grzegorz.gutowski@uj.edu.pl>
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License,
+# or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.
+# If not, see <https://www.gnu.org/licenses/>.
+#
+
+import array
+import logging
+import math
+import traceback
+
+STATISTICS_KEYS = ['BYTES_IN', 'BYTES_OUT', 'PACKETS_IN', 'PACKETS_OUT']
+STATISTICS_CAPACITY = 300
+RATE_WINDOW = 5.0
+# Connected sessions are sampled every 2 s while their counters change,
+# the interval doubles up to 30 s while they stay the same. The indicator
+# menu is exported over D-Bus, so there is no reliable signal that it is
+# open, and sampling does not depend on it.
+ACTIVE_INTERVAL = 2.0
+IDLE_INTERVAL_MAXIMUM = 30.0
+
+###
+#
+# RingBuffer
+#
+###
+
+
+class RingBuffer:
+
+    @property
+    def capacity(self):
+        return len(self._values)
+
+    def __init__(self, typecode, capacity):
+        self._values = array.array(typecode, [0]) * capacity
+        self._head = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        # Index 0 is the oldest value, index -1 is the most recent one
+        if index < 0:
+            index += self._size
+        if index < 0 or index >= self._size:
+            raise IndexError('RingBuffer index out of range')
+        return self._values[(self._head - self._size + index) % self.capacity]
+
+    def append(self, value):
+        self._values[self._head] = value
+        self._head = (self._head + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def clear(self):
+        self._head = 0
+        self._size = 0
+
+    def values(self):
+        return [ self[index] for index in range(self._size) ]
+
+###
+#
+# SessionStatistics
+#
+###
+
+
+class SessionStatistics:
+
+    @property
+    def active(self):
+        return self._active
+
+    @property
+    def next_sample(self):
+        return self._next_sample
+
+    def __init__(self, capacity=STATISTICS_CAPACITY):
+        self._timestamps = RingBuffer('d', capacity)
+        self._counters = dict((key, RingBuffer('Q', capacity)) for key in STATISTICS_KEYS)
+        self._active = False
+        self._interval = ACTIVE_INTERVAL
+        self._next_sample = math.inf
+
+    def __len__(self):
+        return len(self._timestamps)
+
+    def add_sample(self, timestamp, counters):
+        changed = len(self._timestamps) == 0
+        for key, buffer in self._counters.items():
+            value = max(int(counters.get(key, 0)), 0)
+            if len(buffer) > 0 and buffer[-1] != value:
+                changed = True
+            buffer.append(value)
+        self._timestamps.append(timestamp)
+        return changed
+
+    def clear(self):
+        self._timestamps.clear()
+        for buffer in self._counters.values():
+            buffer.clear()
+
+    def latest(self, key):
+        buffer = self._counters[key]
+        if len(buffer) == 0:
+            return None
+        return buffer[-1]
+
+    def rate(self, key, window=RATE_WINDOW):
+        size = len(self._timestamps)
+        if size < 2:
+            return None
+        last = size - 1
+        first = last - 1
+        while first > 0 and self._timestamps[last] - self._timestamps[first - 1] <= window:
+            first -= 1
+        elapsed = self._timestamps[last] - self._timestamps[first]
+        if elapsed <= 0:
+            return None
+        buffer = self._counters[key]
+        # Counters restart from zero when the tunnel reconnects
+        delta = max(buffer[last] - buffer[first], 0)
+        return delta / elapsed
+
+    def schedule(self, now, changed=False):
+        if not self._active:
+            self._next_sample = math.inf
+            return
+        if changed:
+            self._interval = ACTIVE_INTERVAL
+        else:
+            self._interval = min(self._interval * 2, IDLE_INTERVAL_MAXIMUM)
+        self._next_sample = now + self._interval
+
+    def set_active(self, now, active):
+        active = bool(active)
+        if self._active != active:
+            self._active = active
+            self._interval = ACTIVE_INTERVAL
+            self._next_sample = now if active else math.inf
+
+###
+#
+# TrafficStatisticsCollector
+#
+###
+
+
+class TrafficStatisticsCollector:
+
+    def __init__(self, source, capacity=STATISTICS_CAPACITY):
+        self._source = source
+        self._capacity = capacity
+        self._sessions = dict()
+
+    def __getitem__(self, session_id):
+        return self._sessions.get(session_id, None)
+
+    def track(self, session_id, now, active):
+        statistics = self._sessions.get(session_id, None)
+        if statistics is None:
+            statistics = self._sessions[session_id] = SessionStatistics(self._capacity)
+        statistics.set_active(now, active)
+
+    def forget(self, session_id):
+        self._sessions.pop(session_id, None)
+
+    def reset(self, session_id):
+        # Samples from different sources are not comparable
+        statistics = self._sessions.get(session_id, None)
+        if statistics is not None:
+            statistics.clear()
+
+    def retain(self, session_ids):
+        for session_id in list(self._sessions):
+            if session_id not in session_ids:
+                del self._sessions[session_id]
+
+    def update(self, now):
+        sampled = list()
+        for session_id, statistics in self._sessions.items():
+            if statistics.next_sample > now:
+                continue
+            changed = False
+            try:
+                counters = self._source(session_id)
+                if counters is not None:
+                    changed = statistics.add_sample(now, counters)
+                    sampled.append(session_id)
+            except: #TODO: Catch only expected exceptions
+                logging.debug(traceback.format_exc())
+                logging.warning('Failed to collect statistics of session %s', session_id)
+            statistics.schedule(now, changed=changed)
+        return sampled
+
+    def rates(self, session_id):
+        statistics = self._sessions.get(session_id, None)
+        if statistics is None:
+            return None
+        rate_in = statistics.rate('BYTES_IN')
+        rate_out = statistics.rate('BYTES_OUT')
+        if rate_in is None or rate_out is None:
+            return None
+        return (rate_in, rate_out)
+
+
+def format_rate(rate):
+    for unit in ['B/s', 'kB/s', 'MB/s', 'GB/s']:
+        if rate < 1000 or unit == 'GB/s':
+            break
+        rate /= 1000
+    if rate < 10 and unit != 'B/s':
+        return f'{rate:.1f} {unit}'
+    return f'{rate:.0f} {unit}'
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+#
+# openvpn3-indicator - Simple indicator application for OpenVPN3.
+# Copyright (C) 2024 Grzegorz Gutowski <grzegorz.gutowski@uj.edu.pl>
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License,
+# or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.
+# If not, see <https://www.gnu.org/licenses/>.
+#
+
+import logging
+import socket
+import struct
+import time
+import traceback
+
+import dbus
+from gi.repository import GLib
+
+NM_BUS_NAME = 'org.freedesktop.NetworkManager'
+NM_PATH = '/org/freedesktop/NetworkManager'
+NM_INTERFACE = 'org.freedesktop.NetworkManager'
+NM_ACTIVE_CONNECTION_INTERFACE = 'org.freedesktop.NetworkManager.Connection.Active'
+NM_CONNECTIVITY_FULL = 4
+# Primary connections of these types are tunnels, not uplinks
+NM_TUNNEL_TYPES = ['vpn', 'tun', 'wireguard']
+
+# Wait for this long without further changes before reporting,
+# but never delay a report by more than the maximal delay
+UPLINK_DEBOUNCE = 1.5
+UPLINK_MAX_DELAY = 5.0
+
+NETLINK_HEADER = struct.Struct('=IHHII')
+NETLINK_ATTRIBUTE = struct.Struct('=HH')
+IFINFOMSG = struct.Struct('=BxHiII')
+IFADDRMSG = struct.Struct('=BBBBI')
+RTMSG = struct.Struct('=BBBBBBBBI')
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+RTM_NEWLINK = 16
+RTM_DELLINK = 17
+RTM_NEWADDR = 20
+RTM_DELADDR = 21
+RTM_NEWROUTE = 24
+RTM_DELROUTE = 25
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+RTMGRP_IPV4_ROUTE = 0x40
+RTMGRP_IPV6_IFADDR = 0x100
+RTMGRP_IPV6_ROUTE = 0x400
+IFLA_IFNAME = 3
+RTA_OIF = 4
+RTA_TABLE = 15
+RT_TABLE_MAIN = 254
+IFF_LOWER_UP = 0x10000
+
+
+def align(length):
+    return (length + 3) & ~3
+
+
+def decode_netlink_messages(data):
+    offset = 0
+    while offset + NETLINK_HEADER.size <= len(data):
+        length, message_type, flags, sequence, pid = NETLINK_HEADER.unpack_from(data, offset)
+        if length < NETLINK_HEADER.size or offset + length > len(data):
+            break
+        yield message_type, data[offset+NETLINK_HEADER.size:offset+length]
+        offset += align(length)
+
+
+def decode_netlink_attributes(data, offset):
+    attributes = dict()
+    while offset + NETLINK_ATTRIBUTE.size <= len(data):
+        length, attribute_type = NETLINK_ATTRIBUTE.unpack_from(data, offset)
+        if length < NETLINK_ATTRIBUTE.size or offset + length > len(data):
+            break
+        attributes[attribute_type] = data[offset+NETLINK_ATTRIBUTE.size:offset+length]
+        offset += align(length)
+    return attributes
+
+###
+#
+# RouteWatch
+#
+###
+
+
+class RouteWatch:
+    # Listens to rtnetlink multicast groups and reports changes of
+    # default routes, removed addresses and carrier changes
+
+    def __init__(self, callback, is_tunnel_device=None):
+        self._callback = callback
+        self._is_tunnel_device = is_tunnel_device
+        self._names = dict()
+        self._lower_up = dict()
+        self._socket = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW | socket.SOCK_NONBLOCK | socket.SOCK_CLOEXEC, socket.NETLINK_ROUTE)
+        try:
+            self._socket.bind((0, RTMGRP_LINK | RTMGRP_IPV4_IFADDR | RTMGRP_IPV4_ROUTE | RTMGRP_IPV6_IFADDR | RTMGRP_IPV6_ROUTE))
+        except OSError:
+            self._socket.close()
+            raise
+        self._watch = GLib.io_add_watch(self._socket.fileno(), GLib.PRIORITY_DEFAULT, GLib.IO_IN | GLib.IO_ERR | GLib.IO_HUP, self.on_readable)
+
+    def device_name(self, index):
+        name = self._names.get(index, None)
+        if name is None:
+            try:
+                name = socket.if_indextoname(index)
+            except OSError:
+                name = None
+        return name
+
+    def is_tunnel(self, index):
+        if self._is_tunnel_device is None:
+            return False
+        name = self.device_name(index)
+        return name is not None and self._is_tunnel_device(name)
+
+    def on_readable(self, _fd, condition):
+        if condition & (GLib.IO_ERR | GLib.IO_HUP):
+            logging.warning('Route watch socket failed')
+            self._watch = None
+            return False
+        while True:
+            try:
+                data = self._socket.recv(65536)
+            except BlockingIOError:
+                break
+            except OSError:
+                # ENOBUFS when the kernel dropped messages, state is unknown
+                logging.debug(traceback.format_exc())
+                self._callback('netlink overrun')
+                break
+            for reason in self.process(data):
+                self._callback(reason)
+        return True
+
+    def process(self, data):
+        reasons = list()
+        for message_type, payload in decode_netlink_messages(data):
+            if message_type in [RTM_NEWLINK, RTM_DELLINK] and len(payload) >= IFINFOMSG.size:
+                family, device_type, index, flags, change = IFINFOMSG.unpack_from(payload)
+                attributes = decode_netlink_attributes(payload, IFINFOMSG.size)
+                if IFLA_IFNAME in attributes:
+                    self._names[index] = attributes[IFLA_IFNAME].split(b'\0', 1)[0].decode('utf-8', errors='replace')
+                if self.is_tunnel(index):
+                    continue
+                lower_up = message_type == RTM_NEWLINK and bool(flags & IFF_LOWER_UP)
+                if index in self._lower_up and self._lower_up[index] != lower_up:
+                    reasons.append(f'carrier {"up" if lower_up else "down"} on {self.device_name(index)}')
+                self._lower_up[index] = lower_up
+                if message_type == RTM_DELLINK:
+                    self._lower_up.pop(index, None)
+                    self._names.pop(index, None)
+            elif message_type == RTM_DELADDR and len(payload) >= IFADDRMSG.size:
+                family, prefix_length, flags, scope, index = IFADDRMSG.unpack_from(payload)
+                if scope == 0 and not self.is_tunnel(index):
+                    reasons.append(f'address removed from {self.device_name(index)}')
+            elif message_type in [RTM_NEWROUTE, RTM_DELROUTE] and len(payload) >= RTMSG.size:
+                family, destination_length, source_length, tos, table, protocol, scope, route_type, flags = RTMSG.unpack_from(payload)
+                if destination_length != 0:
+                    continue
+                attributes = decode_netlink_attributes(payload, RTMSG.size)
+                if RTA_TABLE in attributes and len(attributes[RTA_TABLE]) >= 4:
+                    table = struct.unpack_from('=I', attributes[RTA_TABLE])[0]
+                if table != RT_TABLE_MAIN:
+                    continue
+                index = struct.unpack_from('=i', attributes[RTA_OIF])[0] if len(attributes.get(RTA_OIF, b'')) >= 4 else None
+                if index is not None and self.is_tunnel(index):
+                    continue
+                reasons.append(f'default route {"added" if message_type == RTM_NEWROUTE else "removed"} via {self.device_name(index) if index is not None else "<none>"}')
+        return reasons
+
+    def close(self):
+        if self._watch is not None:
+            GLib.source_remove(self._watch)
+            self._watch = None
+        self._socket.close()
+
+###
+#
+# UplinkMonitor
+#
+###
+
+
+class UplinkMonitor:
+    # Follows NetworkManager when it runs and rtnetlink otherwise,
+    # and reports debounced changes of the uplink
+
+    def __init__(self, bus, on_change, on_event=None, is_tunnel_device=None, debounce=UPLINK_DEBOUNCE, max_delay=UPLINK_MAX_DELAY):
+        self._bus = bus
+        self._on_change = on_change
+        self._on_event = on_event
+        self._is_tunnel_device = is_tunnel_device
+        self._debounce = debounce
+        self._max_delay = max_delay
+        self._timer = None
+        self._first_change = None
+        self._reasons = list()
+        self._primary = None
+        self._connectivity = None
+        self._route_watch = None
+        self._signal_match = self._bus.add_signal_receiver(
+            self.on_network_manager_properties_changed,
+            signal_name='PropertiesChanged',
+            dbus_interface='org.freedesktop.DBus.Properties',
+            bus_name=NM_BUS_NAME,
+            path=NM_PATH,
+        )
+        # Called immediately with the current owner
+        self._owner_watch = self._bus.watch_name_owner(NM_BUS_NAME, self.on_network_manager_owner_changed)
+
+    @property
+    def source(self):
+        if self._route_watch is not None:
+            return 'rtnetlink'
+        if self._primary is not None or self._connectivity is not None:
+            return 'NetworkManager'
+        return None
+
+    def on_network_manager_owner_changed(self, owner):
+        owner = str(owner)
+        if owner:
+            logging.debug('NetworkManager is running, watching its signals')
+            self.stop_route_watch()
+            try:
+                properties = dbus.Interface(self._bus.get_object(NM_BUS_NAME, NM_PATH), dbus_interface='org.freedesktop.DBus.Properties')
+                self._primary = str(properties.Get(NM_INTERFACE, 'PrimaryConnection'))
+                self._connectivity = int(properties.Get(NM_INTERFACE, 'Connectivity'))
+            except dbus.exceptions.DBusException:
+                logging.debug(traceback.format_exc())
+        else:
+            logging.debug('NetworkManager is not running, watching rtnetlink')
+            self._primary = None
+            self._connectivity = None
+            self.start_route_watch()
+
+    def start_route_watch(self):
+        if self._route_watch is not None:
+            return
+        try:
+            self._route_watch = RouteWatch(self.changed, is_tunnel_device=self._is_tunnel_device)
+        except OSError:
+            logging.debug(traceback.format_exc())
+            logging.warning('Failed to watch network changes with rtnetlink')
+
+    def stop_route_watch(self):
+        if self._route_watch is not None:
+            self._route_watch.close()
+            self._route_watch = None
+
+    def on_network_manager_properties_changed(self, interface, changed, invalidated):
+        if str(interface) != NM_INTERFACE:
+            return
+        if 'PrimaryConnection' in changed:
+            primary = str(changed['PrimaryConnection'])
+            if primary != self._primary:
+                self._primary = primary
+                if primary == '/' or not self.is_tunnel_connection(primary):
+                    self.changed(f'primary connection {primary}')
+        if 'Connectivity' in changed:
+            connectivity = int(changed['Connectivity'])
+            if connectivity != self._connectivity:
+                previous = self._connectivity
+                self._connectivity = connectivity
+                if connectivity == NM_CONNECTIVITY_FULL and previous is not None:
+                    self.changed('connectivity restored')
+
+    def is_tunnel_connection(self, path):
+        try:
+            properties = dbus.Interface(self._bus.get_object(NM_BUS_NAME, path), dbus_interface='org.freedesktop.DBus.Properties')
+            return str(properties.Get(NM_ACTIVE_CONNECTION_INTERFACE, 'Type')) in NM_TUNNEL_TYPES
+        except dbus.exceptions.DBusException:
+            logging.debug(traceback.format_exc())
+            return False
+
+    def changed(self, reason):
+        if self._on_event is not None:
+            self._on_event(reason)
+        now = time.monotonic()
+        if reason not in self._reasons:
+            self._reasons.append(reason)
+        if self._first_change is None:
+            self._first_change = now
+        if self._timer is not None:
+            GLib.source_remove(self._timer)
+        delay = min(self._debounce, max(self._first_change + self._max_delay - now, 0.0))
+        self._timer = GLib.timeout_add(int(delay * 1000), self.on_timeout)
+
+    def on_timeout(self):
+        reasons = self._reasons
+        self._timer = None
+        self._first_change = None
+        self._reasons = list()
+        self._on_change(reasons)
+        return False
+
+    def close(self):
+        if self._timer is not None:
+            GLib.source_remove(self._timer)
+            self._timer = None
+        self._signal_match.remove()
+        self._owner_watch.cancel()
+        self.stop_route_watch()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# vim:ts=4:sts=4:sw=4:expandtab
+
+#
+# openvpn3-indicator - Simple indicator application for OpenVPN3.
+# Copyright (C) 2024 Grzegorz Gutowski <grzegorz.gutowski@uj.edu.pl>
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License,
+# or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.
+# If not, see <https://www.gnu.org/licenses/>.
+#
+
+import itertools
+import os
+import pathlib
+import time
+
+from openvpn3_indicator.about import APPLICATION_NAME
+
+
+def xdg_directory(variable, default):
+    path = os.environ.get(variable, '')
+    if not path or not os.path.isabs(path):
+        path = os.path.join(os.path.expanduser('~'), default)
+    return pathlib.Path(path) / APPLICATION_NAME
+
+
+def get_user_cache_directory(create=True):
+    path = xdg_directory('XDG_CACHE_HOME', '.cache')
+    if create:
+        path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    return path
+
+
+def get_user_data_directory(create=True):
+    path = xdg_directory('XDG_DATA_HOME', '.local/share')
+    if create:
+        path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    return path
+
+
+cache_file_counter = itertools.count()
+
+def get_user_cache_file(prefix, suffix):
+    timestamp = time.strftime('%Y%m%d-%H%M%S')
+    return get_user_cache_directory() / f'{prefix}-{timestamp}-{os.getpid()}-{next(cache_file_counter)}.{suffix}'